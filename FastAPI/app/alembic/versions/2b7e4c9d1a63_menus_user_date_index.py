@@ -0,0 +1,33 @@
+"""Index menus by user and date
+
+The menu calendar reads the menus of a user in a date range. The composite
+index serves that range scan and, since it leads with `user_id`, also the
+lookups by user and the foreign key, so the single-column index peewee
+created for the foreign key is dropped.
+
+Revision ID: 2b7e4c9d1a63
+Revises: 8d3f6b2a9c41
+Create Date: 2026-10-18 16:40:09.227815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7e4c9d1a63'
+down_revision: Union[str, None] = '8d3f6b2a9c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Created first, so the foreign key is never left without an index
+    op.create_index("menumodel_user_id_date", "menus", ["user_id", "date"])
+    op.drop_index("menumodel_user_id", table_name="menus")
+
+
+def downgrade() -> None:
+    op.create_index("menumodel_user_id", "menus", ["user_id"])
+    op.drop_index("menumodel_user_id_date", table_name="menus")
@@ -0,0 +1,122 @@
+"""Unit catalogue
+
+The unit columns of pantry products and recipe ingredients held bare numbers.
+They are now IDs of the `units` table created here, seeded with
+`models.unit.UNIT_CATALOGUE`, which gives each unit its dimension and its
+factor to the base unit of the dimension: grams, millilitres and pieces. Unit 1
+is the piece. Units added to the catalogue later are created at startup by
+`UnitService.ensure_units`.
+
+- Pantries now store quantities in base units. The numbers written so far
+  were not catalogue IDs, so pantry rows are left as they are by default and
+  those whose unit is not a base unit are logged. Running the upgrade with
+  `alembic -x convert_pantry_units=true upgrade head` instead reads them as
+  catalogue IDs and converts them, after copying their quantity and unit to
+  `pantry_products_unit_backup`.
+- Shopping lists get a `unit` column, their quantities being in base units,
+  and it joins their primary key, since an ingredient needed both by mass and
+  by volume has a row for each. Existing rows are counted in pieces.
+
+Downgrading restores the pantry rows converted by the upgrade from the backup,
+overwriting any change made to them since, and is lossy for shopping lists:
+only the row with the lowest unit of each ingredient is kept.
+
+Revision ID: 3e9b5d7a2c14
+Revises: 6f1a9d3c5e28
+Create Date: 2026-10-18 21:07:35.218644
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from models.unit import UNIT_CATALOGUE  # pylint: disable=import-error
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9b5d7a2c14'
+down_revision: Union[str, None] = '6f1a9d3c5e28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger(f"alembic.{__name__}")
+
+BACKUP_TABLE = "pantry_products_unit_backup"
+
+# Pantry rows whose unit is a catalogue unit other than the base unit of its
+# dimension, the rows a conversion would change
+CONVERTIBLE = (
+    "FROM pantry_products AS product "
+    "JOIN units AS unit ON unit.id = product.unit "
+    "JOIN units AS base ON base.dimension = unit.dimension AND base.factor = 1 "
+    "WHERE product.unit <> base.id"
+)
+
+
+def upgrade() -> None:
+    units = op.create_table(
+        "units",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("code", sa.String(20), nullable=False, unique=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("dimension", sa.String(20), nullable=False),
+        sa.Column("factor", sa.Float(precision=53), nullable=False),
+    )
+    op.bulk_insert(units, list(UNIT_CATALOGUE))
+
+    convert = context.get_x_argument(as_dictionary=True).get("convert_pantry_units")
+    if convert == "true":
+        op.execute(
+            f"CREATE TABLE {BACKUP_TABLE} "
+            "SELECT product.pantry_id, product.product_id, product.quantity, product.unit "
+            + CONVERTIBLE
+        )
+        op.execute(
+            "UPDATE pantry_products AS product "
+            "JOIN units AS unit ON unit.id = product.unit "
+            "JOIN units AS base ON base.dimension = unit.dimension AND base.factor = 1 "
+            "SET product.quantity = product.quantity * unit.factor, product.unit = base.id"
+        )
+    elif not context.is_offline_mode():
+        count = op.get_bind().execute(sa.text("SELECT COUNT(*) " + CONVERTIBLE)).scalar()
+        if count:
+            logger.warning(
+                "%d pantry products are left in units other than a base unit; until they "
+                "are converted, deltas for them are refused. Rerun with "
+                "-x convert_pantry_units=true to convert them.",
+                count,
+            )
+
+    op.add_column(
+        "shopping_list_ingredients",
+        sa.Column("unit", sa.Integer(), nullable=False, server_default="1"),
+    )
+    # In one statement, so the table is never left without a key
+    op.execute(
+        "ALTER TABLE shopping_list_ingredients DROP PRIMARY KEY, "
+        "ADD PRIMARY KEY (shopping_list_id, ingredient_id, unit)"
+    )
+
+
+def downgrade() -> None:
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table(BACKUP_TABLE):
+        op.execute(
+            f"UPDATE pantry_products AS product JOIN {BACKUP_TABLE} AS backup "
+            "ON backup.pantry_id = product.pantry_id AND backup.product_id = product.product_id "
+            "SET product.quantity = backup.quantity, product.unit = backup.unit"
+        )
+        op.drop_table(BACKUP_TABLE)
+
+    op.execute(
+        "DELETE duplicate FROM shopping_list_ingredients AS duplicate "
+        "JOIN shopping_list_ingredients AS kept "
+        "ON kept.shopping_list_id = duplicate.shopping_list_id "
+        "AND kept.ingredient_id = duplicate.ingredient_id AND kept.unit < duplicate.unit"
+    )
+    op.execute(
+        "ALTER TABLE shopping_list_ingredients DROP PRIMARY KEY, "
+        "ADD PRIMARY KEY (shopping_list_id, ingredient_id)"
+    )
+    op.drop_column("shopping_list_ingredients", "unit")
+    op.drop_table("units")
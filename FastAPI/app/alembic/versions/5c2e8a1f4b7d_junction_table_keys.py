@@ -0,0 +1,86 @@
+"""Composite keys and reverse indexes on the junction tables
+
+The junction tables were created with a surrogate `id` key, so duplicate pairs
+were accepted and lookups from the second foreign key depended on the index
+MySQL creates for the constraint. For each table this migration:
+
+- deletes duplicate pairs, keeping the first row written,
+- replaces `id` by a primary key on the pair of foreign keys, which also serves
+  lookups by the first one,
+- adds the reverse index, which serves lookups by the second one,
+- drops the single-column foreign key indexes both of them make redundant.
+
+Tables already created with the composite key, such as the ones created by
+`database.create_tables`, are left as they are.
+
+Revision ID: 5c2e8a1f4b7d
+Revises:
+Create Date: 2026-10-18 10:12:41.318502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a1f4b7d'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table, key columns and the name peewee gives the reverse index
+JUNCTION_TABLES = [
+    ("menu_recipes", ("menu_id", "recipe_id"), "menurecipemodel_recipe_id_menu_id"),
+    ("pantry_products", ("pantry_id", "product_id"), "pantryproductmodel_product_id_pantry_id"),
+    (
+        "recipe_ingredients",
+        ("recipe_id", "ingredient_id"),
+        "recipeingredientmodel_ingredient_id_recipe_id",
+    ),
+    (
+        "shopping_list_ingredients",
+        ("shopping_list_id", "ingredient_id"),
+        "shoppinglistingredientmodel_ingredient_id_shopping_list_id",
+    ),
+    (
+        "suggestion_recipe_ingredients",
+        ("suggestion_recipe_id", "ingredient_id"),
+        "suggestionrecipeingredientmodel_ingredient_id_suggestion_94f0c38",
+    ),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, (first, second), reverse_index in JUNCTION_TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "id" not in columns:
+            continue
+
+        op.execute(
+            f"DELETE duplicate FROM {table} AS duplicate "
+            f"JOIN {table} AS kept ON kept.{first} = duplicate.{first} "
+            f"AND kept.{second} = duplicate.{second} AND kept.id < duplicate.id"
+        )
+        # In one statement, so the table is never left without a key
+        op.execute(f"ALTER TABLE {table} DROP COLUMN id, ADD PRIMARY KEY ({first}, {second})")
+        op.create_index(reverse_index, table, [second, first])
+
+        for index in inspector.get_indexes(table):
+            if index["column_names"] in ([first], [second]):
+                op.drop_index(index["name"], table_name=table)
+
+
+def downgrade() -> None:
+    for table, (first, second), reverse_index in JUNCTION_TABLES:
+        # The foreign keys need an index of their own once the key and the
+        # reverse index are gone
+        op.create_index(f"{table}_{first}", table, [first])
+        op.create_index(f"{table}_{second}", table, [second])
+        op.drop_index(reverse_index, table_name=table)
+        op.execute(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, "
+            "ADD COLUMN id INT NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST"
+        )
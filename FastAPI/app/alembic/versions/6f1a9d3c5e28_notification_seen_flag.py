@@ -0,0 +1,40 @@
+"""Seen flag on notifications
+
+Notifications are marked as seen by their user, and the streams of
+`/notifications/stream` report how many are still unseen. The composite index
+serves that count and, since it leads with `user_id`, also the listing by
+user and the foreign key, so the single-column index peewee created for the
+foreign key is dropped. Existing notifications start unseen.
+
+Revision ID: 6f1a9d3c5e28
+Revises: 2b7e4c9d1a63
+Create Date: 2026-10-18 19:12:48.531907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1a9d3c5e28'
+down_revision: Union[str, None] = '2b7e4c9d1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "notifications",
+        sa.Column("seen", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    # Created first, so the foreign key is never left without an index
+    op.create_index("notificationmodel_user_id_seen", "notifications", ["user_id", "seen"])
+    op.drop_index("notificationmodel_user_id", table_name="notifications")
+
+
+def downgrade() -> None:
+    op.create_index("notificationmodel_user_id", "notifications", ["user_id"])
+    op.drop_index("notificationmodel_user_id_seen", table_name="notifications")
+    op.drop_column("notifications", "seen")
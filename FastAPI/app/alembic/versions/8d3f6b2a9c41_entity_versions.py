@@ -0,0 +1,36 @@
+"""Version columns on users, roles and recipes
+
+Every write to these tables increments `version`, which the entity routes use
+as their ETag and for optimistic concurrency on `PUT`. Existing rows start at
+version 1.
+
+Revision ID: 8d3f6b2a9c41
+Revises: 5c2e8a1f4b7d
+Create Date: 2026-10-18 14:02:17.604119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6b2a9c41'
+down_revision: Union[str, None] = '5c2e8a1f4b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ["roles", "users", "recipes"]
+
+
+def upgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.add_column(
+            table, sa.Column("version", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, "version")
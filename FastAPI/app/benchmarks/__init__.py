@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Recipe_Master backend.
+
+Each module is a standalone script meant to be run from the `app` directory,
+for example `python -m benchmarks.pool_benchmark`.
+"""
@@ -0,0 +1,271 @@
+"""
+Query plan check for the service layer.
+
+Runs every scenario below against a seeded database, a SQLite file by default
+or the MySQL server configured in the environment with `--mysql`, records the
+statements each one executes and runs `EXPLAIN` on them through
+`testing.explain`. The report is printed as JSON and the command exits with
+status 1 when a statement reads a table in full, so it can gate CI.
+
+Some scenarios read tables in full on purpose, such as the in-memory indexes
+built from every recipe; those tables are listed as allowed for the scenario.
+The reference tables are loaded into the `ReferenceCache` first, and the unit
+catalogue created, as at startup.
+Every scenario runs in a transaction that is rolled back, so the database is
+left as it was. On MySQL the tables are analyzed after seeding, since plans on
+small or unanalyzed tables do not reflect production.
+
+Usage:
+    python -m benchmarks.explain_check --mysql
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+from typing import Callable, Dict, Tuple
+
+# Scenario name -> (call running the service queries, tables it may read in full)
+Scenario = Tuple[Callable[[], object], Tuple[str, ...]]
+
+
+def _scenarios() -> Dict[str, Scenario]:
+    """Build the scenarios, once the settings point at the database to check."""
+    # pylint: disable=import-outside-toplevel
+    from models.pantry_product import PantryProductDelta
+    from models.recipe import RecipePortion
+    from services.export_service import ExportService
+    from services.menu_service import MenuService
+    from services.notification_service import NotificationService
+    from services.pantry_service import PantryService
+    from services.recipe_scaling_service import RecipeScalingService
+    from services.recipe_service import RecipeService
+    from services.role_service import RoleService
+    from services.search_service import SearchService
+    from services.shopping_list_service import ShoppingListService
+    from services.suggestion_service import SuggestionService
+    from services.user_service import UserService
+
+    def _suggest():
+        SuggestionService.save_suggestions(2, SuggestionService.suggest_recipes(2))
+
+    # Both indexes are built from whole tables
+    search_tables = ("recipes", "recipe_ingredients", "ingredients")
+    suggestion_tables = ("recipe_ingredients", "ingredients", "products")
+    return {
+        "roles_get": (lambda: RoleService.get_role_by_id(2), ()),
+        "roles_etag": (lambda: RoleService.get_role_version(2), ()),
+        "users_get": (lambda: UserService.get_user_by_id(2), ()),
+        "users_etag": (lambda: UserService.get_user_versions(2), ()),
+        "users_authenticate": (
+            lambda: UserService.authenticate("user2@example.com", "explain-check"), ()
+        ),
+        "users_page": (lambda: b"".join(UserService.stream_users(after=10, role_id=2)), ()),
+        "recipes_get": (lambda: RecipeService.get_recipe_by_id(2), ()),
+        "recipes_etag": (lambda: RecipeService.get_recipe_version(2), ()),
+        "recipes_page": (
+            lambda: b"".join(RecipeService.stream_recipes(after=10, user_id=2, category_id=2)), ()
+        ),
+        "recipes_search": (
+            lambda: RecipeService.search_recipes("egg", ingredient="ingredient 2"),
+            search_tables if SearchService.uses_memory_index() else (),
+        ),
+        "recipes_create": (
+            lambda: RecipeService.create_recipe("egg toast", "toast it", 5, 1, 1, 2), ()
+        ),
+        "recipes_update": (lambda: RecipeService.update_recipe(2, name="new name"), ()),
+        "recipes_delete": (lambda: RecipeService.delete_recipe(3), ()),
+        "recipes_scale": (
+            lambda: RecipeScalingService.scale(
+                [RecipePortion(recipe_id=recipe_id, multiplier=2.5) for recipe_id in range(2, 30)]
+            ),
+            (),
+        ),
+        "recipes_export": (
+            lambda: b"".join(ExportService.export_recipes("ndjson", user_id=2)), ()
+        ),
+        "menus_page": (lambda: b"".join(MenuService.stream_menus(after=10, user_id=2)), ()),
+        "menus_calendar": (
+            lambda: MenuService.get_calendar(
+                2, datetime.date(2026, 1, 1), datetime.date(2026, 1, 7)
+            ),
+            (),
+        ),
+        "notifications_page": (
+            lambda: b"".join(NotificationService.stream_notifications(after=10, user_id=2)), ()
+        ),
+        "pantries_update": (
+            lambda: PantryService.apply_deltas(
+                2,
+                [PantryProductDelta(product_id=product_id, quantity=quantity, unit=1)
+                 for product_id, quantity in ((1, 1.5), (3, -2), (5, -10), (7, 4))],
+            ),
+            (),
+        ),
+        # Pantry products are matched to ingredients by case-insensitive name,
+        # which no plain index serves
+        "shopping_lists_create": (
+            lambda: ShoppingListService.create_from_menu(2), ("ingredients",)
+        ),
+        "shopping_lists_get": (lambda: ShoppingListService.get_shopping_list(1), ()),
+        "suggestions_save": (_suggest, suggestion_tables),
+    }
+
+
+def _seed(sizes: dict, seed: int) -> None:
+    """Create the tables and fill an empty database with synthetic data."""
+    # pylint: disable=import-outside-toplevel
+    from peewee import SqliteDatabase, chunked
+    from config.database import (
+        MODELS, CategoryModel, DifficultyModel, IngredientModel, MenuModel, MenuRecipeModel,
+        NotificationModel, PantryModel, PantryProductModel, ProductModel, RecipeIngredientModel,
+        RecipeModel, RoleModel, ShoppingListModel, TypeNotificationModel, UserModel,
+        connection_scope, database,
+    )
+    from services.password_service import hash_password
+
+    rng = random.Random(seed)
+    users, recipes, ingredients = sizes["users"], sizes["recipes"], sizes["ingredients"]
+    words = ["egg", "milk", "flour", "salt", "sugar", "butter", "tomato", "rice"]
+    with connection_scope():
+        database.create_tables(MODELS)
+        if UserModel.select().exists():
+            return
+        password = hash_password("explain-check")
+        tables = [
+            (RoleModel, ({"name": f"role {n}"} for n in range(10))),
+            (CategoryModel, ({"name": f"category {n}"} for n in range(10))),
+            (DifficultyModel, ({"name": name} for name in ("easy", "medium", "hard"))),
+            (IngredientModel, ({"name": f"ingredient {n}"} for n in range(1, ingredients + 1))),
+            # Half of the ingredients can be bought as products of the same name
+            (ProductModel, ({"name": f"Ingredient {n}"} for n in range(1, ingredients + 1, 2))),
+            (TypeNotificationModel, (
+                {"type": kind, "name": kind.title()} for kind in ("info", "alert", "reminder")
+            )),
+            (UserModel, (
+                {
+                    "name": f"user {n}",
+                    "email": f"user{n}@example.com",
+                    "password": password,
+                    "role": rng.randint(1, 10),
+                }
+                for n in range(1, users + 1)
+            )),
+            (RecipeModel, (
+                {
+                    "name": " ".join(rng.sample(words, 3)),
+                    "instruction": " ".join(rng.choices(words, k=30)),
+                    "preparation_time": rng.randint(5, 120),
+                    "difficulty": rng.randint(1, 3),
+                    "category": rng.randint(1, 10),
+                    "user": rng.randint(1, users),
+                }
+                for _ in range(recipes)
+            )),
+            (RecipeIngredientModel, (
+                {"recipe_id": recipe_id, "ingredient_id": ingredient_id, "quantity": 1, "unit": 1}
+                for recipe_id in range(1, recipes + 1)
+                for ingredient_id in rng.sample(range(1, ingredients + 1), 6)
+            )),
+            (MenuModel, (
+                {"name": f"menu {n}", "date": datetime.date(2026, 1, 1), "user_id": (n % users) + 1}
+                for n in range(users * 2)
+            )),
+            (MenuRecipeModel, (
+                {"menu_id": menu_id, "recipe_id": recipe_id}
+                for menu_id in range(1, users * 2 + 1)
+                for recipe_id in rng.sample(range(1, recipes + 1), 5)
+            )),
+            (PantryModel, ({"user_id": user_id} for user_id in range(1, users + 1))),
+            (PantryProductModel, (
+                {"pantry_id": pantry_id, "product_id": product_id, "quantity": 2, "unit": 1}
+                for pantry_id in range(1, users + 1)
+                for product_id in rng.sample(range(1, (ingredients + 1) // 2 + 1), 10)
+            )),
+            (ShoppingListModel, ({"menu_id": menu_id} for menu_id in range(1, users + 1))),
+            (NotificationModel, (
+                {"user_id": rng.randint(1, users), "type": rng.randint(1, 3), "message": "hello"}
+                for _ in range(users * 5)
+            )),
+        ]
+        with database.atomic():
+            for model, rows in tables:
+                for chunk in chunked(rows, 500):
+                    model.insert_many(chunk).execute()
+        if isinstance(database, SqliteDatabase):
+            database.execute_sql("ANALYZE")
+        else:
+            database.execute_sql(f"ANALYZE TABLE {', '.join(database.get_tables())}")
+
+
+def main() -> None:
+    """Parse the command line arguments, check every scenario and print the report as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--scenarios", nargs="+", default=None, help="All scenarios by default")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--recipes", type=int, default=5_000)
+    parser.add_argument("--ingredients", type=int, default=500)
+    parser.add_argument("--sqlite", default=None, help="SQLite file, a temporary one by default")
+    parser.add_argument("--mysql", action="store_true", help="Use the configured MySQL server")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.mysql:
+        # Must be set before the application modules read the settings
+        os.environ["DATABASE_ENGINE"] = "peewee.SqliteDatabase"
+        os.environ["MYSQL_DATABASE"] = args.sqlite or os.path.join(
+            tempfile.mkdtemp(prefix="explain_check_"), "explain.db"
+        )
+
+    # pylint: disable=import-outside-toplevel
+    from config.database import connection_scope, database
+    from services.password_service import PasswordService
+    from services.reference_cache import ReferenceCache
+    from services.unit_service import UnitService
+    from testing.explain import find_full_scans
+    from testing.query_counter import QueryCounter
+
+    sizes = {"users": args.users, "recipes": args.recipes, "ingredients": args.ingredients}
+    _seed(sizes, args.seed)
+    scenarios = _scenarios()
+    names = args.scenarios or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Loaded whole at startup, as the application does
+    with connection_scope():
+        ReferenceCache.load()
+        UnitService.ensure_units()
+
+    report = {"database": "mysql" if args.mysql else "sqlite", "scenarios": {}}
+    failed = False
+    try:
+        for name in names:
+            call, allowed = scenarios[name]
+            with connection_scope():
+                with database.atomic() as transaction:
+                    with QueryCounter() as counter:
+                        call()
+                    # Explained before the rollback, against the rows the scenario wrote
+                    scans = find_full_scans(counter.queries, allowed)
+                    transaction.rollback()
+            failed = failed or bool(scans)
+            report["scenarios"][name] = {
+                "statements": counter.count,
+                "allowed_full_scans": list(allowed),
+                "full_scans": scans,
+            }
+    finally:
+        PasswordService.shutdown()
+
+    report["failed"] = failed
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
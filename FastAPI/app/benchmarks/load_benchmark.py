@@ -0,0 +1,458 @@
+"""
+Load test for the HTTP API.
+
+Boots `main.app` under uvicorn in a background thread against a local database,
+a SQLite file by default or the MySQL server configured in the environment with
+`--mysql`, seeds it with synthetic roles, users and recipes, and drives a set of
+routes with a configurable number of concurrent clients. Each scenario reports
+its throughput and p50/p95/p99 latency. With `--url` an already running server
+is targeted instead and nothing is booted or seeded; use it for absolute numbers,
+since an in-process server shares the interpreter with the load generator.
+
+The results are printed as JSON and can be written to a file with `--output`;
+`--compare` adds the change against a previous results file, so runs on
+different commits can be compared.
+
+With `--workers` the application runs under the production launcher,
+`serve.py`, once per worker count, and the report adds the speedup and the
+scaling efficiency of each count against the smallest one. A single asyncio
+client saturates one core long before a multi-process server does, so spread
+the load over several processes with `--client-processes`, and run on a machine
+with more cores than the largest worker count.
+
+Usage:
+    python -m benchmarks.load_benchmark --concurrency 32 --duration 10 --output after.json \\
+        --compare before.json
+    python -m benchmarks.load_benchmark --workers 1 2 4 8 --client-processes 4 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Request factory: (random generator, sequence number) -> (method, path, httpx kwargs)
+Scenario = Callable[[random.Random, int], Tuple[str, str, dict]]
+
+
+def _scenarios(sizes: dict) -> Dict[str, Scenario]:
+    """Build the request factories for a database seeded with the given sizes."""
+    users, roles, recipes = sizes["users"], sizes["roles"], sizes["recipes"]
+    words = ["egg", "milk", "flour", "salt", "sugar", "butter", "tomato", "rice"]
+    run = f"{time.time_ns():x}"
+    return {
+        "users_get": lambda rng, _: ("GET", f"/users/{rng.randint(1, users)}", {}),
+        "users_list": lambda rng, _: (
+            "GET", "/users/", {"params": {"after": rng.randint(0, users), "limit": 100}}
+        ),
+        "users_create": lambda rng, number: (
+            "POST",
+            "/users/",
+            {
+                "params": {
+                    "name": f"load {number}",
+                    "email": f"load-{run}-{number}@example.com",
+                    "password": "load-test-password",
+                    "role_id": rng.randint(1, roles),
+                }
+            },
+        ),
+        "roles_get": lambda rng, _: ("GET", f"/roles/{rng.randint(1, roles)}", {}),
+        "async_users_get": lambda rng, _: ("GET", f"/async/users/{rng.randint(1, users)}", {}),
+        "async_roles_get": lambda rng, _: ("GET", f"/async/roles/{rng.randint(1, roles)}", {}),
+        "recipes_get": lambda rng, _: ("GET", f"/recipes/{rng.randint(1, recipes)}", {}),
+        "recipes_list": lambda rng, _: (
+            "GET", "/recipes/", {"params": {"after": rng.randint(0, recipes), "limit": 100}}
+        ),
+        "recipes_search": lambda rng, _: (
+            "GET", "/recipes/search", {"params": {"q": " ".join(rng.sample(words, 2))}}
+        ),
+        "suggestions_get": lambda rng, _: ("GET", f"/suggestions/{rng.randint(1, users)}", {}),
+    }
+
+
+DEFAULT_SCENARIOS = [
+    "users_get",
+    "users_list",
+    "roles_get",
+    "async_users_get",
+    "async_roles_get",
+    "recipes_get",
+    "recipes_list",
+    "recipes_search",
+]
+
+
+def _seed(sizes: dict, seed: int) -> None:
+    """Create the tables and fill an empty database with synthetic data."""
+    # pylint: disable=import-outside-toplevel
+    from peewee import chunked
+    from config.database import (
+        MODELS, CategoryModel, DifficultyModel, IngredientModel, RecipeIngredientModel,
+        RecipeModel, RoleModel, UserModel, connection_scope, database,
+    )
+    from services.password_service import hash_password
+
+    rng = random.Random(seed)
+    with connection_scope():
+        database.create_tables(MODELS)
+        if UserModel.select().exists():
+            return
+        password = hash_password("load-test-password")
+        with database.atomic():
+            RoleModel.insert_many([{"name": f"role {n}"} for n in range(sizes["roles"])]).execute()
+            CategoryModel.insert_many([{"name": f"category {n}"} for n in range(10)]).execute()
+            DifficultyModel.insert_many(
+                [{"name": name} for name in ("easy", "medium", "hard")]
+            ).execute()
+            IngredientModel.insert_many(
+                [{"name": f"ingredient {n}"} for n in range(sizes["ingredients"])]
+            ).execute()
+            words = ["egg", "milk", "flour", "salt", "sugar", "butter", "tomato", "rice"]
+            tables = [
+                (UserModel, (
+                    {
+                        "name": f"user {n}",
+                        "email": f"user{n}@example.com",
+                        "password": password,
+                        "role": rng.randint(1, sizes["roles"]),
+                    }
+                    for n in range(sizes["users"])
+                )),
+                (RecipeModel, (
+                    {
+                        "name": " ".join(rng.sample(words, 3)),
+                        "instruction": " ".join(rng.choices(words, k=30)),
+                        "preparation_time": rng.randint(5, 120),
+                        "difficulty": rng.randint(1, 3),
+                        "category": rng.randint(1, 10),
+                        "user": rng.randint(1, sizes["users"]),
+                    }
+                    for _ in range(sizes["recipes"])
+                )),
+                (RecipeIngredientModel, (
+                    {
+                        "recipe_id": recipe_id,
+                        "ingredient_id": ingredient_id,
+                        "quantity": 1,
+                        "unit": 1,
+                    }
+                    for recipe_id in range(1, sizes["recipes"] + 1)
+                    for ingredient_id in rng.sample(range(1, sizes["ingredients"] + 1), 6)
+                )),
+            ]
+            for model, rows in tables:
+                for chunk in chunked(rows, 500):
+                    model.insert_many(chunk).execute()
+
+
+def _start_server(port: int):
+    """Run `main.app` under uvicorn in a daemon thread and wait until it accepts requests."""
+    # pylint: disable=import-outside-toplevel
+    import uvicorn
+    import main as application
+
+    server = uvicorn.Server(
+        uvicorn.Config(application.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("The server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def _drive(
+    url: str, scenario: Scenario, concurrency: int, duration: float, requests: Optional[int],
+    warmup: int, seed: int,
+) -> Tuple[List[float], int, float]:
+    """Drive one scenario with `concurrency` clients; return the latencies, errors and duration."""
+    import httpx  # pylint: disable=import-outside-toplevel
+
+    latencies: List[float] = []
+    errors = 0
+    sequence = iter(range(1 << 62))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        rng = random.Random(seed)
+        for _ in range(warmup):
+            method, path, kwargs = scenario(rng, next(sequence))
+            await client.request(method, path, **kwargs)
+
+        deadline = time.perf_counter() + duration
+
+        async def _client(worker: int) -> None:
+            nonlocal errors
+            worker_rng = random.Random(seed * 1_000 + worker)
+            while time.perf_counter() < deadline and (
+                requests is None or len(latencies) < requests
+            ):
+                method, path, kwargs = scenario(worker_rng, next(sequence))
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    await response.aread()
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append(time.perf_counter() - start)
+                errors += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_client(worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def _drive_process(
+    url: str, name: str, sizes: dict, concurrency: int, duration: float,
+    requests: Optional[int], warmup: int, seed: int,
+) -> Tuple[List[float], int, float]:
+    """Entry point of a client process; scenarios are rebuilt since they cannot be pickled."""
+    return asyncio.run(
+        _drive(url, _scenarios(sizes)[name], concurrency, duration, requests, warmup, seed)
+    )
+
+
+def _run_scenario(url: str, name: str, sizes: dict, args: argparse.Namespace) -> dict:
+    """Drive one scenario, from several client processes if asked to, and summarize it."""
+    processes = args.client_processes
+    if processes <= 1:
+        latencies, errors, elapsed = asyncio.run(
+            _drive(
+                url, _scenarios(sizes)[name], args.concurrency, args.duration, args.requests,
+                args.warmup, args.seed,
+            )
+        )
+    else:
+        requests = None if args.requests is None else -(-args.requests // processes)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=context) as pool:
+            runs = list(pool.map(
+                _drive_process,
+                [url] * processes,
+                [name] * processes,
+                [sizes] * processes,
+                [args.concurrency // processes] * processes,
+                [args.duration] * processes,
+                [requests] * processes,
+                [args.warmup] * processes,
+                [args.seed + number for number in range(processes)],
+            ))
+        latencies = [latency for run in runs for latency in run[0]]
+        errors = sum(run[1] for run in runs)
+        elapsed = max(run[2] for run in runs)
+
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"requests": 0, "errors": 0}
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "requests_per_second": round(len(ordered) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2),
+        },
+    }
+
+
+def _start_workers(workers: int, port: int) -> subprocess.Popen:
+    """Run `serve.py` with `workers` processes and wait until it accepts requests."""
+    import httpx  # pylint: disable=import-outside-toplevel
+
+    app_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=app_directory,
+        # Keep standard output for the results
+        stdout=sys.stderr,
+    )
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError("The server failed to start")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+
+
+def _stop_workers(process: subprocess.Popen) -> None:
+    """Stop `serve.py` the way the container runtime does, with SIGTERM."""
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=60)
+
+
+def _scaling(runs: Dict[str, dict]) -> dict:
+    """Speedup and efficiency of every worker count against the smallest one."""
+    counts = sorted(runs, key=int)
+    base = counts[0]
+    scaling = {}
+    for name, first in runs[base].items():
+        if not first.get("requests"):
+            continue
+        scaling[name] = {}
+        for count in counts[1:]:
+            current = runs[count].get(name, {})
+            if not current.get("requests"):
+                continue
+            speedup = current["requests_per_second"] / first["requests_per_second"]
+            scaling[name][count] = {
+                "speedup": round(speedup, 2),
+                "efficiency": round(speedup * int(base) / int(count), 2),
+            }
+    return scaling
+
+
+def _compare(results: dict, baseline: dict) -> dict:
+    """Relative change of throughput and p95 latency for the scenarios in both runs."""
+    comparison = {}
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous.get("requests") or not current.get("requests"):
+            continue
+        comparison[name] = {
+            "requests_per_second_change": round(
+                current["requests_per_second"] / previous["requests_per_second"] - 1, 3
+            ),
+            "p95_change": round(
+                current["latency_ms"]["p95"] / previous["latency_ms"]["p95"] - 1, 3
+            ),
+        }
+    return {"baseline": baseline.get("metadata", {}), "scenarios": comparison}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Parse the command line arguments, run the scenarios and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--scenarios", nargs="+", default=DEFAULT_SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--requests", type=int, default=None, help="Stop a scenario earlier")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--ingredients", type=int, default=1_000)
+    parser.add_argument("--sqlite", default=None, help="SQLite file, a temporary one by default")
+    parser.add_argument("--mysql", action="store_true", help="Use the configured MySQL server")
+    parser.add_argument("--url", default=None, help="Target a running server instead")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="Previous results file")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=None,
+        help="Serve with serve.py once per worker count and report the scaling",
+    )
+    parser.add_argument("--client-processes", type=int, default=1)
+    args = parser.parse_args()
+    if args.workers and (args.url or args.compare):
+        parser.error("--workers starts its own servers and cannot be used with --url or --compare")
+    if args.concurrency < args.client_processes:
+        parser.error("--concurrency must be at least --client-processes")
+
+    sizes = {
+        "users": args.users,
+        "roles": args.roles,
+        "recipes": args.recipes,
+        "ingredients": args.ingredients,
+    }
+    unknown = set(args.scenarios) - set(_scenarios(sizes))
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    server = thread = None
+    if args.url:
+        url, database = args.url, "external"
+    else:
+        if not args.mysql:
+            # Must be set before the application modules read the settings
+            os.environ["DATABASE_ENGINE"] = "peewee.SqliteDatabase"
+            os.environ["MYSQL_DATABASE"] = args.sqlite or os.path.join(
+                tempfile.mkdtemp(prefix="load_benchmark_"), "benchmark.db"
+            )
+        database = "mysql" if args.mysql else f"sqlite:{os.environ['MYSQL_DATABASE']}"
+        _seed(sizes, args.seed)
+        if not args.workers:
+            server, thread = _start_server(args.port)
+        url = f"http://127.0.0.1:{args.port}"
+
+    results = {
+        "metadata": {
+            "revision": _git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": database,
+            "concurrency": args.concurrency,
+            "client_processes": args.client_processes,
+            "cpus": os.cpu_count(),
+            "duration": args.duration,
+            **sizes,
+        },
+    }
+    if args.workers:
+        results["workers"] = {}
+        for count in args.workers:
+            process = _start_workers(count, args.port)
+            try:
+                results["workers"][str(count)] = {
+                    name: _run_scenario(url, name, sizes, args) for name in args.scenarios
+                }
+            finally:
+                _stop_workers(process)
+        results["scaling"] = _scaling(results["workers"])
+    else:
+        try:
+            results["scenarios"] = {
+                name: _run_scenario(url, name, sizes, args) for name in args.scenarios
+            }
+        finally:
+            if server is not None:
+                server.should_exit = True
+                thread.join()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            results["comparison"] = _compare(results, json.load(handle))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark for password verification at several cost settings.
+
+Hashes a password with each setting, then verifies it repeatedly on a process
+pool the size of `--workers`, the way `PasswordService` does during logins, and
+reports logins per second in total and per worker process.
+
+Usage:
+    python -m benchmarks.password_benchmark --workers 4 --scrypt-log2-n 13 14 15
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config.settings import PASSWORD_HASHING
+from services.password_service import hash_password, verify_password
+
+
+def main() -> None:
+    """Parse the command line arguments and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--scrypt-log2-n", type=int, nargs="*", default=[13, 14, 15])
+    parser.add_argument("--pbkdf2-iterations", type=int, nargs="*", default=[100_000, 600_000])
+    args = parser.parse_args()
+
+    policies = [
+        {**PASSWORD_HASHING, "algorithm": "scrypt", "scrypt_log2_n": log2_n}
+        for log2_n in args.scrypt_log2_n
+    ] + [
+        {**PASSWORD_HASHING, "algorithm": "pbkdf2_sha256", "pbkdf2_iterations": iterations}
+        for iterations in args.pbkdf2_iterations
+    ]
+
+    results = {"workers": args.workers, "logins": args.logins, "settings": []}
+    with ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        # Start every worker before timing anything
+        list(executor.map(abs, range(args.workers)))
+        for policy in policies:
+            encoded = hash_password("correct horse battery staple", policy)
+
+            start = time.perf_counter()
+            verify_password("correct horse battery staple", encoded)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            futures = [
+                executor.submit(verify_password, "correct horse battery staple", encoded)
+                for _ in range(args.logins)
+            ]
+            assert all(future.result() for future in futures)
+            elapsed = time.perf_counter() - start
+
+            results["settings"].append(
+                {
+                    "parameters": encoded.rsplit("$", 2)[0],
+                    "milliseconds_per_login": round(single * 1000, 2),
+                    "logins_per_second": round(args.logins / elapsed, 1),
+                    "logins_per_second_per_worker": round(args.logins / elapsed / args.workers, 1),
+                }
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for the pooled database connections.
+
+Runs the same short query from an increasing number of threads, each one
+checking out a connection through `connection_scope` exactly like a sync
+route does, and reports the throughput reached at every concurrency level
+together with the pool statistics.
+
+Usage:
+    python -m benchmarks.pool_benchmark --concurrency 1 2 4 8 16 32 --requests 2000
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.database import database, connection_scope, pool_stats
+
+
+def run_request(query: str) -> None:
+    """
+    Simulate one request: check out a connection, run the query, release it.
+
+    Args:
+        query (str): The SQL statement to execute.
+    """
+    with connection_scope():
+        database.execute_sql(query).fetchall()
+
+
+def run_level(concurrency: int, requests: int, query: str) -> dict:
+    """
+    Run `requests` simulated requests using `concurrency` worker threads.
+
+    Args:
+        concurrency (int): Number of threads issuing requests at the same time.
+        requests (int): Total number of requests to issue.
+        query (str): The SQL statement every request executes.
+
+    Returns:
+        dict: The concurrency level, elapsed seconds and requests per second.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(run_request, query) for _ in range(requests)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(requests / elapsed, 1),
+        "pool": pool_stats(),
+    }
+
+
+def main() -> None:
+    """Parse the command line arguments and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--query", default="SELECT 1")
+    args = parser.parse_args()
+
+    results = [run_level(level, args.requests, args.query) for level in args.concurrency]
+    if hasattr(database, "close_all"):
+        database.close_all()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
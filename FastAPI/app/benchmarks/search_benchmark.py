@@ -0,0 +1,82 @@
+"""
+Benchmark for the in-memory full-text recipe search index.
+
+Builds a `SearchIndex` over a synthetic catalogue, without touching the
+database, and reports how long it takes to build, to answer queries with and
+without filters, and to re-index a single edited recipe.
+
+Usage:
+    python -m benchmarks.search_benchmark --recipes 100000 --vocabulary 5000
+"""
+
+import argparse
+import json
+import random
+import time
+from services.search_service import RecipeDocument, SearchIndex
+
+
+def main() -> None:
+    """Parse the command line arguments and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=5_000)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--ingredients", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"word{number}" for number in range(args.vocabulary)]
+
+    def _document(recipe_id: int) -> RecipeDocument:
+        return RecipeDocument(
+            recipe_id=recipe_id,
+            name=" ".join(rng.choices(vocabulary, k=3)),
+            instruction=" ".join(rng.choices(vocabulary, k=args.words)),
+            ingredients=rng.choices(vocabulary, k=args.ingredients),
+            category_id=rng.randint(1, 10),
+            difficulty_id=rng.randint(1, 3),
+            preparation_time=rng.randint(5, 120),
+        )
+
+    documents = [_document(recipe_id) for recipe_id in range(1, args.recipes + 1)]
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for document in documents:
+        index.add(document)
+    index.compact()
+    results = {
+        "recipes": args.recipes,
+        "vocabulary": args.vocabulary,
+        "build_seconds": round(time.perf_counter() - start, 4),
+        "search": [],
+    }
+
+    queries = [" ".join(rng.choices(vocabulary, k=3)) for _ in range(args.rounds)]
+    cases = {
+        "plain": {},
+        "filtered": {"category_id": 1, "max_preparation_time": 30},
+        "ingredient": {"ingredient": vocabulary[0]},
+    }
+    for name, filters in cases.items():
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, args.limit, **filters)
+        elapsed = (time.perf_counter() - start) / args.rounds
+        results["search"].append({"case": name, "milliseconds": round(elapsed * 1000, 3)})
+
+    start = time.perf_counter()
+    for recipe_id in rng.sample(range(1, args.recipes + 1), args.rounds):
+        index.add(_document(recipe_id))
+    elapsed = (time.perf_counter() - start) / args.rounds
+    results["reindex_milliseconds"] = round(elapsed * 1000, 3)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
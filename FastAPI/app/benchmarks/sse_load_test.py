@@ -0,0 +1,249 @@
+"""
+Load test for the notification streams.
+
+Starts the application under uvicorn on a SQLite file seeded with synthetic
+users, opens `--connections` idle Server-Sent Events streams spread over the
+users and reports:
+
+- how long opening the streams took and how many failed,
+- the resident memory of the server process before and after opening them,
+  and per stream, once they have been idle for `--settle` seconds,
+- the delivery latency of `--notifications` notifications written straight
+  into the database by this process, as another worker or `notify_menus.py`
+  would, from the write to their arrival on every stream of their user,
+- the hub statistics of `/system/notification-streams` while the streams are
+  open and once they are closed.
+
+Every stream is a raw socket, so the file descriptor limit is raised to its
+hard maximum; the server inherits it. Memory is read from `/proc`, so the test
+runs on Linux only.
+
+Usage:
+    python -m benchmarks.sse_load_test --connections 10000 --users 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Streams opened at a time, so the listen backlog never overflows
+CONNECT_BATCH = 500
+
+
+def _seed(users: int) -> None:
+    """Create the tables and fill them with synthetic users."""
+    # pylint: disable=import-outside-toplevel
+    from peewee import chunked
+    from config.database import MODELS, RoleModel, UserModel, connection_scope, database
+
+    with connection_scope():
+        database.create_tables(MODELS)
+        with database.atomic():
+            RoleModel.create(name="user")
+            rows = (
+                {"name": f"user {n}", "email": f"user{n}@example.com", "password": "x", "role": 1}
+                for n in range(1, users + 1)
+            )
+            for chunk in chunked(rows, 500):
+                UserModel.insert_many(chunk).execute()
+
+
+def _rss_kib(pid: int) -> int:
+    """Resident memory of a process, in KiB."""
+    with open(f"/proc/{pid}/status", encoding="ascii") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError(f"No VmRSS for process {pid}")
+
+
+async def _get_json(port: int, path: str) -> dict:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def _wait_ready(port: int, process: subprocess.Popen) -> None:
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError("The server exited during startup")
+        try:
+            await _get_json(port, "/system/notification-streams")
+            return
+        except (OSError, ValueError, IndexError):
+            await asyncio.sleep(0.2)
+
+
+class _Stream:
+    """Client side of one SSE stream, recording when each notification arrives"""
+
+    def __init__(self, user_id: int, arrivals: dict):
+        self.user_id = user_id
+        self.arrivals = arrivals
+        self.writer = None
+        self.task = None
+
+    async def open(self, port: int) -> None:
+        """Connect, send the request and wait for the opening `unseen` event."""
+        reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write(
+            f"GET /notifications/stream?user_id={self.user_id} HTTP/1.1\r\n"
+            "Host: test\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(status.decode().strip())
+        while not (await reader.readline()).startswith(b"event: unseen"):
+            pass
+        self.task = asyncio.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            if line.startswith(b"id: "):
+                self.arrivals[int(line[4:])].append(time.perf_counter())
+
+    def close(self) -> None:
+        """Drop the connection without waiting for the server."""
+        if self.task is not None:
+            self.task.cancel()
+        if self.writer is not None:
+            self.writer.transport.abort()
+
+
+async def _run(args, server_pid: int) -> dict:
+    # pylint: disable=import-outside-toplevel
+    from config.database import NotificationModel, TypeNotificationModel, connection_scope
+
+    rng = random.Random(args.seed)
+    results = {"connections": args.connections, "users": args.users}
+    await asyncio.sleep(args.settle)
+    rss_before = _rss_kib(server_pid)
+
+    arrivals = defaultdict(list)
+    streams = [
+        _Stream(n % args.users + 1, arrivals) for n in range(args.connections)
+    ]
+    start = time.perf_counter()
+    failures = 0
+    for offset in range(0, len(streams), CONNECT_BATCH):
+        batch = streams[offset:offset + CONNECT_BATCH]
+        outcomes = await asyncio.gather(
+            *(stream.open(args.port) for stream in batch), return_exceptions=True
+        )
+        failures += sum(isinstance(outcome, Exception) for outcome in outcomes)
+    results["open_seconds"] = round(time.perf_counter() - start, 3)
+    results["failed"] = failures
+
+    await asyncio.sleep(args.settle)
+    rss_after = _rss_kib(server_pid)
+    opened = args.connections - failures
+    results["server_rss_mib"] = {
+        "before": round(rss_before / 1024, 1), "after": round(rss_after / 1024, 1)
+    }
+    results["server_kib_per_stream"] = round((rss_after - rss_before) / max(1, opened), 2)
+    results["hub_open"] = await _get_json(args.port, "/system/notification-streams")
+
+    streams_per_user = defaultdict(int)
+    for stream in streams:
+        if stream.task is not None:
+            streams_per_user[stream.user_id] += 1
+    with connection_scope():
+        type_id = TypeNotificationModel.select(TypeNotificationModel.id).scalar()
+        written = {}
+        for n in range(args.notifications):
+            user_id = rng.randint(1, args.users)
+            notification_id = NotificationModel.insert(
+                user_id=user_id, type=type_id, message=f"load test {n}"
+            ).execute()
+            written[notification_id] = (time.perf_counter(), streams_per_user[user_id])
+            await asyncio.sleep(args.interval)
+
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and any(
+        len(arrivals[notification_id]) < expected
+        for notification_id, (_, expected) in written.items()
+    ):
+        await asyncio.sleep(0.1)
+    latencies = [
+        arrival - written_at
+        for notification_id, (written_at, _) in written.items()
+        for arrival in arrivals[notification_id]
+    ]
+    expected = sum(count for _, count in written.values())
+    results["deliveries"] = {"expected": expected, "received": len(latencies)}
+    if latencies:
+        latencies.sort()
+        results["delivery_latency_ms"] = {
+            "p50": round(statistics.median(latencies) * 1000, 1),
+            "p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1),
+        }
+
+    for stream in streams:
+        stream.close()
+    await asyncio.sleep(2)
+    results["hub_closed"] = await _get_json(args.port, "/system/notification-streams")
+    return results
+
+
+def main() -> None:
+    """Parse the command line arguments, run the load test and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--notifications", type=int, default=200)
+    parser.add_argument(
+        "--interval", type=float, default=0.01, help="Seconds between notifications"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=1.0, help="Seconds between polls of the hub"
+    )
+    parser.add_argument("--settle", type=float, default=3.0, help="Idle seconds before measuring")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < args.connections + 100:
+        parser.error(f"The file descriptor limit ({hard}) is too low for the connections")
+
+    # Must be set before the application modules read the settings, and are
+    # inherited by the server
+    os.environ["DATABASE_ENGINE"] = "peewee.SqliteDatabase"
+    os.environ["MYSQL_DATABASE"] = os.path.join(
+        tempfile.mkdtemp(prefix="sse_load_"), "sse_load.db"
+    )
+    os.environ["SERVER_PRELOAD"] = "false"
+    os.environ["NOTIFICATION_STREAM_POLL_INTERVAL"] = str(args.poll_interval)
+    _seed(args.users)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+         "--backlog", str(2 * CONNECT_BATCH), "--log-level", "warning"],
+        cwd=APP_DIRECTORY,
+    )
+    try:
+        asyncio.run(_wait_ready(args.port, server))
+        results = asyncio.run(_run(args, server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
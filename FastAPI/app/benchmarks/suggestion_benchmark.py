@@ -0,0 +1,60 @@
+"""
+Benchmark for the pantry-driven recipe suggestion index.
+
+Builds an `IngredientIndex` over a synthetic catalogue, without touching the
+database, and reports how long it takes to build and to rank pantries of
+several sizes against it.
+
+Usage:
+    python -m benchmarks.suggestion_benchmark --recipes 100000 --ingredients 2000
+"""
+
+import argparse
+import json
+import random
+import time
+from services.suggestion_service import IngredientIndex
+
+
+def main() -> None:
+    """Parse the command line arguments and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--ingredients", type=int, default=2_000)
+    parser.add_argument("--per-recipe", type=int, default=8)
+    parser.add_argument("--pantry-sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ingredient_ids = range(1, args.ingredients + 1)
+    pairs = [
+        (recipe_id, ingredient_id)
+        for recipe_id in range(1, args.recipes + 1)
+        for ingredient_id in rng.sample(ingredient_ids, args.per_recipe)
+    ]
+
+    start = time.perf_counter()
+    index = IngredientIndex(pairs)
+    results = {
+        "recipes": args.recipes,
+        "ingredients": args.ingredients,
+        "build_seconds": round(time.perf_counter() - start, 4),
+        "rank": [],
+    }
+
+    for size in args.pantry_sizes:
+        pantry = set(rng.sample(ingredient_ids, size))
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            index.rank(pantry, args.limit)
+        elapsed = (time.perf_counter() - start) / args.rounds
+        results["rank"].append({"pantry_size": size, "milliseconds": round(elapsed * 1000, 3)})
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark for the vectorized unit conversion.
+
+Builds a `UnitConverter` over the unit catalogue, without touching the
+database, and reports how long converting `--rows` synthetic (quantity, unit)
+pairs to base units takes, and summing them per ingredient and base unit as a
+shopping list does. The same conversion written as a loop over the rows, run
+on the first `--loop-rows` of them, gives the baseline and checks the results.
+A share of the rows use a unit missing from the catalogue, which the converter
+keeps as it is.
+
+Usage:
+    python -m benchmarks.unit_conversion_benchmark --rows 5000000 --ingredients 2000
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from models.unit import UNIT_CATALOGUE, Unit
+from services.unit_service import UnitConverter
+
+# Not in the catalogue, as a unit written before it existed
+UNKNOWN_UNIT = 99
+
+
+def _best(call, rounds: int) -> float:
+    """Run a call several times and return its fastest duration, in seconds."""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def _loop_to_base(quantities, unit_ids, units: dict, bases: dict) -> tuple:
+    """Convert row by row, looking every unit up in the catalogue."""
+    converted, base_units = [], []
+    for quantity, unit_id in zip(quantities, unit_ids):
+        unit = units.get(unit_id)
+        if unit is None:
+            converted.append(float(quantity))
+            base_units.append(unit_id)
+        else:
+            converted.append(quantity * unit.factor)
+            base_units.append(bases[unit.dimension])
+    return converted, base_units
+
+
+def main() -> None:
+    """Parse the command line arguments and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--ingredients", type=int, default=2_000)
+    parser.add_argument("--unknown-share", type=float, default=0.01)
+    parser.add_argument("--loop-rows", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    units = [Unit(**unit) for unit in UNIT_CATALOGUE]
+    start = time.perf_counter()
+    converter = UnitConverter(units)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(args.seed)
+    unit_ids = rng.choice([unit.id for unit in units], size=args.rows)
+    unit_ids[rng.random(args.rows) < args.unknown_share] = UNKNOWN_UNIT
+    quantities = rng.uniform(0.1, 1000, size=args.rows)
+    keys = rng.integers(1, args.ingredients + 1, size=args.rows)
+
+    to_base = _best(lambda: converter.to_base(quantities, unit_ids), args.rounds)
+    totals = _best(lambda: converter.totals(keys, quantities, unit_ids), args.rounds)
+
+    sample = min(args.loop_rows, args.rows)
+    sample_quantities = quantities[:sample].tolist()
+    sample_units = unit_ids[:sample].tolist()
+    by_id = {unit.id: unit for unit in units}
+    bases = {}
+    for unit in units:
+        if unit.factor == 1:
+            bases.setdefault(unit.dimension, unit.id)
+    loop = _best(
+        lambda: _loop_to_base(sample_quantities, sample_units, by_id, bases), args.rounds
+    )
+    expected = _loop_to_base(sample_quantities, sample_units, by_id, bases)
+    converted, base_units = converter.to_base(quantities[:sample], unit_ids[:sample])
+
+    results = {
+        "rows": args.rows,
+        "ingredients": args.ingredients,
+        "build_milliseconds": round(build_seconds * 1000, 3),
+        "to_base": {
+            "seconds": round(to_base, 4),
+            "rows_per_second": round(args.rows / to_base),
+        },
+        "totals": {
+            "seconds": round(totals, 4),
+            "rows_per_second": round(args.rows / totals),
+            "groups": len(converter.totals(keys, quantities, unit_ids)[0]),
+        },
+        "python_loop": {
+            "rows": sample,
+            "seconds": round(loop, 4),
+            "rows_per_second": round(sample / loop),
+        },
+        "speedup": round((args.rows / to_base) / (sample / loop), 1),
+        "matches_loop": bool(
+            np.allclose(converted, expected[0]) and np.array_equal(base_units, expected[1])
+        ),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+This module provides the asynchronous connection pool used by the async routes.
+
+The queries are still built with the Peewee models from `config.database`, which
+only render SQL and parameters here, and are executed through a native async
+driver: `aiomysql` for MySQL or `aiosqlite` for the SQLite stand-in. Neither call
+blocks the event loop, so async routes never occupy a threadpool worker.
+
+Statements and connection checkouts are timed and reported to `config.query_stats`
+like those of the sync database.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, Optional, Sequence, Tuple
+from config.query_stats import record_pool_wait, record_query
+from config.settings import DATABASE, DATABASE_ASYNC_POOL
+
+
+class AsyncDatabase(ABC):
+    """Base class for the async database backends."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._connected = False
+
+    @abstractmethod
+    async def _open(self) -> None:
+        """Open the pool."""
+
+    @abstractmethod
+    async def _close(self) -> None:
+        """Close the pool and its connections."""
+
+    @abstractmethod
+    def acquire(self):
+        """Return an async context manager yielding a connection from the pool."""
+
+    @abstractmethod
+    async def _run(self, conn, sql: str, params: Sequence[Any], fetch: bool):
+        """Run a statement and return its rows, last inserted row id and row count."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Return the pool usage statistics."""
+
+    async def connect(self) -> None:
+        """Open the pool if it is not open yet."""
+        async with self._lock:
+            if not self._connected:
+                await self._open()
+                self._connected = True
+
+    async def close(self) -> None:
+        """Close the pool and every connection it holds."""
+        async with self._lock:
+            if self._connected:
+                await self._close()
+                self._connected = False
+
+    @asynccontextmanager
+    async def connection(self):
+        """Check out a connection, opening the pool on first use."""
+        start = time.perf_counter()
+        if not self._connected:
+            await self.connect()
+        async with self.acquire() as conn:
+            record_pool_wait(time.perf_counter() - start)
+            yield conn
+
+    async def _timed_run(self, conn, sql: str, params: Sequence[Any], fetch: bool):
+        start = time.perf_counter()
+        try:
+            return await self._run(conn, sql, params, fetch)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+
+    async def fetch_all(self, query: Tuple[str, Sequence[Any]]) -> list:
+        """
+        Run a SELECT and return every row.
+
+        Args:
+            query (Tuple[str, Sequence[Any]]): The SQL and parameters, as returned
+                by `peewee.Query.sql()`.
+
+        Returns:
+            list: The rows as dictionaries keyed by column name or alias.
+        """
+        async with self.connection() as conn:
+            rows, _, _ = await self._timed_run(conn, *query, fetch=True)
+            return rows
+
+    async def fetch_one(self, query: Tuple[str, Sequence[Any]]) -> Optional[dict]:
+        """
+        Run a SELECT and return its first row.
+
+        Args:
+            query (Tuple[str, Sequence[Any]]): The SQL and parameters.
+
+        Returns:
+            Optional[dict]: The first row, or None when there are no rows.
+        """
+        rows = await self.fetch_all(query)
+        return rows[0] if rows else None
+
+    async def execute(self, query: Tuple[str, Sequence[Any]]) -> Tuple[int, int]:
+        """
+        Run an INSERT, UPDATE or DELETE statement in autocommit mode.
+
+        Args:
+            query (Tuple[str, Sequence[Any]]): The SQL and parameters.
+
+        Returns:
+            Tuple[int, int]: The last inserted row id and the number of affected rows.
+        """
+        async with self.connection() as conn:
+            _, lastrowid, rowcount = await self._timed_run(conn, *query, fetch=False)
+            return lastrowid, rowcount
+
+
+class AsyncMySQLDatabase(AsyncDatabase):
+    """Async MySQL backend built on the `aiomysql` connection pool."""
+
+    def __init__(self, settings: dict, pool_settings: dict):
+        super().__init__()
+        self._settings = settings
+        self._pool_settings = pool_settings
+        self._pool = None
+
+    async def _open(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        import aiomysql
+        from pymysql.constants import CLIENT
+
+        self._pool = await aiomysql.create_pool(
+            db=self._settings["name"],
+            user=self._settings["user"],
+            password=self._settings["password"],
+            host=self._settings["host"],
+            port=self._settings["port"],
+            autocommit=True,
+            # Report matched rather than changed rows so updates that keep the
+            # same values still count as found
+            client_flag=CLIENT.FOUND_ROWS,
+            **self._pool_settings,
+        )
+
+    async def _close(self) -> None:
+        self._pool.close()
+        await self._pool.wait_closed()
+        self._pool = None
+
+    def acquire(self):
+        return self._pool.acquire()
+
+    async def _run(self, conn, sql: str, params: Sequence[Any], fetch: bool):
+        # pylint: disable=import-outside-toplevel
+        import aiomysql
+
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(sql, params)
+            rows = list(await cursor.fetchall()) if fetch else []
+            return rows, cursor.lastrowid, cursor.rowcount
+
+    def stats(self) -> dict:
+        if self._pool is None:
+            return {"connected": False}
+        return {
+            "connected": True,
+            "minsize": self._pool.minsize,
+            "maxsize": self._pool.maxsize,
+            "size": self._pool.size,
+            "free": self._pool.freesize,
+        }
+
+
+class AsyncSqliteDatabase(AsyncDatabase):
+    """Async SQLite stand-in built on `aiosqlite`, with a fixed-size connection pool."""
+
+    def __init__(self, path: str, pool_settings: dict):
+        super().__init__()
+        self._path = path
+        self._maxsize = pool_settings["maxsize"]
+        self._queue: Optional[asyncio.Queue] = None
+        self._connections = []
+
+    async def _open(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        import aiosqlite
+
+        self._queue = asyncio.Queue()
+        for _ in range(self._maxsize):
+            conn = await aiosqlite.connect(self._path, isolation_level=None, timeout=30)
+            conn.row_factory = aiosqlite.Row
+            await conn.execute("PRAGMA foreign_keys = 1")
+            self._connections.append(conn)
+            self._queue.put_nowait(conn)
+
+    async def _close(self) -> None:
+        for conn in self._connections:
+            await conn.close()
+        self._connections = []
+        self._queue = None
+
+    @asynccontextmanager
+    async def acquire(self):
+        conn = await self._queue.get()
+        try:
+            yield conn
+        finally:
+            self._queue.put_nowait(conn)
+
+    async def _run(self, conn, sql: str, params: Sequence[Any], fetch: bool):
+        async with conn.execute(sql, params) as cursor:
+            rows = [dict(row) for row in await cursor.fetchall()] if fetch else []
+            return rows, cursor.lastrowid, cursor.rowcount
+
+    def stats(self) -> dict:
+        if self._queue is None:
+            return {"connected": False}
+        return {
+            "connected": True,
+            "minsize": self._maxsize,
+            "maxsize": self._maxsize,
+            "size": len(self._connections),
+            "free": self._queue.qsize(),
+        }
+
+
+# The async backend follows the same engine as the sync database, so the SQL the
+# Peewee models render always matches the driver that executes it
+if DATABASE["engine"] == "peewee.SqliteDatabase":
+    async_database: AsyncDatabase = AsyncSqliteDatabase(DATABASE["name"], DATABASE_ASYNC_POOL)
+else:
+    async_database: AsyncDatabase = AsyncMySQLDatabase(DATABASE, DATABASE_ASYNC_POOL)
@@ -1,27 +1,145 @@
 """
 This module establishes a connection to a MySQL database 
 using Peewee ORM and environment variables.
+
+When `DATABASE_POOL["enabled"]` is set the database is a `PooledMySQLDatabase`,
+so every request checks out its own connection through `connection_scope` and
+returns it to the pool once the request is done.
+
+Every statement and connection checkout is timed and reported to
+`config.query_stats`, which attributes it to the request being served.
 """
 
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from config.settings import DATABASE
+from config.query_stats import record_pool_wait, record_query
+from config.settings import DATABASE, DATABASE_POOL
 from peewee import (
-    MySQLDatabase, Model, AutoField, CharField, ForeignKeyField,
-    DateField, TextField, IntegerField, FloatField, BooleanField
+    MySQLDatabase, SqliteDatabase, Model, AutoField, CharField, ForeignKeyField,
+    DateField, TextField, IntegerField, FloatField, DoubleField, BooleanField, CompositeKey, SQL
 )
+from playhouse.pool import PooledDatabase, PooledMySQLDatabase, PooledSqliteDatabase
 
 
 # Load environment variables from the .env file
 load_dotenv()
 
+
+class InstrumentedDatabase:
+    """Mixin reporting the duration of every statement and connection checkout."""
+
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        """Execute a statement and report how long it took."""
+        start = time.perf_counter()
+        try:
+            return super().execute_sql(sql, params, *args, **kwargs)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+
+    def connect(self, reuse_if_open=False):
+        """Open or check out a connection and report how long it took."""
+        start = time.perf_counter()
+        try:
+            return super().connect(reuse_if_open)
+        finally:
+            record_pool_wait(time.perf_counter() - start)
+
+
+# pylint: disable=too-many-ancestors
+class InstrumentedSqliteDatabase(InstrumentedDatabase, SqliteDatabase):
+    """`SqliteDatabase` reporting to `config.query_stats`."""
+
+
+class InstrumentedPooledSqliteDatabase(InstrumentedDatabase, PooledSqliteDatabase):
+    """`PooledSqliteDatabase` reporting to `config.query_stats`."""
+
+
+class InstrumentedMySQLDatabase(InstrumentedDatabase, MySQLDatabase):
+    """`MySQLDatabase` reporting to `config.query_stats`."""
+
+
+class InstrumentedPooledMySQLDatabase(InstrumentedDatabase, PooledMySQLDatabase):
+    """`PooledMySQLDatabase` reporting to `config.query_stats`."""
+
+
 # Create a MySQL database instance using environment variables
-database = MySQLDatabase(
-    DATABASE["name"],
-    user=DATABASE["user"],
-    passwd=DATABASE["password"],
-    host=DATABASE["host"],
-    port=DATABASE["port"],
-)
+if DATABASE["engine"] == "peewee.SqliteDatabase":
+    # SQLite stand-in for local tests, "name" is the path of the database file
+    if DATABASE_POOL["enabled"]:
+        database = InstrumentedPooledSqliteDatabase(
+            DATABASE["name"],
+            max_connections=DATABASE_POOL["max_connections"],
+            stale_timeout=DATABASE_POOL["stale_timeout"],
+            timeout=DATABASE_POOL["timeout"],
+            pragmas={"foreign_keys": 1},
+            # Pooled connections are handed between threadpool workers
+            check_same_thread=False,
+        )
+    else:
+        database = InstrumentedSqliteDatabase(DATABASE["name"], pragmas={"foreign_keys": 1})
+elif DATABASE_POOL["enabled"]:
+    database = InstrumentedPooledMySQLDatabase(
+        DATABASE["name"],
+        user=DATABASE["user"],
+        passwd=DATABASE["password"],
+        host=DATABASE["host"],
+        port=DATABASE["port"],
+        max_connections=DATABASE_POOL["max_connections"],
+        stale_timeout=DATABASE_POOL["stale_timeout"],
+        timeout=DATABASE_POOL["timeout"],
+    )
+else:
+    database = InstrumentedMySQLDatabase(
+        DATABASE["name"],
+        user=DATABASE["user"],
+        passwd=DATABASE["password"],
+        host=DATABASE["host"],
+        port=DATABASE["port"],
+    )
+
+
+@contextmanager
+def connection_scope():
+    """
+    Check out a connection for the current thread and release it on exit.
+
+    Peewee keeps connection state per thread, so the scope must be entered in
+    the same thread that runs the queries (for sync routes, the threadpool
+    worker). Nested scopes reuse the already open connection and only the
+    outermost one closes it, which returns it to the pool in pooled mode.
+    Can be used as a `with` block or as a decorator (`@connection_scope()`).
+    """
+    if not database.is_closed():
+        yield database
+        return
+    database.connect()
+    try:
+        yield database
+    finally:
+        if not database.is_closed():
+            database.close()
+
+
+def pool_stats() -> dict:
+    """
+    Return a snapshot of the connection pool usage.
+
+    Returns:
+        dict: Whether pooling is enabled, the configured limits and how many
+        connections are currently checked out or idle in the pool.
+    """
+    if not isinstance(database, PooledDatabase):
+        return {"pooled": False}
+    # pylint: disable=protected-access
+    return {
+        "pooled": True,
+        "max_connections": DATABASE_POOL["max_connections"],
+        "stale_timeout": DATABASE_POOL["stale_timeout"],
+        "timeout": DATABASE_POOL["timeout"],
+        "in_use": len(database._in_use),
+        "idle": len(database._connections),
+    }
 
 # pylint: disable=too-few-public-methods
 class RoleModel(Model):
@@ -29,10 +147,12 @@ class RoleModel(Model):
 
     id = AutoField(primary_key=True)
     name = CharField(max_length=100)
+    # Incremented by every write and used as the ETag, see `services.versioning`
+    version = IntegerField(default=1, constraints=[SQL("DEFAULT 1")])
 
     class Meta:
         """Meta information for the RoleModel."""
-        database = DATABASE
+        database = database
         table_name = "roles"
 
 # pylint: disable=too-few-public-methods
@@ -44,10 +164,11 @@ class UserModel(Model):
     email = CharField(max_length=100, unique=True)
     password = CharField(max_length=100)
     role = ForeignKeyField(RoleModel, backref='users', on_delete='CASCADE')
+    version = IntegerField(default=1, constraints=[SQL("DEFAULT 1")])
 
     class Meta:
         """Meta information for the UserModel."""
-        database = DATABASE
+        database = database
         table_name = "users"
 
 # pylint: disable=too-few-public-methods
@@ -59,7 +180,7 @@ class CategoryModel(Model):
 
     class Meta:
         """Meta information for the CategoryModel."""
-        database = DATABASE
+        database = database
         table_name = "categories"
 
 # pylint: disable=too-few-public-methods
@@ -71,7 +192,7 @@ class DifficultyModel(Model):
 
     class Meta:
         """Meta information for the DifficultyModel."""
-        database = DATABASE
+        database = database
         table_name = "difficulties"
 
 # pylint: disable=too-few-public-methods
@@ -86,10 +207,11 @@ class RecipeModel(Model):
     difficulty = ForeignKeyField(DifficultyModel, backref='recipes', on_delete='CASCADE')
     category = ForeignKeyField(CategoryModel, backref='recipes', on_delete='CASCADE')
     user = ForeignKeyField(UserModel, backref='recipes', on_delete='CASCADE')
+    version = IntegerField(default=1, constraints=[SQL("DEFAULT 1")])
 
     class Meta:
         """Meta information for the RecipeModel."""
-        database = DATABASE
+        database = database
         table_name = "recipes"
 
 # pylint: disable=too-few-public-methods
@@ -101,7 +223,7 @@ class GroupModel(Model):
 
     class Meta:
         """Meta information for the GroupModel."""
-        database = DATABASE
+        database = database
         table_name = "groups"
 
 # pylint: disable=too-few-public-methods
@@ -113,7 +235,7 @@ class IngredientModel(Model):
 
     class Meta:
         """Meta information for the IngredientModel."""
-        database = DATABASE
+        database = database
         table_name = "ingredients"
 
 # pylint: disable=too-few-public-methods
@@ -123,24 +245,34 @@ class MenuModel(Model):
     id = AutoField(primary_key=True)
     name = CharField(max_length=100)
     date = DateField()  # Consider using DateField for proper date handling
-    user_id = ForeignKeyField(UserModel, backref='menus', on_delete='CASCADE')
+    user_id = ForeignKeyField(UserModel, backref='menus', on_delete='CASCADE', index=False)
 
     class Meta:
         """Meta information for the MenuModel."""
-        database = DATABASE
+        database = database
         table_name = "menus"
+        # Serves the menus of a user, and the calendar of a user by date range
+        indexes = ((("user_id", "date"), False),)
 
+# Junction tables are keyed by their pair of foreign keys, which serves lookups by
+# the first one, and a reverse index serves lookups by the second one. Neither
+# foreign key needs an index of its own.
 # pylint: disable=too-few-public-methods
 class MenuRecipeModel(Model):
     """Represents the association between a menu and a recipe."""
 
-    menu_id = ForeignKeyField(MenuModel, backref='menu_recipes', on_delete='CASCADE')
-    recipe_id = ForeignKeyField(RecipeModel, backref='menu_recipes', on_delete='CASCADE')
+    menu_id = ForeignKeyField(MenuModel, backref='menu_recipes', on_delete='CASCADE',
+    index=False)
+    recipe_id = ForeignKeyField(RecipeModel, backref='menu_recipes', on_delete='CASCADE',
+    index=False)
 
     class Meta:
         """Meta information for the MenuRecipeModel."""
-        database = DATABASE
+        database = database
         table_name = "menu_recipes"
+        primary_key = CompositeKey("menu_id", "recipe_id")
+        # Menus that include a recipe
+        indexes = ((("recipe_id", "menu_id"), False),)
 
 # pylint: disable=too-few-public-methods
 class TypeNotificationModel(Model):
@@ -152,7 +284,7 @@ class TypeNotificationModel(Model):
 
     class Meta:
         """Meta information for the TypeNotificationModel."""
-        database = DATABASE
+        database = database
         table_name = "type_notifications"
 
 # pylint: disable=too-few-public-methods
@@ -160,14 +292,34 @@ class NotificationModel(Model):
     """Represents a notification with attributes such as user, type, and message."""
 
     id = AutoField(primary_key=True)
-    user_id = ForeignKeyField(UserModel, backref='notifications', on_delete='CASCADE')
+    user_id = ForeignKeyField(
+        UserModel, backref='notifications', on_delete='CASCADE', index=False
+    )
     type = ForeignKeyField(TypeNotificationModel, backref='notifications', on_delete='CASCADE')
     message = TextField()
+    seen = BooleanField(default=False, constraints=[SQL("DEFAULT 0")])
 
     class Meta:
         """Meta information for the NotificationModel."""
-        database = DATABASE
+        database = database
         table_name = "notifications"
+        # Serves the notifications of a user and the count of the unseen ones
+        indexes = ((("user_id", "seen"), False),)
+
+# pylint: disable=too-few-public-methods
+class UnitModel(Model):
+    """Represents a unit of measure with its dimension and its factor to the base unit."""
+
+    id = AutoField(primary_key=True)
+    code = CharField(max_length=20, unique=True)
+    name = CharField(max_length=50)
+    dimension = CharField(max_length=20)  # mass, volume or count
+    factor = DoubleField()  # Cantidad de la unidad base que equivale a una unidad
+
+    class Meta:
+        """Meta information for the UnitModel."""
+        database = database
+        table_name = "units"
 
 # pylint: disable=too-few-public-methods
 class PantryModel(Model):
@@ -178,7 +330,7 @@ class PantryModel(Model):
 
     class Meta:
         """Meta information for the PantryModel."""
-        database = DATABASE
+        database = database
         table_name = "pantries"
 
 # pylint: disable=too-few-public-methods
@@ -190,7 +342,7 @@ class ProductModel(Model):
 
     class Meta:
         """Meta information for the ProductModel."""
-        database = DATABASE
+        database = database
         table_name = "products"
 
 # pylint: disable=too-few-public-methods
@@ -198,31 +350,44 @@ class PantryProductModel(Model):
     """Represents a product in a pantry with attributes such as pantry, product,
      quantity, and unit."""
 
-    pantry_id = ForeignKeyField(PantryModel, backref='pantry_products', on_delete='CASCADE')
-    product_id = ForeignKeyField(ProductModel, backref='pantry_products', on_delete='CASCADE')
+    pantry_id = ForeignKeyField(PantryModel, backref='pantry_products', on_delete='CASCADE',
+    index=False)
+    product_id = ForeignKeyField(ProductModel, backref='pantry_products', on_delete='CASCADE',
+    index=False)
     quantity = FloatField()  # Para manejar cantidades decimales
-    unit = IntegerField()     # Puedes definir un modelo separado para unidades si es necesario
+    # ID of a `UnitModel`, always the base unit of its dimension; not a foreign
+    # key, as older rows may hold numbers missing from the catalogue
+    unit = IntegerField()
 
     class Meta:
         """Meta information for the PantryProductModel."""
-        database = DATABASE
+        database = database
         table_name = "pantry_products"
+        primary_key = CompositeKey("pantry_id", "product_id")
+        # Pantries that hold a product
+        indexes = ((("product_id", "pantry_id"), False),)
 
 # pylint: disable=too-few-public-methods
 class RecipeIngredientModel(Model):
     """Represents the association between a recipe and an ingredient with attributes such as
      recipe, ingredient, quantity, and unit."""
 
-    recipe_id = ForeignKeyField(RecipeModel, backref='recipe_ingredients', on_delete='CASCADE')
+    recipe_id = ForeignKeyField(RecipeModel, backref='recipe_ingredients', on_delete='CASCADE',
+    index=False)
     ingredient_id = ForeignKeyField(IngredientModel, backref='recipe_ingredients',
-    on_delete='CASCADE')
+    on_delete='CASCADE', index=False)
     quantity = IntegerField()  # Para manejar la cantidad del ingrediente
-    unit = FloatField()        # Puedes definir un modelo separado para unidades si es necesario
+    # ID of a `UnitModel`, in whatever unit the recipe was written; not a
+    # foreign key, as older rows may hold numbers missing from the catalogue
+    unit = FloatField()
 
     class Meta:
         """Meta information for the RecipeIngredientModel."""
-        database = DATABASE
+        database = database
         table_name = "recipe_ingredients"
+        primary_key = CompositeKey("recipe_id", "ingredient_id")
+        # Recipes that use an ingredient
+        indexes = ((("ingredient_id", "recipe_id"), False),)
 
 # pylint: disable=too-few-public-methods
 class ShoppingListModel(Model):
@@ -233,7 +398,7 @@ class ShoppingListModel(Model):
 
     class Meta:
         """Meta information for the ShoppingListModel."""
-        database = DATABASE
+        database = database
         table_name = "shopping_lists"
 
 # pylint: disable=too-few-public-methods
@@ -242,16 +407,22 @@ class ShoppingListIngredientModel(Model):
     attributes such as shopping list, ingredient, quantity, and purchased status."""
 
     shopping_list_id = ForeignKeyField(ShoppingListModel,
-    backref='shopping_list_ingredients', on_delete='CASCADE')
+    backref='shopping_list_ingredients', on_delete='CASCADE', index=False)
     ingredient_id = ForeignKeyField(IngredientModel, backref='shopping_list_ingredients',
-    on_delete='CASCADE')
+    on_delete='CASCADE', index=False)
     quantity = FloatField()  # Para manejar cantidades decimales
+    # Base unit of the quantity; an ingredient needed by mass and by volume
+    # has a row for each
+    unit = IntegerField(constraints=[SQL("DEFAULT 1")])
     purchased = BooleanField(default=False)  # Estado de compra del ingrediente
 
     class Meta:
         """Meta information for the ShoppingListIngredientModel."""
-        database = DATABASE
+        database = database
         table_name = "shopping_list_ingredients"
+        primary_key = CompositeKey("shopping_list_id", "ingredient_id", "unit")
+        # Shopping lists that include an ingredient
+        indexes = ((("ingredient_id", "shopping_list_id"), False),)
 
 # pylint: disable=too-few-public-methods
 class SuggestRecipeModel(Model):
@@ -263,7 +434,7 @@ class SuggestRecipeModel(Model):
 
     class Meta:
         """Meta information for the SuggestRecipeModel."""
-        database = DATABASE
+        database = database
         table_name = "suggest_recipes"
 
 # pylint: disable=too-few-public-methods
@@ -272,12 +443,25 @@ class SuggestionRecipeIngredientModel(Model):
     an ingredient with attributes such as suggestion recipe, ingredient, and missing status."""
 
     suggestion_recipe_id = ForeignKeyField(SuggestRecipeModel,
-    backref='suggestion_recipe_ingredients',on_delete='CASCADE')
+    backref='suggestion_recipe_ingredients',on_delete='CASCADE', index=False)
     ingredient_id = ForeignKeyField(IngredientModel,
-    backref='suggestion_recipe_ingredients', on_delete='CASCADE')
+    backref='suggestion_recipe_ingredients', on_delete='CASCADE', index=False)
     missing = BooleanField(default=False)  # Indica si el ingrediente está faltando
 
     class Meta:
         """Meta information for the SuggestionRecipeIngredientModel."""
-        database = DATABASE
+        database = database
         table_name = "suggestion_recipe_ingredients"
+        primary_key = CompositeKey("suggestion_recipe_id", "ingredient_id")
+        # Suggestions that include an ingredient
+        indexes = ((("ingredient_id", "suggestion_recipe_id"), False),)
+
+# All models in dependency order, used to create the schema on a fresh database
+# such as the SQLite stand-in
+MODELS = [
+    RoleModel, UserModel, CategoryModel, DifficultyModel, RecipeModel, GroupModel,
+    IngredientModel, MenuModel, MenuRecipeModel, TypeNotificationModel, NotificationModel,
+    UnitModel, PantryModel, ProductModel, PantryProductModel, RecipeIngredientModel,
+    ShoppingListModel, ShoppingListIngredientModel, SuggestRecipeModel,
+    SuggestionRecipeIngredientModel,
+]
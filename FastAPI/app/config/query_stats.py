@@ -0,0 +1,140 @@
+"""
+This module collects the database activity of the request being served.
+
+`config.database` and `config.async_database` report every statement they run
+and the time spent checking out a connection to `record_query` and
+`record_pool_wait`. While `track_queries()` is active the reports are added to
+a `RequestQueries` held in a context variable; outside of it they are dropped.
+Context variables are copied into the threadpool that runs sync routes and
+streaming iterators, so the queries they run are attributed to their request.
+
+When `QUERY_DIAGNOSTICS["enabled"]` is set, each request also counts its
+statements by fingerprint, the SQL with literals and placeholder lists
+normalised away, and keeps the statements slower than the configured threshold.
+"""
+
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+from config.settings import QUERY_DIAGNOSTICS
+
+# Transaction control, left out of fingerprint counts
+TRANSACTION_STATEMENTS = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """
+    Normalise a statement so that executions differing only in values compare equal.
+
+    Literals and placeholders become `?`, placeholder lists such as the ones of
+    `IN (...)` or multi-row `VALUES` collapse to `(...)`, and whitespace is
+    squeezed.
+
+    Args:
+        sql (str): The statement.
+
+    Returns:
+        str: Its fingerprint.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class RequestQueries:
+    """Database activity of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.slowest_sql: Optional[str] = None
+        self.slowest_seconds = 0.0
+        # Only kept in diagnostic mode
+        self.fingerprints: Optional[Counter] = Counter() if QUERY_DIAGNOSTICS["enabled"] else None
+        self.slow_queries: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add_query(self, sql: str, seconds: float) -> None:
+        """Record one executed statement."""
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            if seconds >= self.slowest_seconds:
+                self.slowest_sql = sql
+                self.slowest_seconds = seconds
+            if self.fingerprints is not None:
+                if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+                    self.fingerprints[fingerprint(sql)] += 1
+                if seconds * 1000 >= QUERY_DIAGNOSTICS["slow_query_ms"]:
+                    self.slow_queries.append((sql, seconds))
+
+    def add_pool_wait(self, seconds: float) -> None:
+        """Record the time spent checking out a connection."""
+        with self._lock:
+            self.pool_wait_seconds += seconds
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def record_query(sql: str, seconds: float) -> None:
+    """
+    Attribute a statement to the request being served, if any.
+
+    Args:
+        sql (str): The statement.
+        seconds (float): How long it took to execute.
+    """
+    queries = _current.get()
+    if queries is not None:
+        queries.add_query(sql, seconds)
+
+
+def record_pool_wait(seconds: float) -> None:
+    """
+    Attribute a connection checkout to the request being served, if any.
+
+    Args:
+        seconds (float): How long it took to get the connection.
+    """
+    queries = _current.get()
+    if queries is not None:
+        queries.add_pool_wait(seconds)
+
+
+@contextmanager
+def track_queries() -> Iterator[RequestQueries]:
+    """
+    Collect the database activity of the enclosed block.
+
+    Nested blocks share the collector of the outermost one.
+
+    Yields:
+        RequestQueries: The counters, updated as statements run.
+    """
+    current = _current.get()
+    if current is not None:
+        yield current
+        return
+    queries = RequestQueries()
+    token = _current.set(queries)
+    try:
+        yield queries
+    finally:
+        _current.reset(token)
@@ -8,11 +8,95 @@ Variables:
     ENV (str): Define el entorno de la aplicación. Por defecto, se asume 'dev' si no se especifica.
     DATABASE (dict): Diccionario con la configuración de la base de datos.
         - name: Nombre de la base de datos.
-        - engine: Motor de la base de datos utilizado.
+        - engine: Motor de la base de datos utilizado. Fuera de producción puede
+          ser 'peewee.SqliteDatabase' para pruebas locales sin MySQL.
         - user: Usuario para la conexión a la base de datos.
         - password: Contraseña para la conexión a la base de datos.
         - host: Dirección del host de la base de datos.
         - port: Puerto utilizado para la conexión a la base de datos.
+    SERVER (dict): Configuración del servidor de producción (`serve.py`).
+        - host: Dirección en la que escucha el servidor.
+        - port: Puerto en el que escucha el servidor.
+        - workers: Procesos que atienden peticiones; por defecto uno por núcleo disponible.
+        - graceful_timeout: Segundos que se esperan las peticiones en curso al recibir SIGTERM.
+        - keep_alive: Segundos que se mantiene abierta una conexión HTTP inactiva.
+        - preload: Construye los índices en memoria al arrancar cada proceso en lugar
+          de en la primera petición que los usa.
+    DB_CONNECTION_BUDGET (int): Conexiones que todos los procesos juntos pueden abrir
+        contra la base de datos; se reparten entre los procesos para dimensionar sus pools.
+    DATABASE_POOL (dict): Configuración del pool de conexiones a la base de datos.
+        - enabled: Indica si se usa un pool de conexiones en lugar de una conexión simple.
+        - max_connections: Número máximo de conexiones abiertas a la vez por proceso.
+        - stale_timeout: Segundos tras los cuales una conexión inactiva se descarta.
+        - timeout: Segundos que una petición espera por una conexión libre antes de fallar.
+    DATABASE_ASYNC_POOL (dict): Configuración del pool del driver asíncrono (aiomysql).
+        - minsize: Número de conexiones que el pool mantiene abiertas.
+        - maxsize: Número máximo de conexiones abiertas a la vez por proceso.
+        - pool_recycle: Segundos tras los cuales una conexión se reemplaza.
+    SEARCH (dict): Configuración de la búsqueda de recetas.
+        - backend: 'memory' para el índice invertido en memoria o 'mysql' para usar
+          un índice FULLTEXT de MySQL.
+    RECIPE_INDEX_SYNC (dict): Sincronización de los índices de recetas en memoria (búsqueda
+    y sugerencias) con las escrituras hechas por otros procesos.
+        - interval: Segundos mínimos entre dos comprobaciones de la tabla de recetas; acota
+          cuánto tarda un proceso en ver una receta creada, editada o borrada por otro.
+    PASSWORD_HASHING (dict): Configuración del hash de contraseñas.
+        - algorithm: 'scrypt' o 'pbkdf2_sha256'.
+        - scrypt_log2_n: Logaritmo en base 2 del coste de CPU y memoria de scrypt.
+        - scrypt_r: Tamaño de bloque de scrypt.
+        - scrypt_p: Paralelismo de scrypt.
+        - pbkdf2_iterations: Número de iteraciones de PBKDF2.
+        - workers: Procesos que calculan los hashes en cada proceso del servidor; 0 los
+          calcula en el hilo que llama.
+        - max_pending: Hashes en cola como máximo; quien llama después espera turno.
+    METRICS (dict): Configuración de las métricas.
+        - enabled: Registra las consultas y la duración de cada petición y las publica
+          en '/metrics' con formato Prometheus.
+    QUERY_DIAGNOSTICS (dict): Modo de diagnóstico de consultas, desactivado por defecto.
+        - enabled: Activa el registro de consultas lentas y la detección de N+1.
+        - slow_query_ms: Milisegundos a partir de los cuales una consulta se registra como lenta.
+        - n_plus_one_threshold: Veces que una petición puede repetir la misma consulta
+          antes de marcarse como N+1.
+        - response_header: Añade las cabeceras 'X-Query-Count' y 'X-N-Plus-One' a las
+          respuestas; por defecto solo fuera de producción.
+    COMPRESSION (dict): Compresión de las respuestas (brotli o gzip, según 'Accept-Encoding').
+        - enabled: Comprime las respuestas JSON, NDJSON y de texto.
+        - minimum_size: Bytes a partir de los cuales una respuesta se comprime.
+        - gzip_level: Nivel de compresión de gzip, de 1 a 9.
+        - brotli_quality: Calidad de brotli, de 0 a 11; los valores bajos son los
+          adecuados para contenido generado en cada petición.
+    NOTIFICATIONS (dict): Cola en memoria de las notificaciones, escritas en lotes en segundo plano.
+        - queue_size: Eventos que la cola admite antes de frenar a quien publica.
+        - batch_size: Filas como máximo por cada inserción.
+        - flush_interval: Segundos que se esperan más eventos para completar un lote.
+        - enqueue_timeout: Segundos que quien publica espera con la cola llena antes de
+          descartar el evento.
+        - shutdown_timeout: Segundos que se espera al vaciar la cola al detener la aplicación.
+    NOTIFICATION_STREAM (dict): Envío de notificaciones en tiempo real por Server-Sent Events.
+        - poll_interval: Segundos entre lecturas de las notificaciones nuevas, escritas
+          por cualquier proceso.
+        - poll_batch_size: Notificaciones leídas como máximo por consulta.
+        - heartbeat: Segundos sin eventos tras los que se envía un comentario para
+          mantener viva la conexión.
+        - max_pending: Eventos sin enviar que una conexión puede acumular antes de cerrarse.
+        - resync_interval: Segundos entre recuentos de las notificaciones no vistas.
+        - replay_limit: Notificaciones reenviadas como máximo al reconectar con 'Last-Event-ID'.
+        - gap_timeout: Segundos durante los que se vuelven a buscar los IDs que el cursor
+          saltó, por si su notificación se confirma más tarde que otras posteriores.
+        - retry_ms: Milisegundos que el cliente espera antes de reconectar.
+    RECIPE_SCALING (dict): Cálculo de cantidades para cocinar varias recetas escaladas.
+        - max_recipes: Recetas distintas que admite un cálculo como máximo.
+        - result_cache_size: Resultados recientes que se guardan, por recetas y multiplicadores.
+        - matrix_cache_size: Conjuntos de recetas cuyos ingredientes se guardan ya
+          convertidos, para recalcular sin consultas cuando solo cambian los multiplicadores.
+        - ttl: Segundos que se conserva una entrada; acota cuánto tarda en notarse una
+          receta borrada por otro proceso.
+    REFERENCE_CACHE (dict): Caché en memoria de las tablas de referencia (roles, categorías,
+    dificultades, tipos de notificación y unidades).
+        - ttl: Segundos tras los que una tabla se recarga en su siguiente consulta; acota
+          cuánto tarda en notarse un cambio hecho por otro proceso.
+        - negative_ttl: Segundos durante los que un ID que no existía tras recargar su
+          tabla se da por inexistente sin volver a consultar la base de datos.
 """
 
 import os
@@ -36,9 +120,117 @@ if ENV == "production":
 else:
     DATABASE = {
         "name": os.getenv("MYSQL_DATABASE"),
-        "engine": "peewee.MySQLDatabase",  # MySQL como motor de base de datos
+        # MySQL por defecto; 'peewee.SqliteDatabase' usa 'name' como ruta del archivo
+        "engine": os.getenv("DATABASE_ENGINE", "peewee.MySQLDatabase"),
         "user": os.getenv("MYSQL_USER"),
         "password": os.getenv("MYSQL_PASSWORD"),
         "host": os.getenv("MYSQL_HOST"),
-        "port": int(os.getenv("MYSQL_PORT")),
+        "port": int(os.getenv("MYSQL_PORT", "3306")),
     }
+
+# Núcleos que este proceso puede usar; en un contenedor pueden ser menos que los de la máquina
+if hasattr(os, "sched_getaffinity"):
+    _CPUS = len(os.sched_getaffinity(0))
+else:
+    _CPUS = os.cpu_count() or 1
+
+SERVER = {
+    "host": os.getenv("SERVER_HOST", "0.0.0.0"),
+    "port": int(os.getenv("SERVER_PORT", "80")),
+    "workers": int(os.getenv("WEB_CONCURRENCY", str(_CPUS))),
+    "graceful_timeout": int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "20")),
+    "keep_alive": int(os.getenv("SERVER_KEEP_ALIVE", "5")),
+    "preload": os.getenv("SERVER_PRELOAD", "true").lower() == "true",
+}
+
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "150"))
+
+# Parte del presupuesto de cada proceso, repartida entre el pool síncrono y el asíncrono
+_WORKER_CONNECTIONS = max(2, DB_CONNECTION_BUDGET // max(1, SERVER["workers"]))
+_SYNC_CONNECTIONS = min(20, _WORKER_CONNECTIONS // 2)
+_ASYNC_CONNECTIONS = min(50, _WORKER_CONNECTIONS - _SYNC_CONNECTIONS)
+
+DATABASE_POOL = {
+    "enabled": os.getenv("DB_POOL_ENABLED", "true").lower() == "true",
+    "max_connections": int(os.getenv("DB_POOL_MAX_CONNECTIONS", str(_SYNC_CONNECTIONS))),
+    "stale_timeout": int(os.getenv("DB_POOL_STALE_TIMEOUT", "300")),
+    "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+}
+
+DATABASE_ASYNC_POOL = {
+    "minsize": int(os.getenv("DB_ASYNC_POOL_MINSIZE", "1")),
+    "maxsize": int(os.getenv("DB_ASYNC_POOL_MAXSIZE", str(_ASYNC_CONNECTIONS))),
+    "pool_recycle": int(os.getenv("DB_ASYNC_POOL_RECYCLE", "300")),
+}
+
+SEARCH = {
+    "backend": os.getenv("SEARCH_BACKEND", "memory"),
+}
+
+RECIPE_INDEX_SYNC = {
+    "interval": float(os.getenv("RECIPE_INDEX_SYNC_INTERVAL", "5")),
+}
+
+_PASSWORD_WORKERS = max(1, _CPUS // max(1, SERVER["workers"]))
+
+PASSWORD_HASHING = {
+    "algorithm": os.getenv("PASSWORD_ALGORITHM", "scrypt"),
+    "scrypt_log2_n": int(os.getenv("PASSWORD_SCRYPT_LOG2_N", "14")),
+    "scrypt_r": int(os.getenv("PASSWORD_SCRYPT_R", "8")),
+    "scrypt_p": int(os.getenv("PASSWORD_SCRYPT_P", "1")),
+    "pbkdf2_iterations": int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "600000")),
+    # Los núcleos se reparten entre los procesos del servidor
+    "workers": int(os.getenv("PASSWORD_WORKERS", str(_PASSWORD_WORKERS))),
+    "max_pending": int(os.getenv("PASSWORD_MAX_PENDING", str(4 * max(1, _PASSWORD_WORKERS)))),
+}
+
+METRICS = {
+    "enabled": os.getenv("METRICS_ENABLED", "true").lower() == "true",
+}
+
+QUERY_DIAGNOSTICS = {
+    "enabled": os.getenv("QUERY_DIAGNOSTICS_ENABLED", "false").lower() == "true",
+    "slow_query_ms": float(os.getenv("SLOW_QUERY_MS", "100")),
+    "n_plus_one_threshold": int(os.getenv("N_PLUS_ONE_THRESHOLD", "5")),
+    "response_header": os.getenv(
+        "QUERY_DIAGNOSTICS_HEADER", str(ENV != "production")
+    ).lower() == "true",
+}
+
+COMPRESSION = {
+    "enabled": os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",
+    "minimum_size": int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+    "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+}
+
+NOTIFICATIONS = {
+    "queue_size": int(os.getenv("NOTIFICATION_QUEUE_SIZE", "10000")),
+    "batch_size": int(os.getenv("NOTIFICATION_BATCH_SIZE", "500")),
+    "flush_interval": float(os.getenv("NOTIFICATION_FLUSH_INTERVAL", "0.2")),
+    "enqueue_timeout": float(os.getenv("NOTIFICATION_ENQUEUE_TIMEOUT", "1.0")),
+    "shutdown_timeout": float(os.getenv("NOTIFICATION_SHUTDOWN_TIMEOUT", "10")),
+}
+
+NOTIFICATION_STREAM = {
+    "poll_interval": float(os.getenv("NOTIFICATION_STREAM_POLL_INTERVAL", "1.0")),
+    "poll_batch_size": int(os.getenv("NOTIFICATION_STREAM_POLL_BATCH_SIZE", "1000")),
+    "heartbeat": float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15")),
+    "max_pending": int(os.getenv("NOTIFICATION_STREAM_MAX_PENDING", "256")),
+    "resync_interval": float(os.getenv("NOTIFICATION_STREAM_RESYNC_INTERVAL", "60")),
+    "replay_limit": int(os.getenv("NOTIFICATION_STREAM_REPLAY_LIMIT", "500")),
+    "gap_timeout": float(os.getenv("NOTIFICATION_STREAM_GAP_TIMEOUT", "10")),
+    "retry_ms": int(os.getenv("NOTIFICATION_STREAM_RETRY_MS", "3000")),
+}
+
+RECIPE_SCALING = {
+    "max_recipes": int(os.getenv("RECIPE_SCALING_MAX_RECIPES", "200")),
+    "result_cache_size": int(os.getenv("RECIPE_SCALING_RESULT_CACHE_SIZE", "1024")),
+    "matrix_cache_size": int(os.getenv("RECIPE_SCALING_MATRIX_CACHE_SIZE", "256")),
+    "ttl": float(os.getenv("RECIPE_SCALING_TTL", "300")),
+}
+
+REFERENCE_CACHE = {
+    "ttl": float(os.getenv("REFERENCE_CACHE_TTL", "30")),
+    "negative_ttl": float(os.getenv("REFERENCE_CACHE_NEGATIVE_TTL", "5")),
+}
@@ -0,0 +1,20 @@
+"""
+Root pytest configuration.
+
+The tests run against a throwaway SQLite database, the stand-in for MySQL that
+`config.database` supports, so the environment is set here, before anything
+imports `config.settings`. The reference tables are never reloaded during a
+run, which keeps query counts exact.
+
+`testing.pytest_plugin` makes a test fail when a request it sends repeats a
+statement more than `N_PLUS_ONE_THRESHOLD` times.
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_ENGINE"] = "peewee.SqliteDatabase"
+os.environ["MYSQL_DATABASE"] = os.path.join(tempfile.mkdtemp(prefix="recipes-tests-"), "test.db")
+os.environ["REFERENCE_CACHE_TTL"] = "3600"
+
+pytest_plugins = ["pytester", "testing.pytest_plugin"]
@@ -0,0 +1,49 @@
+"""
+Command line entry point for exporting the recipe catalogue.
+
+Streams recipes with their category, difficulty and ingredients to a file, or to
+standard output, and reports the throughput as JSON on standard error.
+
+Usage:
+    python export_recipes.py --format csv --gzip --output recipes.csv.gz
+"""
+
+import argparse
+import json
+import sys
+import time
+from config.database import connection_scope
+from services.export_service import EXPORT_FORMATS, ExportService
+from services.reference_cache import ReferenceCache
+
+
+def main() -> None:
+    """Parse the command line arguments and run the export."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", default="-", help="File to write, '-' for standard output")
+    args = parser.parse_args()
+
+    with connection_scope():
+        ReferenceCache.load()
+
+    stats = {}
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    start = time.perf_counter()
+    try:
+        for chunk in ExportService.export_recipes(args.format, args.user_id, args.gzip, stats):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    stats["seconds"] = round(elapsed, 4)
+    stats["rows_per_second"] = round(stats["rows"] / elapsed) if elapsed else None
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
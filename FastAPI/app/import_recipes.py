@@ -0,0 +1,74 @@
+"""
+Command line entry point for bulk-loading recipe datasets.
+
+Reads NDJSON, JSON or CSV, optionally gzip-compressed, and imports it in batched
+transactions, printing progress and the final counters as JSON on standard error.
+Run it again with the same checkpoint to resume an interrupted import.
+
+Usage:
+    python import_recipes.py recipes.ndjson.gz --user-id 1 --checkpoint recipes.ckpt
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from services import import_service
+from services.import_service import IMPORT_FORMATS, ImportService, read_records
+
+
+def _guess_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lstrip(".")
+    return extension if extension in IMPORT_FORMATS else "ndjson"
+
+
+def main() -> None:
+    """Parse the command line arguments and run the import."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("input", help="File to read, '-' for standard input")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None)
+    parser.add_argument("--user-id", type=int, default=None, help="Author of records without one")
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--batch-size", type=int, default=import_service.IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    import_service.IMPORT_BATCH_SIZE = args.batch_size
+    import_format = args.format or _guess_format(args.input)
+    if args.input == "-":
+        stream = sys.stdin
+    elif args.input.endswith(".gz"):
+        stream = gzip.open(args.input, "rt", encoding="utf-8", newline="")
+    else:
+        stream = open(args.input, encoding="utf-8", newline="")
+
+    start = time.perf_counter()
+    resumed_from = {}
+
+    def _report(stats: dict) -> None:
+        resumed_from.setdefault("rows", stats["recipes"] + stats["ingredients"] + stats["links"])
+        elapsed = time.perf_counter() - start
+        rows = stats["recipes"] + stats["ingredients"] + stats["links"] - resumed_from["rows"]
+        progress = {key: stats[key] for key in ("records", "recipes", "links", "skipped")}
+        progress["seconds"] = round(elapsed, 2)
+        progress["rows_per_second"] = round(rows / elapsed) if elapsed else None
+        print(json.dumps(progress), file=sys.stderr)
+
+    try:
+        stats = ImportService.import_recipes(
+            read_records(stream, import_format),
+            os.path.abspath(args.input) if args.input != "-" else "-",
+            args.user_id,
+            args.checkpoint,
+            _report,
+        )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
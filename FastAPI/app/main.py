@@ -4,13 +4,46 @@ Main FastAPI application with database connection handling.
 This module initializes the FastAPI application and sets up the database
 connection management using an asynchronous lifespan function. It also
 redirects the root path to the API documentation.
+
+Connections are not held for the lifetime of the application: each request
+checks one out through `config.database.connection_scope`, and the lifespan
+only releases whatever the pool still holds when the application stops. The
+async routes use their own pool from `config.async_database`, opened at startup,
+which the notification worker of `services.notification_queue` writes through.
+
+Responses are rendered with orjson through `ORJSONResponse` and, with
+`COMPRESSION["enabled"]`, compressed with brotli or gzip by `CompressionMiddleware`.
 """
 
 from contextlib import asynccontextmanager
-from config.database import database as connection
+from config.database import database as connection, connection_scope
+from config.async_database import async_database
 from routes import role_routes
 from routes import user_routes
+from routes import async_role_routes
+from routes import async_user_routes
+from routes import recipe_routes
+from routes import menu_routes
+from routes import notification_routes
+from routes import pantry_routes
+from routes import shopping_list_routes
+from routes import suggestion_routes
+from routes import unit_routes
+from routes import system_routes
+from routes import metrics_routes
+from middleware.query_metrics import QueryMetricsMiddleware
+from middleware.query_diagnostics import QueryDiagnosticsMiddleware
+from middleware.compression import CompressionMiddleware
+from config.settings import COMPRESSION, METRICS, QUERY_DIAGNOSTICS, SERVER
+from services.notification_hub import NotificationHub
+from services.notification_queue import NotificationQueue
+from services.password_service import PasswordService
+from services.reference_cache import ReferenceCache
+from services.search_service import MySQLFullTextSearch, SearchService
+from services.suggestion_service import SuggestionService
+from services.unit_service import UnitService
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 
 @asynccontextmanager
@@ -19,8 +52,15 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for handling database connections.
 
-    Ensures the database connection is established when the application starts
-    and closed when the application stops.
+    Preloads the reference tables into the `ReferenceCache`, adding the units
+    of the catalogue that are missing, and with `SERVER["preload"]` the
+    in-memory search and suggestion indexes, so the first requests of every
+    worker do not pay for them. Creates the FULLTEXT
+    index when search runs on MySQL, opens the async connection pool and starts
+    the notification worker and stream hub when the application starts. When
+    it stops, the notification queue is drained first, the streams still open
+    are ended, then every database connection, sync or async, and the password
+    hashing processes are closed.
 
     Args:
         app (FastAPI): The FastAPI application instance.
@@ -28,20 +68,55 @@ async def lifespan(app: FastAPI):
     Yields:
         None: Control is passed to the FastAPI application execution.
     """
-    # Conectar a la base de datos si la conexión está cerrada
-    if connection.is_closed():
-        connection.connect()
+    with connection_scope():
+        ReferenceCache.load()
+        UnitService.ensure_units()
+        if not SearchService.uses_memory_index():
+            MySQLFullTextSearch.ensure_index()
+        elif SERVER["preload"]:
+            SearchService.get_index()
+        if SERVER["preload"]:
+            SuggestionService.get_index()
+        NotificationQueue.ensure_types()
+    await async_database.connect()
+    await NotificationQueue.start()
+    await NotificationHub.start()
     try:
         yield  # Aquí es donde se ejecutará la aplicación
     finally:
-        # Cerrar la conexión cuando la aplicación se detenga
-        if not connection.is_closed():
+        await NotificationQueue.stop()
+        await NotificationHub.stop()
+        PasswordService.shutdown()
+        await async_database.close()
+        # Cerrar las conexiones cuando la aplicación se detenga
+        if hasattr(connection, "close_all"):
+            connection.close_all()
+        elif not connection.is_closed():
             connection.close()
 
 
 # Crear la instancia de la aplicación FastAPI con el lifespan para gestionar
 # la conexión a la base de datos
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(role_routes.router)
 app.include_router(user_routes.router)
+app.include_router(async_role_routes.router)
+app.include_router(async_user_routes.router)
+app.include_router(recipe_routes.router)
+app.include_router(menu_routes.router)
+app.include_router(notification_routes.router)
+app.include_router(pantry_routes.router)
+app.include_router(shopping_list_routes.router)
+app.include_router(suggestion_routes.router)
+app.include_router(unit_routes.router)
+app.include_router(system_routes.router)
+app.include_router(metrics_routes.router)
+
+# Added first, so it is the innermost and the metrics time the compression as well
+if COMPRESSION["enabled"]:
+    app.add_middleware(CompressionMiddleware)
+if QUERY_DIAGNOSTICS["enabled"]:
+    app.add_middleware(QueryDiagnosticsMiddleware)
+if METRICS["enabled"]:
+    app.add_middleware(QueryMetricsMiddleware)
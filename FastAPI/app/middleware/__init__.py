@@ -0,0 +1,7 @@
+"""
+ASGI middleware for the Recipe_Master backend.
+
+Modules:
+    - query_metrics: Per-request database query instrumentation.
+    - query_diagnostics: Slow-query log and N+1 detector.
+"""
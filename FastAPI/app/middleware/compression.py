@@ -0,0 +1,140 @@
+# app/middleware/compression.py
+
+"""
+Response compression with brotli and gzip.
+
+`CompressionMiddleware` picks the encoding from `Accept-Encoding`, brotli first
+when the client accepts both, and compresses JSON, NDJSON and text responses of
+at least `COMPRESSION["minimum_size"]` bytes. Smaller bodies are sent as they
+are, since the framing would eat most of the gain.
+
+Streamed responses, such as the keyset pages and the exports, are compressed
+chunk by chunk and every chunk is flushed, so the client still receives each
+batch as soon as it is serialized. Responses that already carry a
+`Content-Encoding`, such as the gzip export, and event streams are passed
+through untouched.
+
+The `ETag` header is kept as is: it identifies the version of the entity, not
+the bytes on the wire, and clients send it back decoded.
+"""
+
+import zlib
+from typing import Optional
+import brotli
+from config.settings import COMPRESSION
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an `Accept-Encoding` header.
+
+    Args:
+        accept_encoding (str): The header value, for example `gzip, deflate, br`.
+
+    Returns:
+        Optional[str]: "br", "gzip", or None when the client accepts neither.
+    """
+    accepted = set()
+    for entry in accept_encoding.lower().split(","):
+        coding, _, params = entry.partition(";")
+        try:
+            quality = float(params.strip().removeprefix("q=") or 1)
+        except ValueError:
+            quality = 1.0
+        # q=0 explicitly refuses the coding
+        if quality > 0:
+            accepted.add(coding.strip())
+    for coding in ("br", "gzip"):
+        if coding in accepted:
+            return coding
+    return None
+
+
+class _Compressor:
+    """Incremental brotli or gzip compressor that can flush after every chunk"""
+
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION["brotli_quality"])
+        else:
+            self._zlib = zlib.compressobj(COMPRESSION["gzip_level"], zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk and flush it, ending the stream when `final` is set."""
+        if self.coding == "br":
+            if final:
+                return self._brotli.process(data) + self._brotli.finish()
+            return self._brotli.process(data) + self._brotli.flush()
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._zlib.compress(data) + self._zlib.flush(flush_mode)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with the encoding the client prefers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        coding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def _send(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                response_headers = dict(start.get("headers", []))
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    b"content-encoding" in response_headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or content_type.startswith(EXCLUDED_TYPES)
+                    or (not more_body and len(body) < COMPRESSION["minimum_size"])
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(coding)
+                data = compressor.compress(body, final=not more_body)
+                kept = [
+                    (name, value)
+                    for name, value in start.get("headers", [])
+                    if name.lower() not in (b"content-length", b"vary")
+                ]
+                vary = response_headers.get(b"vary")
+                kept.append((b"content-encoding", coding.encode()))
+                kept.append(
+                    (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding")
+                )
+                if not more_body:
+                    kept.append((b"content-length", str(len(data)).encode()))
+                await send({**start, "headers": kept})
+            else:
+                data = compressor.compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,143 @@
+# app/middleware/query_diagnostics.py
+
+"""
+Slow-query log and N+1 detector.
+
+Opt-in through `QUERY_DIAGNOSTICS["enabled"]`. For every HTTP request,
+`QueryDiagnosticsMiddleware` logs:
+
+- each statement slower than `slow_query_ms`, with its route,
+- each statement fingerprint run more than `n_plus_one_threshold` times, the
+  signature of a relation loaded lazily inside a loop, such as reading
+  `UserModel.role` for every user of a list.
+
+With `response_header` set, which is the default outside production, the
+response also carries `X-Query-Count` and, when flagged, `X-N-Plus-One`. The
+headers are sent before a streamed body, so for streaming routes they only
+cover the statements run until then; the log always covers the whole request.
+Other code, such as `testing.pytest_plugin`, can subscribe to the flags with
+`QueryDiagnostics.add_listener`.
+"""
+
+import logging
+import threading
+from typing import Callable, List
+from config.query_stats import RequestQueries, track_queries
+from config.settings import QUERY_DIAGNOSTICS
+from middleware.query_metrics import UNMATCHED_ROUTE
+
+logger = logging.getLogger(__name__)
+
+# Longest fingerprint sent in the `X-N-Plus-One` header
+MAX_HEADER_LENGTH = 200
+
+
+class QueryDiagnostics:
+    """Evaluates requests against the diagnostic thresholds and notifies listeners"""
+
+    _listeners: List[Callable[[dict], None]] = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def add_listener(listener: Callable[[dict], None]) -> None:
+        """
+        Subscribe to N+1 flags.
+
+        Args:
+            listener (Callable[[dict], None]): Called with the method, route,
+                fingerprint and count of every flagged statement.
+        """
+        with QueryDiagnostics._lock:
+            QueryDiagnostics._listeners.append(listener)
+
+    @staticmethod
+    def remove_listener(listener: Callable[[dict], None]) -> None:
+        """
+        Unsubscribe a listener added with `add_listener`.
+
+        Args:
+            listener (Callable[[dict], None]): The listener to remove.
+        """
+        with QueryDiagnostics._lock:
+            QueryDiagnostics._listeners.remove(listener)
+
+    @staticmethod
+    def n_plus_one(queries: RequestQueries) -> List[tuple]:
+        """
+        Return the fingerprints a request repeated more often than allowed.
+
+        Args:
+            queries (RequestQueries): The database activity of the request.
+
+        Returns:
+            List[tuple]: (fingerprint, count) pairs, most repeated first.
+        """
+        if not queries.fingerprints:
+            return []
+        threshold = QUERY_DIAGNOSTICS["n_plus_one_threshold"]
+        return [
+            (statement, count)
+            for statement, count in queries.fingerprints.most_common()
+            if count > threshold
+        ]
+
+    @staticmethod
+    def report(method: str, route: str, queries: RequestQueries) -> None:
+        """
+        Log the slow statements and N+1 patterns of a finished request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route template.
+            queries (RequestQueries): The database activity of the request.
+        """
+        for sql, seconds in queries.slow_queries:
+            logger.warning("Slow query (%.1f ms) on %s %s: %s", seconds * 1000, method, route, sql)
+        flags = QueryDiagnostics.n_plus_one(queries)
+        for statement, count in flags:
+            logger.warning(
+                "Possible N+1 on %s %s: %d executions of %s", method, route, count, statement
+            )
+        if flags:
+            with QueryDiagnostics._lock:
+                listeners = list(QueryDiagnostics._listeners)
+            for statement, count in flags:
+                for listener in listeners:
+                    listener(
+                        {"method": method, "route": route, "fingerprint": statement, "count": count}
+                    )
+
+
+class QueryDiagnosticsMiddleware:
+    """ASGI middleware running the slow-query log and the N+1 detector"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as queries:
+
+            async def _send(message):
+                if (
+                    message["type"] == "http.response.start"
+                    and QUERY_DIAGNOSTICS["response_header"]
+                ):
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(queries.count).encode()))
+                    flags = QueryDiagnostics.n_plus_one(queries)
+                    if flags:
+                        statement, count = flags[0]
+                        value = f"{count}x {statement[:MAX_HEADER_LENGTH]}"
+                        headers.append((b"x-n-plus-one", value.encode("latin-1", "replace")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+                QueryDiagnostics.report(scope["method"], route, queries)
@@ -0,0 +1,151 @@
+# app/middleware/query_metrics.py
+
+"""
+Per-request database instrumentation.
+
+`QueryMetricsMiddleware` wraps every HTTP request in `config.query_stats.track_queries`
+and, once the last byte of the response has been sent (so streamed bodies are
+included), records per route template:
+
+- the request duration and status,
+- the number of statements, their total time and the slowest one,
+- the time spent waiting for a pooled connection.
+
+The aggregates are histograms in `services.metrics.MetricsRegistry`, exposed at
+`/metrics`, and the slowest statement seen per route is kept for
+`GET /system/queries`. Routes are labelled by their template, for example
+`/users/{user_id}`, so label cardinality stays bounded.
+"""
+
+import threading
+import time
+from typing import Dict, List, Tuple
+from config.database import pool_stats
+from config.query_stats import RequestQueries, track_queries
+from services.metrics import COUNT_BUCKETS, Counter, Gauge, Histogram, MetricsRegistry
+
+# Label for requests that did not match any route
+UNMATCHED_ROUTE = "unmatched"
+
+# Longest statement text kept for the slowest-statement report
+MAX_SQL_LENGTH = 2_000
+
+_LABELS = ("method", "route")
+
+REQUESTS = MetricsRegistry.register(
+    Counter("http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+)
+REQUEST_DURATION = MetricsRegistry.register(
+    Histogram("http_request_duration_seconds", "Time to serve a request.", _LABELS)
+)
+DB_QUERIES = MetricsRegistry.register(
+    Histogram("db_queries_per_request", "SQL statements run per request.", _LABELS, COUNT_BUCKETS)
+)
+DB_DURATION = MetricsRegistry.register(
+    Histogram("db_query_duration_seconds", "Total SQL time per request.", _LABELS)
+)
+DB_SLOWEST = MetricsRegistry.register(
+    Histogram("db_slowest_query_seconds", "Slowest SQL statement per request.", _LABELS)
+)
+DB_POOL_WAIT = MetricsRegistry.register(
+    Histogram("db_pool_wait_seconds", "Time spent checking out connections per request.", _LABELS)
+)
+
+
+def _pool_gauge(key: str):
+    def _collect() -> Dict[Tuple[str, ...], float]:
+        stats = pool_stats()
+        return {(): stats[key]} if stats["pooled"] else {}
+    return _collect
+
+
+MetricsRegistry.register(
+    Gauge("db_pool_connections_in_use", "Pooled connections checked out.", _pool_gauge("in_use"))
+)
+MetricsRegistry.register(
+    Gauge(
+        "db_pool_connections_idle", "Pooled connections waiting in the pool.", _pool_gauge("idle")
+    )
+)
+
+
+class RouteQueryReport:
+    """Running totals and the slowest statement per route"""
+
+    _routes: Dict[Tuple[str, str], dict] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def record(labels: Tuple[str, str], queries: RequestQueries) -> None:
+        """
+        Add one request to the totals of its route.
+
+        Args:
+            labels (Tuple[str, str]): The method and route template.
+            queries (RequestQueries): The database activity of the request.
+        """
+        with RouteQueryReport._lock:
+            report = RouteQueryReport._routes.setdefault(
+                labels,
+                {"requests": 0, "queries": 0, "db_seconds": 0.0, "pool_wait_seconds": 0.0,
+                 "slowest_seconds": 0.0, "slowest_sql": None},
+            )
+            report["requests"] += 1
+            report["queries"] += queries.count
+            report["db_seconds"] += queries.seconds
+            report["pool_wait_seconds"] += queries.pool_wait_seconds
+            if queries.slowest_sql and queries.slowest_seconds >= report["slowest_seconds"]:
+                report["slowest_seconds"] = queries.slowest_seconds
+                report["slowest_sql"] = queries.slowest_sql[:MAX_SQL_LENGTH]
+
+    @staticmethod
+    def snapshot() -> List[dict]:
+        """
+        Return the per-route totals, the routes spending most time in the database first.
+
+        Returns:
+            List[dict]: One entry per method and route template.
+        """
+        with RouteQueryReport._lock:
+            routes = [
+                {"method": method, "route": route, **report}
+                for (method, route), report in RouteQueryReport._routes.items()
+            ]
+        for report in routes:
+            report["queries_per_request"] = round(report["queries"] / report["requests"], 2)
+        return sorted(routes, key=lambda report: report["db_seconds"], reverse=True)
+
+
+class QueryMetricsMiddleware:
+    """ASGI middleware recording the database activity of every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                # The router stores the matched route in the scope
+                route = scope.get("route")
+                labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+                REQUESTS.inc(labels + (str(status[0]),))
+                REQUEST_DURATION.observe(labels, time.perf_counter() - start)
+                DB_QUERIES.observe(labels, queries.count)
+                DB_DURATION.observe(labels, queries.seconds)
+                DB_SLOWEST.observe(labels, queries.slowest_seconds)
+                DB_POOL_WAIT.observe(labels, queries.pool_wait_seconds)
+                RouteQueryReport.record(labels, queries)
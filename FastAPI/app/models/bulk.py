@@ -0,0 +1,30 @@
+"""
+This module contains the models returned by the bulk endpoints.
+"""
+
+from typing import List
+from pydantic import BaseModel
+
+class BulkItem(BaseModel):
+    """
+    BulkItem model representing a row of a bulk request that succeeded, with its position
+    in the request and the id of the affected entity.
+    """
+    index: int
+    id: int
+
+class BulkError(BaseModel):
+    """
+    BulkError model representing a row of a bulk request that failed, with its position
+    in the request and the reason.
+    """
+    index: int
+    detail: str
+
+class BulkResult(BaseModel):
+    """
+    BulkResult model representing the outcome of a bulk request: the rows that succeeded
+    and the rows that failed.
+    """
+    succeeded: List[BulkItem]
+    errors: List[BulkError]
@@ -1,8 +1,10 @@
 """
-This module contains the Menu model for representing menu data.
+This module contains the Menu models for representing menu data.
 """
 
+from typing import List
 from pydantic import BaseModel
+from models.recipe import RecipeDetail
 
 class Menu(BaseModel):
     """
@@ -12,3 +14,10 @@ class Menu(BaseModel):
     name: str
     date: str
     user_id: int
+
+class MenuDetail(Menu):
+    """
+    MenuDetail model representing a menu together with its recipes, each one with its
+    ingredients.
+    """
+    recipes: List[RecipeDetail]
@@ -14,9 +14,11 @@ class TypeNotification(BaseModel):
 
 class Notification(BaseModel):
     """
-    Notification model representing a notification with an id, user_id, type, and message.
+    Notification model representing a notification with an id, user_id, type, message,
+    and whether its user has seen it.
     """
     id: int
     user_id: int
     type: TypeNotification
     message: str
+    seen: bool = False
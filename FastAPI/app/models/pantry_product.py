@@ -1,7 +1,9 @@
 """
-This module contains the PantryProduct model for representing pantry product data.
+This module contains the PantryProduct model for representing pantry product data,
+and the models of a batch update of a pantry.
 """
 
+from typing import List
 from pydantic import BaseModel
 
 class PantryProduct(BaseModel):
@@ -13,3 +15,20 @@ class PantryProduct(BaseModel):
     product_id: int
     quantity: float
     unit: int
+
+class PantryProductDelta(BaseModel):
+    """
+    PantryProductDelta model representing a change to the stock of a product in a pantry:
+    a positive quantity to add or a negative quantity to remove, and the unit.
+    """
+    product_id: int
+    quantity: float
+    unit: int
+
+class PantryUpdateResult(BaseModel):
+    """
+    PantryUpdateResult model representing the outcome of a batch pantry update: the
+    products left with their new quantities and the IDs of the products used up.
+    """
+    products: List[PantryProduct]
+    removed: List[int]
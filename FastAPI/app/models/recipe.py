@@ -1,13 +1,17 @@
 """
-This module contains the models for Category, Difficulty, and Recipe.
+This module contains the models for Category, Difficulty, and Recipe, and the
+models of a batch-cooking calculation.
 """
 
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, ConfigDict
 
 class Category(BaseModel):
     """
     Category model representing a category with an id and a name.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
 
@@ -15,14 +19,18 @@ class Difficulty(BaseModel):
     """
     Difficulty model representing a difficulty level with an id and a name.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
 
 class Recipe(BaseModel):
     """
     Recipe model representing a recipe with an id, name, instruction, preparation_time, 
-    difficulty level, category, and user_id.
+    difficulty level, category, user_id, and the version of the row.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     instruction: str
@@ -30,3 +38,54 @@ class Recipe(BaseModel):
     difficulty: Difficulty
     category: Category
     user_id: int
+    version: int
+
+class RecipeSearchHit(BaseModel):
+    """
+    RecipeSearchHit model representing a recipe matching a search together with its relevance
+    score.
+    """
+    recipe: Recipe
+    score: float
+
+class IngredientAmount(BaseModel):
+    """
+    IngredientAmount model representing an ingredient of a recipe with its id, name, quantity,
+    and unit.
+    """
+    id: int
+    name: str
+    quantity: int
+    unit: float
+
+class RecipeDetail(Recipe):
+    """
+    RecipeDetail model representing a recipe together with its ingredients.
+    """
+    ingredients: List[IngredientAmount]
+
+class RecipePortion(BaseModel):
+    """
+    RecipePortion model representing a recipe to cook with a recipe_id and the multiplier
+    applied to its quantities, 2 to cook it twice.
+    """
+    recipe_id: int
+    multiplier: float
+
+class ScaledIngredient(BaseModel):
+    """
+    ScaledIngredient model representing the total quantity of an ingredient over a
+    batch-cooking plan with its id, name, quantity in a base unit, and unit.
+    """
+    id: int
+    name: str
+    quantity: float
+    unit: int
+
+class BatchCookingPlan(BaseModel):
+    """
+    BatchCookingPlan model representing the recipes of a batch-cooking plan, merged and
+    ordered by recipe_id, and the ingredients they need in total.
+    """
+    recipes: List[RecipePortion]
+    ingredients: List[ScaledIngredient]
@@ -2,7 +2,9 @@
 This module contains the ShoppingList model for representing shopping list data.
 """
 
+from typing import List
 from pydantic import BaseModel
+from models.shopping_list_ingredient import ShoppingListIngredient
 
 class ShoppingList(BaseModel):
     """
@@ -10,3 +12,9 @@ class ShoppingList(BaseModel):
     """
     id: int
     menu_id: int
+
+class ShoppingListDetail(ShoppingList):
+    """
+    ShoppingListDetail model representing a shopping list together with its ingredients.
+    """
+    ingredients: List[ShoppingListIngredient]
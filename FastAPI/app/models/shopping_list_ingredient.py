@@ -8,9 +8,11 @@ from pydantic import BaseModel
 class ShoppingListIngredient(BaseModel):
     """
     ShoppingListIngredient model representing the association between a shopping list and 
-    an ingredient with shopping_list_id, ingredient_id, quantity, and purchased status.
+    an ingredient with shopping_list_id, ingredient_id, quantity in a base unit, unit,
+    and purchased status.
     """
     shopping_list_id: int
     ingredient_id: int
     quantity: float
+    unit: int
     purchased: bool
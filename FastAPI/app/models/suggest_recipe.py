@@ -2,6 +2,7 @@
 This module contains the SuggestRecipe model for representing user suggestions for recipes.
 """
 
+from typing import List
 from pydantic import BaseModel
 
 class SuggestRecipe(BaseModel):
@@ -11,3 +12,14 @@ class SuggestRecipe(BaseModel):
     id: int
     user_id: int
     recipe_id: int
+
+class RecipeSuggestion(BaseModel):
+    """
+    RecipeSuggestion model representing a ranked recipe for a pantry with its score, the number
+    of matched and total ingredients, and the ids of the missing ingredients.
+    """
+    recipe_id: int
+    score: float
+    matched: int
+    total: int
+    missing: List[int]
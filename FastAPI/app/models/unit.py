@@ -0,0 +1,46 @@
+"""
+This module contains the Unit model for representing the units of measure,
+and the catalogue of the units the application knows.
+"""
+
+from pydantic import BaseModel
+
+MASS = "mass"
+VOLUME = "volume"
+COUNT = "count"
+
+# The units the application knows, with fixed IDs so that the numbers stored
+# in the unit columns mean the same on every database. The first unit of each
+# dimension with a factor of 1 is its base unit.
+UNIT_CATALOGUE = (
+    {"id": 1, "code": "piece", "name": "Piece", "dimension": COUNT, "factor": 1.0},
+    {"id": 2, "code": "dozen", "name": "Dozen", "dimension": COUNT, "factor": 12.0},
+    {"id": 3, "code": "g", "name": "Gram", "dimension": MASS, "factor": 1.0},
+    {"id": 4, "code": "kg", "name": "Kilogram", "dimension": MASS, "factor": 1000.0},
+    {"id": 5, "code": "mg", "name": "Milligram", "dimension": MASS, "factor": 0.001},
+    {"id": 6, "code": "oz", "name": "Ounce", "dimension": MASS, "factor": 28.349523125},
+    {"id": 7, "code": "lb", "name": "Pound", "dimension": MASS, "factor": 453.59237},
+    {"id": 8, "code": "ml", "name": "Millilitre", "dimension": VOLUME, "factor": 1.0},
+    {"id": 9, "code": "cl", "name": "Centilitre", "dimension": VOLUME, "factor": 10.0},
+    {"id": 10, "code": "dl", "name": "Decilitre", "dimension": VOLUME, "factor": 100.0},
+    {"id": 11, "code": "l", "name": "Litre", "dimension": VOLUME, "factor": 1000.0},
+    {"id": 12, "code": "tsp", "name": "Teaspoon", "dimension": VOLUME, "factor": 4.92892159375},
+    {"id": 13, "code": "tbsp", "name": "Tablespoon", "dimension": VOLUME,
+     "factor": 14.78676478125},
+    {"id": 14, "code": "cup", "name": "Cup", "dimension": VOLUME, "factor": 236.5882365},
+    {"id": 15, "code": "fl_oz", "name": "Fluid ounce", "dimension": VOLUME,
+     "factor": 29.5735295625},
+)
+
+
+class Unit(BaseModel):
+    """
+    Unit model representing a unit of measure with an id, code, name, dimension
+    (mass, volume or count) and the quantity of the base unit of its dimension
+    that one unit equals.
+    """
+    id: int
+    code: str
+    name: str
+    dimension: str
+    factor: float
@@ -2,21 +2,62 @@
 This module contains the Role and User models for representing user roles and user data.
 """
 
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
 
 class Role(BaseModel):
     """
-    Role model representing a user role with an id and a name.
+    Role model representing a user role with an id, a name and the version of the row.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
+    version: int
 
 class User(BaseModel):
     """
-    User model representing a user with an id, name, email, password, and role.
+    User model representing a user with an id, name, email, password, role, and the
+    version of the row.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     email: str
     password: str
     role: Role
+    version: int
+
+class RoleCreate(BaseModel):
+    """
+    RoleCreate model representing a role to create in a bulk request.
+    """
+    name: str
+
+class RoleUpdate(BaseModel):
+    """
+    RoleUpdate model representing a role to update in a bulk request.
+    """
+    id: int
+    name: str
+
+class UserCreate(BaseModel):
+    """
+    UserCreate model representing a user to create in a bulk request.
+    """
+    name: str
+    email: str
+    password: str
+    role_id: int
+
+class UserUpdate(BaseModel):
+    """
+    UserUpdate model representing a user to update in a bulk request. Only the fields
+    that are provided are changed.
+    """
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    role_id: Optional[int] = None
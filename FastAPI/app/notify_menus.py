@@ -0,0 +1,57 @@
+"""
+Command line entry point for the reminders of the next day's menus.
+
+Notifies every user with a menu planned on a day, tomorrow by default. It is
+meant to run once a day from a scheduler rather than inside the server, where
+every worker process would send the reminders again. The notifications go
+through the same `NotificationQueue` as those of the API, which this script
+starts and drains itself, and the queue statistics are printed as JSON.
+
+Usage:
+    python notify_menus.py --date 2026-10-19
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import date, timedelta
+from config.async_database import async_database
+from config.database import connection_scope
+from services.notification_queue import NotificationQueue
+from services.notification_service import NotificationService
+from services.reference_cache import ReferenceCache
+
+
+def _remind(day: date) -> int:
+    with connection_scope():
+        return NotificationService.remind_menus(day)
+
+
+async def _run(day: date) -> dict:
+    with connection_scope():
+        ReferenceCache.load()
+        NotificationQueue.ensure_types()
+    await async_database.connect()
+    await NotificationQueue.start()
+    try:
+        # The query and the publishing block, so they run off the event loop
+        users = await asyncio.to_thread(_remind, day)
+    finally:
+        await NotificationQueue.stop()
+        await async_database.close()
+    return {"date": str(day), "users": users, **NotificationQueue.stats()}
+
+
+def main() -> None:
+    """Parse the command line arguments and send the reminders."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument(
+        "--date", type=date.fromisoformat, default=date.today() + timedelta(days=1),
+        help="Day of the menus, YYYY-MM-DD",
+    )
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args.date))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Initialization module for the repositories package.
+
+Repositories are the asynchronous counterpart of the services: they build their
+queries with the Peewee models and run them through `config.async_database`.
+
+Available Repositories:
+    - UserRepository: Async data access for users.
+    - RoleRepository: Async data access for roles.
+"""
+
+from repositories.user_repository import UserRepository
+from repositories.role_repository import RoleRepository
+
+# Define what repositories will be available for public import
+__all__ = [
+    "UserRepository",
+    "RoleRepository",
+]
@@ -0,0 +1,166 @@
+# app/repositories/notification_repository.py
+
+"""
+Async repository for the notification streams.
+
+The queries `services.notification_hub.NotificationHub` runs on the event loop:
+reading the notifications written after a cursor or by ID, replaying those of
+a user and counting the unseen ones, all served by the primary key and the
+`(user_id, seen)` index.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from peewee import chunked, fn
+from config.async_database import async_database
+from config.database import NotificationModel, UserModel
+
+# Users per IN list when counting unseen notifications
+COUNT_BATCH_SIZE = 1000
+
+# IDs per IN list when reading notifications by ID
+ID_BATCH_SIZE = 1000
+
+
+def _notification_query():
+    """Build the SELECT returning notifications as rows keyed like `Notification`."""
+    return NotificationModel.select(
+        NotificationModel.id,
+        NotificationModel.user_id.alias("user_id"),
+        NotificationModel.type.alias("type_id"),
+        NotificationModel.message,
+        NotificationModel.seen,
+    )
+
+
+class NotificationRepository:
+    """Async data access for the notification streams"""
+
+    @staticmethod
+    async def latest_id() -> int:
+        """
+        Return the ID of the last notification written.
+
+        Returns:
+            int: The highest notification ID, 0 when there are none.
+        """
+        row = await async_database.fetch_one(
+            NotificationModel.select(fn.MAX(NotificationModel.id).alias("latest")).sql()
+        )
+        return row["latest"] or 0
+
+    @staticmethod
+    async def list_after(after: int, limit: int) -> List[dict]:
+        """
+        Read the notifications of every user written after a cursor.
+
+        Args:
+            after (int): Only notifications with an ID greater than this are returned.
+            limit (int): The maximum number of notifications.
+
+        Returns:
+            List[dict]: The notifications, ordered by ID.
+        """
+        return await async_database.fetch_all(
+            _notification_query()
+            .where(NotificationModel.id > after)
+            .order_by(NotificationModel.id)
+            .limit(limit)
+            .sql()
+        )
+
+    @staticmethod
+    async def list_ids(notification_ids: Iterable[int]) -> List[dict]:
+        """
+        Read the notifications with the given IDs, one query per batch of IDs.
+
+        Args:
+            notification_ids (Iterable[int]): The IDs to look up.
+
+        Returns:
+            List[dict]: The notifications found, ordered by ID.
+        """
+        rows = []
+        for batch in chunked(sorted(notification_ids), ID_BATCH_SIZE):
+            rows.extend(await async_database.fetch_all(
+                _notification_query()
+                .where(NotificationModel.id.in_(batch))
+                .order_by(NotificationModel.id)
+                .sql()
+            ))
+        return rows
+
+    @staticmethod
+    async def list_user_range(user_id: int, after: int, up_to: int, limit: int) -> List[dict]:
+        """
+        Read the notifications of a user within a range of IDs.
+
+        Args:
+            user_id (int): The ID of the user.
+            after (int): Only notifications with an ID greater than this are returned.
+            up_to (int): Only notifications with an ID up to this one are returned.
+            limit (int): The maximum number of notifications.
+
+        Returns:
+            List[dict]: The notifications, ordered by ID.
+        """
+        return await async_database.fetch_all(
+            _notification_query()
+            .where(
+                (NotificationModel.user_id == user_id)
+                & (NotificationModel.id > after)
+                & (NotificationModel.id <= up_to)
+            )
+            .order_by(NotificationModel.id)
+            .limit(limit)
+            .sql()
+        )
+
+    @staticmethod
+    async def count_unseen(user_ids: Iterable[int], up_to: Optional[int]) -> Dict[int, int]:
+        """
+        Count the unseen notifications of several users, one query per batch of users.
+
+        Args:
+            user_ids (Iterable[int]): The IDs of the users.
+            up_to (Optional[int]): Only notifications with an ID up to this one
+                are counted, all of them when None.
+
+        Returns:
+            Dict[int, int]: The number of unseen notifications per user. Users
+            without any are left out.
+        """
+        counts = {}
+        for batch in chunked(user_ids, COUNT_BATCH_SIZE):
+            condition = (
+                NotificationModel.user_id.in_(batch)
+                & (NotificationModel.seen == False)  # pylint: disable=singleton-comparison
+            )
+            if up_to is not None:
+                condition &= NotificationModel.id <= up_to
+            rows = await async_database.fetch_all(
+                NotificationModel.select(
+                    NotificationModel.user_id.alias("user_id"),
+                    fn.COUNT(NotificationModel.id).alias("unseen"),
+                )
+                .where(condition)
+                .group_by(NotificationModel.user_id)
+                .sql()
+            )
+            counts.update((row["user_id"], row["unseen"]) for row in rows)
+        return counts
+
+    @staticmethod
+    async def user_exists(user_id: int) -> bool:
+        """
+        Check whether a user exists.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if the user exists.
+        """
+        row: Optional[dict] = await async_database.fetch_one(
+            UserModel.select(UserModel.id).where(UserModel.id == user_id).sql()
+        )
+        return row is not None
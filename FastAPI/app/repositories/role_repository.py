@@ -0,0 +1,103 @@
+# app/repositories/role_repository.py
+
+"""
+Async repository for Role operations.
+
+This module mirrors `services.role_service.RoleService` with `async` methods that
+run on the native async driver instead of blocking a threadpool worker.
+Every write is mirrored into the `ReferenceCache` and increments the role's version.
+"""
+
+from typing import Optional
+from config.async_database import async_database
+from config.database import RoleModel
+from models.user import Role
+from services.reference_cache import ROLES, ReferenceCache
+
+
+class RoleRepository:
+    """Async data access for Role operations"""
+
+    @staticmethod
+    async def create_role(name: str) -> Role:
+        """
+        Create a new role.
+
+        Args:
+            name (str): The name of the role.
+
+        Returns:
+            Role: The created role instance.
+        """
+        role_id, _ = await async_database.execute(RoleModel.insert(name=name).sql())
+        role = Role(id=role_id, name=name, version=1)
+        ReferenceCache.put(ROLES, role)
+        return role
+
+    @staticmethod
+    async def get_role_by_id(role_id: int) -> Optional[Role]:
+        """
+        Retrieve a role by ID, from the `ReferenceCache` when it is there.
+
+        Args:
+            role_id (int): The ID of the role to retrieve.
+
+        Returns:
+            Optional[Role]: The role instance if found, else None.
+        """
+        role = ReferenceCache.peek(ROLES, role_id)
+        if role is not None:
+            return role
+        row = await async_database.fetch_one(
+            RoleModel.select(RoleModel.id, RoleModel.name, RoleModel.version)
+            .where(RoleModel.id == role_id)
+            .sql()
+        )
+        if row is None:
+            return None
+        role = Role(**row)
+        ReferenceCache.put(ROLES, role)
+        return role
+
+    @staticmethod
+    async def update_role(role_id: int, name: str) -> Optional[Role]:
+        """
+        Update an existing role by ID.
+
+        Args:
+            role_id (int): The ID of the role to update.
+            name (str): The new name of the role.
+
+        Returns:
+            Optional[Role]: The updated role instance if successful, else None.
+        """
+        _, rowcount = await async_database.execute(
+            RoleModel.update(name=name, version=RoleModel.version + 1)
+            .where(RoleModel.id == role_id)
+            .sql()
+        )
+        if not rowcount:
+            return None
+        row = await async_database.fetch_one(
+            RoleModel.select(RoleModel.version).where(RoleModel.id == role_id).sql()
+        )
+        role = Role(id=role_id, name=name, version=row["version"])
+        ReferenceCache.put(ROLES, role)
+        return role
+
+    @staticmethod
+    async def delete_role(role_id: int) -> bool:
+        """
+        Delete a role by ID.
+
+        Args:
+            role_id (int): The ID of the role to delete.
+
+        Returns:
+            bool: True if the role was deleted, else False.
+        """
+        _, rowcount = await async_database.execute(
+            RoleModel.delete().where(RoleModel.id == role_id).sql()
+        )
+        ReferenceCache.discard(ROLES, role_id)
+        return rowcount > 0
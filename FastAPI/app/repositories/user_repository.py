@@ -0,0 +1,151 @@
+# app/repositories/user_repository.py
+
+"""
+Async repository for User operations.
+
+This module mirrors `services.user_service.UserService` with `async` methods that
+run on the native async driver instead of blocking a threadpool worker. Users are
+always read together with their role in a single joined query. Every
+write increments the user's version.
+"""
+
+from typing import Optional
+from config.async_database import async_database
+from config.database import UserModel, RoleModel
+from models.user import User, Role
+from repositories.role_repository import RoleRepository
+from services.password_service import PasswordService
+
+
+def _user_query():
+    """Build the SELECT that loads users joined with their role."""
+    return UserModel.select(
+        UserModel.id,
+        UserModel.name,
+        UserModel.email,
+        UserModel.password,
+        UserModel.version,
+        RoleModel.id.alias("role_id"),
+        RoleModel.name.alias("role_name"),
+        RoleModel.version.alias("role_version"),
+    ).join(RoleModel)
+
+
+def _to_user(row: dict) -> User:
+    """Convert a row produced by `_user_query` into a `User`."""
+    return User(
+        id=row["id"],
+        name=row["name"],
+        email=row["email"],
+        password=row["password"],
+        role=Role(id=row["role_id"], name=row["role_name"], version=row["role_version"]),
+        version=row["version"],
+    )
+
+
+class UserRepository:
+    """Async data access for User operations"""
+
+    @staticmethod
+    async def create_user(name: str, email: str, password: str, role_id: int) -> User:
+        """
+        Create a new user.
+
+        Args:
+            name (str): The name of the user.
+            email (str): The email of the user.
+            password (str): The password of the user.
+            role_id (int): The ID of the assigned role.
+
+        Returns:
+            User: The created user instance.
+
+        Raises:
+            ValueError: If the role with the given ID does not exist.
+        """
+        role = await RoleRepository.get_role_by_id(role_id)
+        if role is None:
+            raise ValueError(f"Role with id {role_id} not found")
+        password = await PasswordService.hash_async(password)
+        user_id, _ = await async_database.execute(
+            UserModel.insert(name=name, email=email, password=password, role=role_id).sql()
+        )
+        return User(
+            id=user_id, name=name, email=email, password=password, role=role, version=1
+        )
+
+    @staticmethod
+    async def get_user_by_id(user_id: int) -> Optional[User]:
+        """
+        Retrieve a user by ID.
+
+        Args:
+            user_id (int): The ID of the user to retrieve.
+
+        Returns:
+            Optional[User]: The user instance if found, else None.
+        """
+        row = await async_database.fetch_one(
+            _user_query().where(UserModel.id == user_id).sql()
+        )
+        return _to_user(row) if row else None
+
+    @staticmethod
+    async def update_user(
+        user_id: int,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+        password: Optional[str] = None,
+        role_id: Optional[int] = None,
+    ) -> Optional[User]:
+        """
+        Update an existing user by ID.
+
+        Args:
+            user_id (int): The ID of the user to update.
+            name (Optional[str]): The new name of the user.
+            email (Optional[str]): The new email of the user.
+            password (Optional[str]): The new password of the user.
+            role_id (Optional[int]): The new role's ID.
+
+        Returns:
+            Optional[User]: The updated user instance if successful, else None.
+
+        Raises:
+            ValueError: If the role with the given ID does not exist.
+        """
+        # Update fields only if new values are provided
+        fields = {}
+        if name:
+            fields[UserModel.name] = name
+        if email:
+            fields[UserModel.email] = email
+        if password:
+            fields[UserModel.password] = await PasswordService.hash_async(password)
+        if role_id:
+            if await RoleRepository.get_role_by_id(role_id) is None:
+                raise ValueError(f"Role with id {role_id} not found")
+            fields[UserModel.role] = role_id
+
+        if fields:
+            fields[UserModel.version] = UserModel.version + 1
+            await async_database.execute(
+                UserModel.update(fields).where(UserModel.id == user_id).sql()
+            )
+        return await UserRepository.get_user_by_id(user_id)
+
+    @staticmethod
+    async def delete_user(user_id: int) -> bool:
+        """
+        Delete a user by ID.
+
+        Args:
+            user_id (int): The ID of the user to delete.
+
+        Returns:
+            bool: True if the user was deleted, else False.
+        """
+        _, rowcount = await async_database.execute(
+            UserModel.delete().where(UserModel.id == user_id).sql()
+        )
+        return rowcount > 0
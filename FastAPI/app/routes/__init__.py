@@ -7,17 +7,53 @@ user and role routes.
 Modules:
     - user_routes: Contains the router for user-related routes.
     - role_routes: Contains the router for role-related routes.
+    - async_user_routes: Contains the async router for user-related routes.
+    - async_role_routes: Contains the async router for role-related routes.
+    - recipe_routes: Contains the router for recipe-related routes.
+    - menu_routes: Contains the router for menu-related routes.
+    - notification_routes: Contains the router for notification-related routes.
+    - shopping_list_routes: Contains the router for shopping lists.
+    - suggestion_routes: Contains the router for recipe suggestions.
+    - system_routes: Contains the router for operational routes.
+    - metrics_routes: Contains the router for the Prometheus metrics.
 
 Available Routers:
     - users_router: Router for user-related routes.
     - roles_router: Router for role-related routes.
+    - async_users_router: Async router for user-related routes.
+    - async_roles_router: Async router for role-related routes.
+    - recipes_router: Router for recipe-related routes.
+    - menus_router: Router for menu-related routes.
+    - notifications_router: Router for notification-related routes.
+    - shopping_lists_router: Router for shopping lists generated from menus.
+    - suggestions_router: Router for pantry-driven recipe suggestions.
+    - system_router: Router for operational routes such as pool statistics.
+    - metrics_router: Router for the Prometheus scrape endpoint.
 """
 
 from routes.user_routes import router as users_router
 from routes.role_routes import router as roles_router
+from routes.async_user_routes import router as async_users_router
+from routes.async_role_routes import router as async_roles_router
+from routes.recipe_routes import router as recipes_router
+from routes.menu_routes import router as menus_router
+from routes.notification_routes import router as notifications_router
+from routes.shopping_list_routes import router as shopping_lists_router
+from routes.suggestion_routes import router as suggestions_router
+from routes.system_routes import router as system_router
+from routes.metrics_routes import router as metrics_router
 
 # Define what routers will be available for public import
 __all__ = [
     "users_router",
     "roles_router",
+    "async_users_router",
+    "async_roles_router",
+    "recipes_router",
+    "menus_router",
+    "notifications_router",
+    "shopping_lists_router",
+    "suggestions_router",
+    "system_router",
+    "metrics_router",
 ]
@@ -0,0 +1,121 @@
+# app/async_user_routes.py
+
+"""
+Module that defines the async routes for managing users.
+
+This module uses FastAPI to define the routes that allow
+creating, reading, updating, and deleting users through a REST API.
+
+Available routes:
+
+- POST /async/users/: Creates a new user.
+- GET /async/users/{user_id}: Retrieves user information by ID.
+- PUT /async/users/{user_id}: Updates user information.
+- DELETE /async/users/{user_id}: Deletes a user.
+
+These routes mirror `routes.user_routes` as `async def` endpoints backed by
+`UserRepository`, so they run on the event loop and wait on the async
+connection pool instead of occupying a threadpool worker per request.
+"""
+
+from repositories.user_repository import UserRepository
+from models.user import User
+from fastapi import APIRouter, HTTPException
+
+
+router = APIRouter(
+    prefix="/async/users",
+    tags=["users (async)"],
+)
+
+
+@router.post("/", response_model=User)
+async def create_user(name: str, email: str, password: str, role_id: int) -> User:
+    """
+    Create a new user.
+
+    Args:
+        name (str): The name of the user.
+        email (str): The email of the user.
+        password (str): The password of the user.
+        role_id (int): The ID of the assigned role.
+
+    Returns:
+        User: The created user instance.
+
+    Raises:
+        HTTPException: If the role does not exist (422).
+    """
+    try:
+        user = await UserRepository.create_user(name, email, password, role_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return user
+
+
+@router.get("/{user_id}", response_model=User)
+async def get_user(user_id: int) -> User:
+    """
+    Retrieve user information by ID.
+
+    Args:
+        user_id (int): The ID of the user to retrieve.
+
+    Returns:
+        User: The user with the specified ID.
+
+    Raises:
+        HTTPException: If the user is not found.
+    """
+    user = await UserRepository.get_user_by_id(user_id)
+    if user:
+        return user
+    raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.put("/{user_id}", response_model=User)
+async def update_user(
+    user_id: int, name: str = None, email: str = None, password: str = None, role_id: int = None
+) -> User:
+    """
+    Update user information.
+
+    Args:
+        user_id (int): The ID of the user to update.
+        name (str, optional): The new name of the user.
+        email (str, optional): The new email of the user.
+        password (str, optional): The new password of the user.
+        role_id (int, optional): The new role's ID.
+
+    Returns:
+        User: The updated user instance.
+
+    Raises:
+        HTTPException: If the user is not found (404) or the role does not exist (422).
+    """
+    try:
+        user = await UserRepository.update_user(user_id, name, email, password, role_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if user:
+        return user
+    raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.delete("/{user_id}")
+async def delete_user(user_id: int) -> dict:
+    """
+    Delete a user by ID.
+
+    Args:
+        user_id (int): The ID of the user to delete.
+
+    Returns:
+        dict: A confirmation message if the user was deleted.
+
+    Raises:
+        HTTPException: If the user is not found.
+    """
+    if await UserRepository.delete_user(user_id):
+        return {"message": "User deleted successfully"}
+    raise HTTPException(status_code=404, detail="User not found")
@@ -0,0 +1,47 @@
+# app/menu_routes.py
+
+"""
+Module that defines the routes for reading menus.
+
+Available routes:
+
+- GET /menus/: Lists menus, one keyset page at a time.
+
+Each route uses the `MenuService` to interact with the
+business logic related to menus.
+"""
+
+from typing import Optional
+from services.menu_service import MenuService
+from services.pagination import MAX_PAGE_SIZE
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+
+router = APIRouter(
+    prefix="/menus",
+    tags=["menus"],
+)
+
+
+@router.get("/")
+def list_menus(
+    after: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    user_id: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    List menus ordered by ID, streamed as they are read.
+
+    Args:
+        after (Optional[int]): The `next_after` value of the previous page.
+        limit (int): The maximum number of menus in the page.
+        user_id (Optional[int]): Only return menus of this user.
+
+    Returns:
+        StreamingResponse: A JSON object with the `items` of the page and the
+        `next_after` cursor of the following page, null on the last page.
+    """
+    return StreamingResponse(
+        MenuService.stream_menus(after, limit, user_id), media_type="application/json"
+    )
@@ -0,0 +1,29 @@
+# app/metrics_routes.py
+
+"""
+Module that defines the Prometheus scrape route.
+
+Available routes:
+
+- GET /metrics: Retrieves the request and database metrics in the Prometheus
+  text format.
+"""
+
+from services.metrics import CONTENT_TYPE, MetricsRegistry
+from fastapi import APIRouter, Response
+
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    """
+    Retrieve the metrics of this worker process.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+    return Response(MetricsRegistry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,140 @@
+# app/notification_routes.py
+
+"""
+Module that defines the routes for reading notifications.
+
+Available routes:
+
+- GET /notifications/: Lists notifications, one keyset page at a time.
+- GET /notifications/stream: Streams the new notifications of a user as Server-Sent Events.
+- GET /notifications/unseen: Retrieves the number of unseen notifications of a user.
+- PUT /notifications/seen: Marks the notifications of a user as seen.
+- PUT /notifications/{notification_id}/seen: Marks a notification as seen.
+
+Each route uses the `NotificationService` to interact with the
+business logic related to notifications, and the `NotificationHub` for the
+streams and the unseen counts they carry.
+"""
+
+from typing import Optional
+from config.database import connection_scope
+from repositories.notification_repository import NotificationRepository
+from services.notification_hub import NotificationHub
+from services.notification_service import NotificationService
+from services.pagination import MAX_PAGE_SIZE
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["notifications"],
+)
+
+
+@router.get("/")
+def list_notifications(
+    after: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    user_id: Optional[int] = None,
+    type_id: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    List notifications ordered by ID, streamed as they are read.
+
+    Args:
+        after (Optional[int]): The `next_after` value of the previous page.
+        limit (int): The maximum number of notifications in the page.
+        user_id (Optional[int]): Only return notifications of this user.
+        type_id (Optional[int]): Only return notifications of this type.
+
+    Returns:
+        StreamingResponse: A JSON object with the `items` of the page and the
+        `next_after` cursor of the following page, null on the last page.
+    """
+    return StreamingResponse(
+        NotificationService.stream_notifications(after, limit, user_id, type_id),
+        media_type="application/json",
+    )
+
+
+@router.get("/stream")
+async def stream_notifications(
+    user_id: int, last_event_id: Optional[int] = Header(None)
+) -> StreamingResponse:
+    """
+    Stream the new notifications of a user as Server-Sent Events.
+
+    Every `notification` event carries a notification with its ID as the
+    event ID, and is followed by an `unseen` event with the updated count of
+    unseen notifications. An `unseen` event also opens the stream. Browsers
+    reconnect on their own and send the `Last-Event-ID` header, so the
+    notifications missed in between are sent first.
+
+    Args:
+        user_id (int): The ID of the user.
+        last_event_id (Optional[int]): The ID of the last notification received.
+
+    Returns:
+        StreamingResponse: The `text/event-stream` response, open until the client leaves.
+    """
+    if not await NotificationRepository.user_exists(user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return StreamingResponse(
+        NotificationHub.stream(user_id, last_event_id),
+        media_type="text/event-stream",
+        # Proxies must neither cache nor buffer the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/unseen")
+async def get_unseen_count(user_id: int) -> dict:
+    """
+    Retrieve the number of unseen notifications of a user.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        dict: The `user_id` and its `unseen` count.
+    """
+    return {"user_id": user_id, "unseen": await NotificationHub.unseen(user_id)}
+
+
+@router.put("/seen")
+def mark_all_seen(user_id: int, up_to: Optional[int] = None) -> dict:
+    """
+    Mark the notifications of a user as seen.
+
+    Args:
+        user_id (int): The ID of the user.
+        up_to (Optional[int]): Only mark notifications with an ID up to this
+            one, usually the last one displayed.
+
+    Returns:
+        dict: The `user_id` and the number of notifications `updated`.
+    """
+    with connection_scope():
+        updated = NotificationService.mark_all_seen(user_id, up_to)
+    if updated:
+        NotificationHub.recount(user_id)
+    return {"user_id": user_id, "updated": updated}
+
+
+@router.put("/{notification_id}/seen", status_code=204)
+def mark_seen(notification_id: int) -> None:
+    """
+    Mark a notification as seen.
+
+    Args:
+        notification_id (int): The ID of the notification.
+
+    Raises:
+        HTTPException: If the notification does not exist.
+    """
+    with connection_scope():
+        user_id = NotificationService.mark_seen(notification_id)
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    NotificationHub.recount(user_id)
@@ -0,0 +1,55 @@
+# app/pantry_routes.py
+
+"""
+Module that defines the routes for managing pantries.
+
+Available routes:
+
+- PATCH /pantries/{pantry_id}/products: Adds and removes quantities of many products at once.
+
+Each route uses the `PantryService` to interact with the
+business logic related to pantries.
+"""
+
+from typing import List
+from config.database import connection_scope
+from models.pantry_product import PantryProductDelta, PantryUpdateResult
+from services.pantry_service import PantryService
+from fastapi import APIRouter, HTTPException
+
+
+router = APIRouter(
+    prefix="/pantries",
+    tags=["pantries"],
+)
+
+
+@router.patch("/{pantry_id}/products", response_model=PantryUpdateResult)
+@connection_scope()
+def update_pantry_products(
+    pantry_id: int, deltas: List[PantryProductDelta]
+) -> PantryUpdateResult:
+    """
+    Add and remove quantities of many products of a pantry in one transaction.
+
+    Args:
+        pantry_id (int): The ID of the pantry.
+        deltas (List[PantryProductDelta]): The quantity to add, or to remove
+            when negative, and the unit of each product, from `GET /units/`.
+
+    Returns:
+        PantryUpdateResult: The changed products with their new quantities in
+        base units and the IDs of the products used up and removed.
+
+    Raises:
+        HTTPException: If the pantry does not exist (404), or if a product or
+        a unit does not exist or a product is given in units of another
+        dimension (422).
+    """
+    try:
+        result = PantryService.apply_deltas(pantry_id, deltas)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if result is None:
+        raise HTTPException(status_code=404, detail="Pantry not found")
+    return result
@@ -0,0 +1,297 @@
+# app/recipe_routes.py
+
+"""
+Module that defines the routes for managing recipes.
+
+Available routes:
+
+- GET /recipes/: Lists recipes, one keyset page at a time.
+- POST /recipes/: Creates a new recipe.
+- GET /recipes/search: Searches recipes by text, ranked by relevance.
+- GET /recipes/export: Streams recipes with their ingredients as NDJSON or CSV.
+- POST /recipes/scale: Computes the ingredient totals of recipes cooked several times.
+- GET /recipes/{recipe_id}: Retrieves recipe information by ID.
+- PUT /recipes/{recipe_id}: Updates recipe information.
+- DELETE /recipes/{recipe_id}: Deletes a recipe.
+
+Each route uses the `RecipeService` to interact with the
+business logic related to recipes, except `POST /recipes/scale`, which uses
+the `RecipeScalingService`.
+
+`GET` and `PUT /recipes/{recipe_id}` send the recipe's version as a strong
+`ETag`. `GET` answers `If-None-Match` with `304 Not Modified` after reading
+only the version, and `PUT` refuses a write with `412 Precondition Failed`
+when the recipe no longer matches `If-Match`.
+"""
+
+from typing import List, Optional
+from services.recipe_service import RecipeService
+from services.recipe_scaling_service import RecipeScalingService
+from services.export_service import EXPORT_FORMATS, ExportService
+from services.pagination import MAX_PAGE_SIZE
+from services.versioning import VersionConflict, make_etag, match, none_match
+from models.recipe import BatchCookingPlan, Recipe, RecipePortion, RecipeSearchHit
+from config.database import connection_scope
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+
+router = APIRouter(
+    prefix="/recipes",
+    tags=["recipes"],
+)
+
+
+@router.get("/")
+def list_recipes(
+    after: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    user_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    difficulty_id: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    List recipes ordered by ID, streamed as they are read.
+
+    Args:
+        after (Optional[int]): The `next_after` value of the previous page.
+        limit (int): The maximum number of recipes in the page.
+        user_id (Optional[int]): Only return recipes of this user.
+        category_id (Optional[int]): Only return recipes in this category.
+        difficulty_id (Optional[int]): Only return recipes with this difficulty.
+
+    Returns:
+        StreamingResponse: A JSON object with the `items` of the page and the
+        `next_after` cursor of the following page, null on the last page.
+    """
+    return StreamingResponse(
+        RecipeService.stream_recipes(after, limit, user_id, category_id, difficulty_id),
+        media_type="application/json",
+    )
+
+
+@router.post("/", response_model=Recipe)
+@connection_scope()
+def create_recipe(
+    name: str,
+    instruction: str,
+    preparation_time: int,
+    difficulty_id: int,
+    category_id: int,
+    user_id: int,
+) -> Recipe:
+    """
+    Create a new recipe.
+
+    Args:
+        name (str): The name of the recipe.
+        instruction (str): The preparation instructions.
+        preparation_time (int): The preparation time.
+        difficulty_id (int): The ID of the difficulty level.
+        category_id (int): The ID of the category.
+        user_id (int): The ID of the author.
+
+    Returns:
+        Recipe: The created recipe instance.
+
+    Raises:
+        HTTPException: If the difficulty, the category or the user does not
+        exist (422).
+    """
+    try:
+        recipe = RecipeService.create_recipe(
+            name, instruction, preparation_time, difficulty_id, category_id, user_id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return recipe
+
+
+@router.get("/search", response_model=List[RecipeSearchHit])
+@connection_scope()
+def search_recipes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    category_id: Optional[int] = None,
+    difficulty_id: Optional[int] = None,
+    max_preparation_time: Optional[int] = None,
+    ingredient: Optional[str] = None,
+) -> List[RecipeSearchHit]:
+    """
+    Search recipes by name, instructions and ingredient names.
+
+    Args:
+        q (str): The words to look for.
+        limit (int): The maximum number of results.
+        category_id (Optional[int]): Only return recipes in this category.
+        difficulty_id (Optional[int]): Only return recipes with this difficulty.
+        max_preparation_time (Optional[int]): Only return recipes that take at most
+            this long to prepare.
+        ingredient (Optional[str]): Only return recipes using this ingredient.
+
+    Returns:
+        List[RecipeSearchHit]: The matching recipes with their score, best first.
+    """
+    return RecipeService.search_recipes(
+        q, limit, category_id, difficulty_id, max_preparation_time, ingredient
+    )
+
+
+@router.post("/scale", response_model=BatchCookingPlan)
+@connection_scope()
+def scale_recipes(portions: List[RecipePortion]) -> BatchCookingPlan:
+    """
+    Compute the ingredient totals of a batch-cooking plan.
+
+    Every ingredient is scaled by the multiplier of its recipe and added up
+    over the recipes. Plans asked for recently are answered from a cache, and
+    plans that only change the multipliers are recomputed without a query.
+
+    Args:
+        portions (List[RecipePortion]): The recipes and how many times to cook
+            each, such as 2.5 for two and a half times the quantities.
+
+    Returns:
+        BatchCookingPlan: The recipes, merged and ordered by ID, and the total
+        of every ingredient in base units, one entry per unit dimension.
+
+    Raises:
+        HTTPException: If a recipe does not exist, a multiplier is not a
+        positive number or the plan has too many recipes (422).
+    """
+    try:
+        return RecipeScalingService.scale(portions)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@router.get("/export")
+def export_recipes(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    user_id: Optional[int] = None,
+    gzip: bool = False,
+) -> StreamingResponse:
+    """
+    Stream recipes with their category, difficulty and ingredients.
+
+    Args:
+        export_format (str): Either "ndjson" or "csv".
+        user_id (Optional[int]): Only export the recipes of this user.
+        gzip (bool): Whether to gzip the output.
+
+    Returns:
+        StreamingResponse: The export, as a file download.
+    """
+    filename = f"recipes.{export_format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        ExportService.export_recipes(export_format, user_id, gzip),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{recipe_id}", response_model=Recipe)
+@connection_scope()
+def get_recipe(
+    recipe_id: int, response: Response, if_none_match: Optional[str] = Header(None)
+) -> Recipe:
+    """
+    Retrieve recipe information by ID.
+
+    Args:
+        recipe_id (int): The ID of the recipe to retrieve.
+        if_none_match (Optional[str]): ETags of the copies the client already has.
+
+    Returns:
+        Recipe: The recipe with the specified ID, or an empty 304 response if the
+        client copy is current.
+
+    Raises:
+        HTTPException: If the recipe is not found.
+    """
+    if if_none_match:
+        version = RecipeService.get_recipe_version(recipe_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        etag = make_etag(version)
+        if none_match(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    recipe = RecipeService.get_recipe_by_id(recipe_id)
+    if recipe:
+        response.headers["ETag"] = make_etag(recipe.version)
+        return recipe
+    raise HTTPException(status_code=404, detail="Recipe not found")
+
+
+@router.put("/{recipe_id}", response_model=Recipe)
+@connection_scope()
+def update_recipe(
+    recipe_id: int,
+    response: Response,
+    name: str = None,
+    instruction: str = None,
+    preparation_time: int = None,
+    difficulty_id: int = None,
+    category_id: int = None,
+    if_match: Optional[str] = Header(None),
+) -> Recipe:
+    """
+    Update recipe information.
+
+    Args:
+        recipe_id (int): The ID of the recipe to update.
+        name (str, optional): The new name of the recipe.
+        instruction (str, optional): The new preparation instructions.
+        preparation_time (int, optional): The new preparation time.
+        difficulty_id (int, optional): The new difficulty level's ID.
+        category_id (int, optional): The new category's ID.
+        if_match (Optional[str]): Only update the recipe if its ETag is one of these.
+
+    Returns:
+        Recipe: The updated recipe instance.
+
+    Raises:
+        HTTPException: If the recipe is not found (404), no longer matches
+        `If-Match` (412), or the difficulty or the category does not exist (422).
+    """
+    expected_version = None
+    if if_match:
+        expected_version = RecipeService.get_recipe_version(recipe_id)
+        if expected_version is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        if not match(if_match, make_etag(expected_version)):
+            raise HTTPException(status_code=412, detail="Recipe has been modified")
+    try:
+        recipe = RecipeService.update_recipe(
+            recipe_id, name, instruction, preparation_time, difficulty_id, category_id,
+            expected_version=expected_version,
+        )
+    except VersionConflict as exc:
+        raise HTTPException(status_code=412, detail="Recipe has been modified") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if recipe:
+        response.headers["ETag"] = make_etag(recipe.version)
+        return recipe
+    raise HTTPException(status_code=404, detail="Recipe not found")
+
+
+@router.delete("/{recipe_id}")
+@connection_scope()
+def delete_recipe(recipe_id: int) -> dict:
+    """
+    Delete a recipe by ID.
+
+    Args:
+        recipe_id (int): The ID of the recipe to delete.
+
+    Returns:
+        dict: A confirmation message if the recipe was deleted.
+
+    Raises:
+        HTTPException: If the recipe is not found.
+    """
+    if RecipeService.delete_recipe(recipe_id):
+        return {"message": "Recipe deleted successfully"}
+    raise HTTPException(status_code=404, detail="Recipe not found")
@@ -9,17 +9,30 @@ creating, reading, updating, and deleting roles through a REST API.
 Available routes:
 
 - POST /roles/: Creates a new role.
+- POST /roles/bulk: Creates many roles from a JSON body.
+- PUT /roles/bulk: Updates many roles from a JSON body.
+- DELETE /roles/bulk: Deletes many roles by ID.
 - GET /roles/{role_id}: Retrieves role information by ID.
 - PUT /roles/{role_id}: Updates role information.
 - DELETE /roles/{role_id}: Deletes a role.
 
 Each route uses the `RoleService` to interact with the
-business logic related to roles.
+business logic related to roles, and holds a pooled database connection
+for its duration through `connection_scope`.
+
+`GET` and `PUT /roles/{role_id}` send the role's version as a strong `ETag`.
+`GET` answers `If-None-Match` with `304 Not Modified` after reading only the
+version, and `PUT` refuses a write with `412 Precondition Failed` when the
+role no longer matches `If-Match`.
 """
 
+from typing import List, Optional
 from services.role_service import RoleService
-from models.user import Role
-from fastapi import APIRouter, HTTPException
+from services.versioning import VersionConflict, make_etag, match, none_match
+from models.bulk import BulkResult
+from models.user import Role, RoleCreate, RoleUpdate
+from config.database import connection_scope
+from fastapi import APIRouter, Body, Header, HTTPException, Response
 
 
 router = APIRouter(
@@ -29,6 +42,7 @@ router = APIRouter(
 
 
 @router.post("/", response_model=Role)
+@connection_scope()
 def create_role(name: str) -> Role:
     """
     Create a new role.
@@ -43,48 +57,123 @@ def create_role(name: str) -> Role:
     return role
 
 
+@router.post("/bulk", response_model=BulkResult)
+@connection_scope()
+def bulk_create_roles(roles: List[RoleCreate]) -> BulkResult:
+    """
+    Create many roles in one transaction.
+
+    Args:
+        roles (List[RoleCreate]): The roles to create.
+
+    Returns:
+        BulkResult: The created roles and the rows that failed, with the reason.
+    """
+    return RoleService.bulk_create_roles(roles)
+
+
+@router.put("/bulk", response_model=BulkResult)
+@connection_scope()
+def bulk_update_roles(roles: List[RoleUpdate]) -> BulkResult:
+    """
+    Update many roles in one transaction.
+
+    Args:
+        roles (List[RoleUpdate]): The roles to update.
+
+    Returns:
+        BulkResult: The updated roles and the rows that failed, with the reason.
+    """
+    return RoleService.bulk_update_roles(roles)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+@connection_scope()
+def bulk_delete_roles(role_ids: List[int] = Body(...)) -> BulkResult:
+    """
+    Delete many roles in one transaction.
+
+    Args:
+        role_ids (List[int]): The IDs of the roles to delete.
+
+    Returns:
+        BulkResult: The deleted roles and the IDs that were not found.
+    """
+    return RoleService.bulk_delete_roles(role_ids)
+
+
 @router.get("/{role_id}", response_model=Role)
-def get_role(role_id: int) -> Role:
+@connection_scope()
+def get_role(
+    role_id: int, response: Response, if_none_match: Optional[str] = Header(None)
+) -> Role:
     """
     Retrieve role information by ID.
 
     Args:
         role_id (int): The ID of the role to retrieve.
+        if_none_match (Optional[str]): ETags of the copies the client already has.
 
     Returns:
-        Role: The role with the specified ID.
+        Role: The role with the specified ID, or an empty 304 response if the
+        client copy is current.
 
     Raises:
         HTTPException: If the role is not found.
     """
+    if if_none_match:
+        version = RoleService.get_role_version(role_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Role not found")
+        etag = make_etag(version)
+        if none_match(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
     role = RoleService.get_role_by_id(role_id)
     if role:
+        response.headers["ETag"] = make_etag(role.version)
         return role
     raise HTTPException(status_code=404, detail="Role not found")
 
 
 @router.put("/{role_id}", response_model=Role)
-def update_role(role_id: int, name: str) -> Role:
+@connection_scope()
+def update_role(
+    role_id: int, name: str, response: Response, if_match: Optional[str] = Header(None)
+) -> Role:
     """
     Update role information.
 
     Args:
         role_id (int): The ID of the role to update.
         name (str): The new name of the role.
+        if_match (Optional[str]): Only update the role if its ETag is one of these.
 
     Returns:
         Role: The updated role instance.
 
     Raises:
-        HTTPException: If the role is not found.
+        HTTPException: If the role is not found, or no longer matches `If-Match`.
     """
-    role = RoleService.update_role(role_id, name)
+    expected_version = None
+    if if_match:
+        expected_version = RoleService.get_role_version(role_id)
+        if expected_version is None:
+            raise HTTPException(status_code=404, detail="Role not found")
+        if not match(if_match, make_etag(expected_version)):
+            raise HTTPException(status_code=412, detail="Role has been modified")
+    try:
+        role = RoleService.update_role(role_id, name, expected_version)
+    except VersionConflict as exc:
+        raise HTTPException(status_code=412, detail="Role has been modified") from exc
     if role:
+        response.headers["ETag"] = make_etag(role.version)
         return role
     raise HTTPException(status_code=404, detail="Role not found")
 
 
 @router.delete("/{role_id}")
+@connection_scope()
 def delete_role(role_id: int) -> dict:
     """
     Delete a role by ID.
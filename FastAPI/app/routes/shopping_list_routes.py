@@ -0,0 +1,66 @@
+# app/shopping_list_routes.py
+
+"""
+Module that defines the routes for managing shopping lists.
+
+Available routes:
+
+- POST /shopping-lists/: Creates the shopping list for a menu.
+- GET /shopping-lists/{shopping_list_id}: Retrieves a shopping list with its ingredients.
+
+Each route uses the `ShoppingListService` to interact with the
+business logic related to shopping lists.
+"""
+
+from services.shopping_list_service import ShoppingListService
+from models.shopping_list import ShoppingListDetail
+from config.database import connection_scope
+from fastapi import APIRouter, HTTPException
+
+
+router = APIRouter(
+    prefix="/shopping-lists",
+    tags=["shopping lists"],
+)
+
+
+@router.post("/", response_model=ShoppingListDetail)
+@connection_scope()
+def create_shopping_list(menu_id: int) -> ShoppingListDetail:
+    """
+    Create the shopping list for a menu.
+
+    Args:
+        menu_id (int): The ID of the menu.
+
+    Returns:
+        ShoppingListDetail: The created shopping list with the missing ingredients.
+
+    Raises:
+        HTTPException: If the menu is not found.
+    """
+    shopping_list = ShoppingListService.create_from_menu(menu_id)
+    if shopping_list:
+        return shopping_list
+    raise HTTPException(status_code=404, detail="Menu not found")
+
+
+@router.get("/{shopping_list_id}", response_model=ShoppingListDetail)
+@connection_scope()
+def get_shopping_list(shopping_list_id: int) -> ShoppingListDetail:
+    """
+    Retrieve a shopping list with its ingredients.
+
+    Args:
+        shopping_list_id (int): The ID of the shopping list to retrieve.
+
+    Returns:
+        ShoppingListDetail: The shopping list with the specified ID.
+
+    Raises:
+        HTTPException: If the shopping list is not found.
+    """
+    shopping_list = ShoppingListService.get_shopping_list(shopping_list_id)
+    if shopping_list:
+        return shopping_list
+    raise HTTPException(status_code=404, detail="Shopping list not found")
@@ -0,0 +1,75 @@
+# app/suggestion_routes.py
+
+"""
+Module that defines the routes for pantry-driven recipe suggestions.
+
+Available routes:
+
+- GET /suggestions/{user_id}: Ranks the recipes against the user's pantry.
+- POST /suggestions/{user_id}: Ranks the recipes and stores the result.
+- POST /suggestions/index/refresh: Rebuilds the ingredient index.
+
+Each route uses the `SuggestionService` to interact with the
+business logic related to suggestions.
+"""
+
+from typing import List
+from services.suggestion_service import SuggestionService
+from models.suggest_recipe import RecipeSuggestion
+from config.database import connection_scope
+from fastapi import APIRouter
+
+
+router = APIRouter(
+    prefix="/suggestions",
+    tags=["suggestions"],
+)
+
+
+@router.post("/index/refresh")
+@connection_scope()
+def refresh_index() -> dict:
+    """
+    Rebuild the ingredient index of the worker process handling the request.
+
+    The other workers keep theirs up to date by polling the recipes table.
+
+    Returns:
+        dict: The number of indexed recipes.
+    """
+    index = SuggestionService.refresh_index()
+    return {"recipes": len(index.recipes)}
+
+
+@router.get("/{user_id}", response_model=List[RecipeSuggestion])
+@connection_scope()
+def get_suggestions(user_id: int, limit: int = 10) -> List[RecipeSuggestion]:
+    """
+    Rank the recipes against the user's pantry.
+
+    Args:
+        user_id (int): The ID of the user.
+        limit (int): The maximum number of suggestions to return.
+
+    Returns:
+        List[RecipeSuggestion]: The best recipes with their missing ingredients.
+    """
+    return SuggestionService.suggest_recipes(user_id, limit)
+
+
+@router.post("/{user_id}", response_model=List[RecipeSuggestion])
+@connection_scope()
+def create_suggestions(user_id: int, limit: int = 10) -> List[RecipeSuggestion]:
+    """
+    Rank the recipes against the user's pantry and store the result.
+
+    Args:
+        user_id (int): The ID of the user.
+        limit (int): The maximum number of suggestions to store.
+
+    Returns:
+        List[RecipeSuggestion]: The stored suggestions.
+    """
+    suggestions = SuggestionService.suggest_recipes(user_id, limit)
+    SuggestionService.save_suggestions(user_id, suggestions)
+    return suggestions
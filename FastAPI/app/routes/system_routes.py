@@ -0,0 +1,112 @@
+# app/system_routes.py
+
+"""
+Module that defines operational routes for the API.
+
+Available routes:
+
+- GET /system/pool: Retrieves the database connection pool statistics.
+- GET /system/async-pool: Retrieves the async connection pool statistics.
+- GET /system/cache: Retrieves the reference cache hit and miss counters.
+- GET /system/queries: Retrieves the database activity per route.
+- GET /system/notifications: Retrieves the notification queue statistics.
+- GET /system/notification-streams: Retrieves the notification stream statistics.
+- GET /system/recipe-scaling: Retrieves the batch-cooking cache statistics.
+"""
+
+from typing import List
+from config.database import pool_stats
+from config.async_database import async_database
+from middleware.query_metrics import RouteQueryReport
+from services.notification_hub import NotificationHub
+from services.notification_queue import NotificationQueue
+from services.recipe_scaling_service import RecipeScalingService
+from services.reference_cache import ReferenceCache
+from fastapi import APIRouter
+
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"],
+)
+
+
+@router.get("/pool")
+def get_pool_stats() -> dict:
+    """
+    Retrieve the database connection pool statistics.
+
+    Returns:
+        dict: The pool limits and the number of connections in use and idle.
+    """
+    return pool_stats()
+
+
+@router.get("/async-pool")
+async def get_async_pool_stats() -> dict:
+    """
+    Retrieve the async connection pool statistics.
+
+    Returns:
+        dict: The pool limits and the number of open and free connections.
+    """
+    return async_database.stats()
+
+
+@router.get("/cache")
+def get_cache_stats() -> dict:
+    """
+    Retrieve the reference cache statistics.
+
+    Returns:
+        dict: The hit and miss counters and the number of cached rows per table.
+    """
+    return ReferenceCache.stats()
+
+
+@router.get("/queries")
+def get_query_report() -> List[dict]:
+    """
+    Retrieve the database activity recorded per route.
+
+    Returns:
+        List[dict]: For every method and route template, the number of requests
+        and statements, the time spent in the database and waiting for a
+        connection, and the slowest statement seen, busiest routes first.
+    """
+    return RouteQueryReport.snapshot()
+
+
+@router.get("/notifications")
+def get_notification_stats() -> dict:
+    """
+    Retrieve the notification queue statistics.
+
+    Returns:
+        dict: The queue depth and capacity, the rows published, written,
+        coalesced and dropped, and the duration of the last flush.
+    """
+    return NotificationQueue.stats()
+
+
+@router.get("/notification-streams")
+async def get_notification_stream_stats() -> dict:
+    """
+    Retrieve the notification stream statistics.
+
+    Returns:
+        dict: The open streams and their users, the cursor of the hub, and the
+        polls, deliveries and overflows since startup.
+    """
+    return NotificationHub.stats()
+
+
+@router.get("/recipe-scaling")
+def get_recipe_scaling_stats() -> dict:
+    """
+    Retrieve the batch-cooking cache statistics.
+
+    Returns:
+        dict: The size, capacity, hits and misses of the result and matrix caches.
+    """
+    return RecipeScalingService.stats()
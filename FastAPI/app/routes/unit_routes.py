@@ -0,0 +1,36 @@
+# app/unit_routes.py
+
+"""
+Module that defines the routes for the units of measure.
+
+Available routes:
+
+- GET /units/: Retrieves the unit catalogue.
+
+The catalogue is served from the `ReferenceCache` through the `UnitService`,
+without touching the database. Pantry products and recipe ingredients give
+their unit as the ID of one of these units.
+"""
+
+from typing import List
+from models.unit import Unit
+from services.unit_service import UnitService
+from fastapi import APIRouter
+
+
+router = APIRouter(
+    prefix="/units",
+    tags=["units"],
+)
+
+
+@router.get("/", response_model=List[Unit])
+def list_units() -> List[Unit]:
+    """
+    Retrieve the unit catalogue.
+
+    Returns:
+        List[Unit]: Every unit with its dimension and its factor to the base
+        unit of the dimension, ordered by ID.
+    """
+    return UnitService.list_units()
@@ -8,18 +8,41 @@ creating, reading, updating, and deleting users through a REST API.
 
 Available routes:
 
+- GET /users/: Lists users, one keyset page at a time.
 - POST /users/: Creates a new user.
+- POST /users/login: Checks a user's email and password.
+- POST /users/bulk: Creates many users from a JSON body.
+- PUT /users/bulk: Updates many users from a JSON body.
+- DELETE /users/bulk: Deletes many users by ID.
 - GET /users/{user_id}: Retrieves user information by ID.
 - PUT /users/{user_id}: Updates user information.
 - DELETE /users/{user_id}: Deletes a user.
+- GET /users/{user_id}/menus: Retrieves a user's menus between two dates, with
+  their recipes and ingredients.
 
 Each route uses the `UserService` to interact with the
-business logic related to users.
+business logic related to users, or the `MenuService` for a user's menus,
+and holds a pooled database connection for its duration through
+`connection_scope`.
+
+`GET` and `PUT /users/{user_id}` send a strong `ETag` built from the versions
+of the user and of its embedded role. `GET` answers `If-None-Match` with
+`304 Not Modified` after reading only those versions, and `PUT` refuses a
+write with `412 Precondition Failed` when the user no longer matches `If-Match`.
 """
 
+import datetime
+from typing import List, Optional
+from services.menu_service import MenuService
 from services.user_service import UserService
-from models.user import User
-from fastapi import APIRouter, HTTPException
+from models.bulk import BulkResult
+from models.menu import MenuDetail
+from models.user import User, UserCreate, UserUpdate
+from config.database import connection_scope
+from services.pagination import MAX_PAGE_SIZE
+from services.versioning import VersionConflict, make_etag, match, none_match
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 
 router = APIRouter(
@@ -28,7 +51,31 @@ router = APIRouter(
 )
 
 
+@router.get("/")
+def list_users(
+    after: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    role_id: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    List users ordered by ID, streamed as they are read.
+
+    Args:
+        after (Optional[int]): The `next_after` value of the previous page.
+        limit (int): The maximum number of users in the page.
+        role_id (Optional[int]): Only return users with this role.
+
+    Returns:
+        StreamingResponse: A JSON object with the `items` of the page and the
+        `next_after` cursor of the following page, null on the last page.
+    """
+    return StreamingResponse(
+        UserService.stream_users(after, limit, role_id), media_type="application/json"
+    )
+
+
 @router.post("/", response_model=User)
+@connection_scope()
 def create_user(name: str, email: str, password: str, role_id: int) -> User:
     """
     Create a new user.
@@ -46,29 +93,122 @@ def create_user(name: str, email: str, password: str, role_id: int) -> User:
     return user
 
 
+@router.post("/login", response_model=User)
+@connection_scope()
+def login(email: str = Body(...), password: str = Body(...)) -> User:
+    """
+    Check a user's email and password.
+
+    Args:
+        email (str): The email of the user.
+        password (str): The password of the user.
+
+    Returns:
+        User: The authenticated user.
+
+    Raises:
+        HTTPException: If the credentials are not valid.
+    """
+    user = UserService.authenticate(email, password)
+    if user:
+        return user
+    raise HTTPException(status_code=401, detail="Invalid email or password")
+
+
+@router.post("/bulk", response_model=BulkResult)
+@connection_scope()
+def bulk_create_users(users: List[UserCreate]) -> BulkResult:
+    """
+    Create many users in one transaction.
+
+    Args:
+        users (List[UserCreate]): The users to create.
+
+    Returns:
+        BulkResult: The created users and the rows that failed, with the reason.
+    """
+    return UserService.bulk_create_users(users)
+
+
+@router.put("/bulk", response_model=BulkResult)
+@connection_scope()
+def bulk_update_users(users: List[UserUpdate]) -> BulkResult:
+    """
+    Update many users in one transaction.
+
+    Args:
+        users (List[UserUpdate]): The users to update.
+
+    Returns:
+        BulkResult: The updated users and the rows that failed, with the reason.
+    """
+    return UserService.bulk_update_users(users)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+@connection_scope()
+def bulk_delete_users(user_ids: List[int] = Body(...)) -> BulkResult:
+    """
+    Delete many users in one transaction.
+
+    Args:
+        user_ids (List[int]): The IDs of the users to delete.
+
+    Returns:
+        BulkResult: The deleted users and the IDs that were not found.
+    """
+    return UserService.bulk_delete_users(user_ids)
+
+
+def _user_etag(user: User) -> str:
+    """Build the ETag of a user, which also changes when its role is renamed."""
+    return make_etag(user.version, user.role.id, user.role.version)
+
+
 @router.get("/{user_id}", response_model=User)
-def get_user(user_id: int) -> User:
+@connection_scope()
+def get_user(
+    user_id: int, response: Response, if_none_match: Optional[str] = Header(None)
+) -> User:
     """
     Retrieve user information by ID.
 
     Args:
         user_id (int): The ID of the user to retrieve.
+        if_none_match (Optional[str]): ETags of the copies the client already has.
 
     Returns:
-        User: The user with the specified ID.
+        User: The user with the specified ID, or an empty 304 response if the
+        client copy is current.
 
     Raises:
         HTTPException: If the user is not found.
     """
+    if if_none_match:
+        versions = UserService.get_user_versions(user_id)
+        if versions is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        etag = make_etag(*versions)
+        if none_match(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
     user = UserService.get_user_by_id(user_id)
     if user:
+        response.headers["ETag"] = _user_etag(user)
         return user
     raise HTTPException(status_code=404, detail="User not found")
 
 
 @router.put("/{user_id}", response_model=User)
+@connection_scope()
 def update_user(
-    user_id: int, name: str = None, email: str = None, password: str = None, role_id: int = None
+    user_id: int,
+    response: Response,
+    name: str = None,
+    email: str = None,
+    password: str = None,
+    role_id: int = None,
+    if_match: Optional[str] = Header(None),
 ) -> User:
     """
     Update user information.
@@ -79,20 +219,36 @@ def update_user(
         email (str, optional): The new email of the user.
         password (str, optional): The new password of the user.
         role_id (int, optional): The new role's ID.
+        if_match (Optional[str]): Only update the user if its ETag is one of these.
 
     Returns:
         User: The updated user instance.
 
     Raises:
-        HTTPException: If the user is not found.
+        HTTPException: If the user is not found, or no longer matches `If-Match`.
     """
-    user = UserService.update_user(user_id, name, email, password, role_id)
+    expected_version = None
+    if if_match:
+        versions = UserService.get_user_versions(user_id)
+        if versions is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        if not match(if_match, make_etag(*versions)):
+            raise HTTPException(status_code=412, detail="User has been modified")
+        expected_version = versions[0]
+    try:
+        user = UserService.update_user(
+            user_id, name, email, password, role_id, expected_version=expected_version
+        )
+    except VersionConflict as exc:
+        raise HTTPException(status_code=412, detail="User has been modified") from exc
     if user:
+        response.headers["ETag"] = _user_etag(user)
         return user
     raise HTTPException(status_code=404, detail="User not found")
 
 
 @router.delete("/{user_id}")
+@connection_scope()
 def delete_user(user_id: int) -> dict:
     """
     Delete a user by ID.
@@ -109,3 +265,33 @@ def delete_user(user_id: int) -> dict:
     if UserService.delete_user(user_id):
         return {"message": "User deleted successfully"}
     raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.get("/{user_id}/menus", response_model=List[MenuDetail])
+@connection_scope()
+def get_user_menus(
+    user_id: int,
+    date_from: datetime.date = Query(..., alias="from"),
+    date_to: datetime.date = Query(..., alias="to"),
+) -> List[MenuDetail]:
+    """
+    Retrieve a user's menus between two dates, for the weekly calendar.
+
+    Args:
+        user_id (int): The ID of the user.
+        date_from (datetime.date): The first day of the range.
+        date_to (datetime.date): The last day of the range, included.
+
+    Returns:
+        List[MenuDetail]: The menus ordered by date, each one with its recipes and
+        their ingredients, category and difficulty.
+
+    Raises:
+        HTTPException: If the range is reversed or the user is not found.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+    menus = MenuService.get_calendar(user_id, date_from, date_to)
+    if menus is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return menus
@@ -0,0 +1,58 @@
+"""
+Production launcher for the API.
+
+Runs `main:app` under uvicorn with `SERVER["workers"]` processes, one per
+available core by default. Every worker imports the application on its own, so
+it opens its own database pools, sized by splitting `DB_CONNECTION_BUDGET`
+between the workers, and builds its own copy of the in-memory indexes at
+startup. A worker only updates its indexes for the writes it handles itself;
+the recipe indexes pick up the writes of the other workers by polling the
+recipes table at most every `RECIPE_INDEX_SYNC["interval"]` seconds, and the
+reference cache reloads its tables after `REFERENCE_CACHE["ttl"]` seconds.
+Workers that exit unexpectedly are replaced.
+
+On SIGTERM or SIGINT the server stops accepting connections, lets the requests
+in flight finish for up to `SERVER["graceful_timeout"]` seconds and runs the
+lifespan shutdown of every worker, which closes its pools.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import os
+import uvicorn
+from config.settings import SERVER
+
+
+def main() -> None:
+    """Parse the command line arguments and run the server until it is stopped."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--host", default=SERVER["host"])
+    parser.add_argument("--port", type=int, default=SERVER["port"])
+    parser.add_argument("--workers", type=int, default=SERVER["workers"])
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=SERVER["graceful_timeout"],
+        help="Seconds to wait for requests in flight on shutdown",
+    )
+    parser.add_argument("--log-level", default="info", help="'warning' also drops the access log")
+    args = parser.parse_args()
+
+    # Workers read the settings again when they import the application, and
+    # size their pools from the worker count they find there
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=SERVER["keep_alive"],
+        proxy_headers=True,
+        server_header=False,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
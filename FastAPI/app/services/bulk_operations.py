@@ -0,0 +1,165 @@
+# app/services/bulk_operations.py
+
+"""
+Batched write helpers shared by the bulk service methods.
+
+Rows are written in chunks of `BULK_BATCH_SIZE` with one statement per chunk.
+Each chunk runs in its own savepoint: when a chunk violates a constraint, it is
+rolled back and replayed row by row, so only the offending rows are reported
+as errors and the rest of the batch still goes through. Callers are expected
+to wrap the call in `database.atomic()` so the whole batch is one transaction.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+from peewee import Case, IntegrityError, Model, chunked, fn
+from config.database import database
+from models.bulk import BulkError, BulkItem
+
+# Rows per INSERT, UPDATE or DELETE statement
+BULK_BATCH_SIZE = 500
+
+
+def bulk_insert(
+    model: type[Model], rows: List[Tuple[int, dict]]
+) -> Tuple[List[BulkItem], List[BulkError]]:
+    """
+    Insert rows with chunked `insert_many` calls.
+
+    The ids of the new rows are read back with a single query for the rows above
+    the highest id seen when the batch started. This relies on the transaction
+    snapshot opened by that first read, so it must run inside `database.atomic()`.
+
+    Args:
+        model (type[Model]): The model to insert into.
+        rows (List[Tuple[int, dict]]): The position of each row in the request and
+            its field values.
+
+    Returns:
+        Tuple[List[BulkItem], List[BulkError]]: The inserted rows with their new
+        ids and the rows that could not be inserted.
+    """
+    errors: List[BulkError] = []
+    inserted: List[int] = []
+    max_id = model.select(fn.MAX(model.id)).scalar() or 0
+
+    for chunk in chunked(rows, BULK_BATCH_SIZE):
+        try:
+            with database.atomic():
+                model.insert_many([data for _, data in chunk]).execute()
+            inserted.extend(index for index, _ in chunk)
+        except IntegrityError:
+            for index, data in chunk:
+                try:
+                    with database.atomic():
+                        model.insert(data).execute()
+                    inserted.append(index)
+                except IntegrityError as exc:
+                    errors.append(BulkError(index=index, detail=str(exc)))
+
+    if not inserted:
+        return [], errors
+    new_ids = (
+        model.select(model.id).where(model.id > max_id).order_by(model.id).limit(len(inserted))
+    )
+    items = [
+        BulkItem(index=index, id=new_id)
+        for index, (new_id,) in zip(inserted, new_ids.tuples())
+    ]
+    return items, errors
+
+
+def bulk_update(
+    model: type[Model], rows: List[Tuple[int, int, dict]]
+) -> Tuple[List[BulkItem], List[BulkError]]:
+    """
+    Update rows with one `UPDATE ... SET field = CASE id ... END` per chunk.
+
+    Models with a `version` column have it incremented on every updated row.
+
+    Args:
+        model (type[Model]): The model to update.
+        rows (List[Tuple[int, int, dict]]): The position of each row in the request,
+            the id of the entity and the fields to change, keyed by field object.
+
+    Returns:
+        Tuple[List[BulkItem], List[BulkError]]: The updated rows and the rows that
+        could not be updated.
+    """
+    items: List[BulkItem] = []
+    errors: List[BulkError] = []
+    bump = {model.version: model.version + 1} if hasattr(model, "version") else {}
+
+    for chunk in chunked(rows, BULK_BATCH_SIZE):
+        values: Dict = {}
+        for _, entity_id, fields in chunk:
+            for field, value in fields.items():
+                values.setdefault(field, []).append((entity_id, value))
+        try:
+            with database.atomic():
+                if values:
+                    model.update(
+                        {
+                            **{
+                                field: Case(model.id, cases, field)
+                                for field, cases in values.items()
+                            },
+                            **bump,
+                        }
+                    ).where(model.id.in_([entity_id for _, entity_id, _ in chunk])).execute()
+            items.extend(BulkItem(index=index, id=entity_id) for index, entity_id, _ in chunk)
+        except IntegrityError:
+            for index, entity_id, fields in chunk:
+                try:
+                    with database.atomic():
+                        if fields:
+                            model.update({**fields, **bump}).where(
+                                model.id == entity_id
+                            ).execute()
+                    items.append(BulkItem(index=index, id=entity_id))
+                except IntegrityError as exc:
+                    errors.append(BulkError(index=index, detail=str(exc)))
+    return items, errors
+
+
+def bulk_delete(model: type[Model], ids: List[int]) -> Tuple[List[BulkItem], List[BulkError]]:
+    """
+    Delete rows by id with one `DELETE ... WHERE id IN (...)` per chunk.
+
+    Args:
+        model (type[Model]): The model to delete from.
+        ids (List[int]): The ids to delete, in request order.
+
+    Returns:
+        Tuple[List[BulkItem], List[BulkError]]: The deleted rows and the ids that
+        were not found.
+    """
+    items: List[BulkItem] = []
+    errors: List[BulkError] = []
+
+    for chunk in chunked(list(enumerate(ids)), BULK_BATCH_SIZE):
+        found = existing_ids(model, [entity_id for _, entity_id in chunk])
+        if found:
+            model.delete().where(model.id.in_(found)).execute()
+        for index, entity_id in chunk:
+            if entity_id in found:
+                items.append(BulkItem(index=index, id=entity_id))
+            else:
+                errors.append(BulkError(index=index, detail=f"Id {entity_id} not found"))
+    return items, errors
+
+
+def existing_ids(model: type[Model], ids: Iterable[int]) -> set:
+    """
+    Return which of the given ids exist, in a single query.
+
+    Args:
+        model (type[Model]): The model to look up.
+        ids (Iterable[int]): The ids to check.
+
+    Returns:
+        set: The ids that exist.
+    """
+    ids = set(ids)
+    if not ids:
+        return set()
+    return {entity_id for (entity_id,) in model.select(model.id).where(model.id.in_(ids)).tuples()}
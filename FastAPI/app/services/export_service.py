@@ -0,0 +1,232 @@
+# app/services/export_service.py
+
+"""
+Service module for exporting the recipe catalogue.
+
+Recipes are walked in keyset chunks of `EXPORT_BATCH_SIZE` on the primary key,
+and the ingredients of each chunk are read with one extra query, so an export
+costs two queries per chunk whatever the size of the catalogue. Every chunk is
+serialized and, optionally, gzip-compressed before the next one is read, which
+keeps memory flat.
+
+As in `services.pagination`, each chunk checks out its own connection and
+releases it before yielding, because Starlette advances sync iterators from
+arbitrary threadpool workers.
+"""
+
+import csv
+import io
+import zlib
+from typing import Dict, Iterator, List, Optional
+import orjson
+from config.database import (
+    connection_scope,
+    IngredientModel,
+    RecipeIngredientModel,
+    RecipeModel,
+)
+from services.reference_cache import CATEGORIES, DIFFICULTIES, ReferenceCache
+
+# Recipes read per chunk
+EXPORT_BATCH_SIZE = 1_000
+
+# Supported formats and their media types
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "recipe_id",
+    "name",
+    "instruction",
+    "preparation_time",
+    "user_id",
+    "category_id",
+    "category",
+    "difficulty_id",
+    "difficulty",
+    "ingredient_id",
+    "ingredient",
+    "quantity",
+    "unit",
+]
+
+
+def _reference_name(table: str, entity_id: int) -> Optional[str]:
+    entity = ReferenceCache.get(table, entity_id)
+    return entity.name if entity else None
+
+
+def _read_chunk(after: int, user_id: Optional[int]) -> List[dict]:
+    """Read the recipes following `after` together with their ingredients."""
+    query = RecipeModel.select(
+        RecipeModel.id,
+        RecipeModel.name,
+        RecipeModel.instruction,
+        RecipeModel.preparation_time,
+        RecipeModel.user,
+        RecipeModel.category,
+        RecipeModel.difficulty,
+    ).where(RecipeModel.id > after)
+    if user_id is not None:
+        query = query.where(RecipeModel.user == user_id)
+
+    with connection_scope():
+        recipes = [
+            {
+                "id": recipe_id,
+                "name": name,
+                "instruction": instruction,
+                "preparation_time": preparation_time,
+                "user_id": owner_id,
+                "category": {"id": category_id, "name": _reference_name(CATEGORIES, category_id)},
+                "difficulty": {
+                    "id": difficulty_id,
+                    "name": _reference_name(DIFFICULTIES, difficulty_id),
+                },
+                "ingredients": [],
+            }
+            for (
+                recipe_id,
+                name,
+                instruction,
+                preparation_time,
+                owner_id,
+                category_id,
+                difficulty_id,
+            ) in query.order_by(RecipeModel.id).limit(EXPORT_BATCH_SIZE).tuples().iterator()
+        ]
+        if not recipes:
+            return recipes
+
+        by_id: Dict[int, dict] = {recipe["id"]: recipe for recipe in recipes}
+        ingredients = (
+            RecipeIngredientModel.select(
+                RecipeIngredientModel.recipe_id,
+                IngredientModel.id,
+                IngredientModel.name,
+                RecipeIngredientModel.quantity,
+                RecipeIngredientModel.unit,
+            )
+            .join(IngredientModel)
+            .where(RecipeIngredientModel.recipe_id.in_(list(by_id)))
+            .order_by(RecipeIngredientModel.recipe_id, IngredientModel.id)
+            .tuples()
+        )
+        for recipe_id, ingredient_id, ingredient, quantity, unit in ingredients.iterator():
+            by_id[recipe_id]["ingredients"].append(
+                {"id": ingredient_id, "name": ingredient, "quantity": quantity, "unit": unit}
+            )
+    return recipes
+
+
+def _ndjson(recipes: List[dict]) -> bytes:
+    # orjson writes compact UTF-8, as json.dumps with ensure_ascii=False did
+    return b"".join(orjson.dumps(recipe, option=orjson.OPT_APPEND_NEWLINE) for recipe in recipes)
+
+
+def _csv_rows(recipes: List[dict]) -> Iterator[list]:
+    """Flatten recipes to one row per ingredient, or one row for a recipe without any."""
+    for recipe in recipes:
+        head = [
+            recipe["id"],
+            recipe["name"],
+            recipe["instruction"],
+            recipe["preparation_time"],
+            recipe["user_id"],
+            recipe["category"]["id"],
+            recipe["category"]["name"],
+            recipe["difficulty"]["id"],
+            recipe["difficulty"]["name"],
+        ]
+        if not recipe["ingredients"]:
+            yield head + ["", "", "", ""]
+        for ingredient in recipe["ingredients"]:
+            yield head + [
+                ingredient["id"],
+                ingredient["name"],
+                ingredient["quantity"],
+                ingredient["unit"],
+            ]
+
+
+class ExportService:
+    """Service layer for catalogue exports"""
+
+    @staticmethod
+    def export_recipes(
+        export_format: str = "ndjson",
+        user_id: Optional[int] = None,
+        compress: bool = False,
+        stats: Optional[dict] = None,
+    ) -> Iterator[bytes]:
+        """
+        Export recipes with their category, difficulty and ingredients.
+
+        NDJSON writes one recipe per line with its ingredients nested; CSV writes
+        one row per recipe ingredient with the recipe columns repeated.
+
+        Args:
+            export_format (str): Either "ndjson" or "csv".
+            user_id (Optional[int]): Only export the recipes of this user.
+            compress (bool): Whether to gzip the output.
+            stats (Optional[dict]): If given, "recipes" and "rows" are kept up to
+                date in it as the export progresses.
+
+        Yields:
+            bytes: Consecutive pieces of the export.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        if stats is None:
+            stats = {}
+        stats.update(recipes=0, rows=0)
+        return ExportService._generate(export_format, user_id, compress, stats)
+
+    @staticmethod
+    def _generate(
+        export_format: str, user_id: Optional[int], compress: bool, stats: dict
+    ) -> Iterator[bytes]:
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        if export_format == "csv":
+            writer.writerow(CSV_COLUMNS)
+
+        after = 0
+        while True:
+            recipes = _read_chunk(after, user_id)
+            if not recipes:
+                break
+            after = recipes[-1]["id"]
+
+            if export_format == "ndjson":
+                data = _ndjson(recipes)
+                rows = len(recipes)
+            else:
+                writer.writerows(_csv_rows(recipes))
+                rows = sum(max(len(recipe["ingredients"]), 1) for recipe in recipes)
+                data = buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+            stats["recipes"] += len(recipes)
+            stats["rows"] += rows
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+            if len(recipes) < EXPORT_BATCH_SIZE:
+                break
+
+        # Whatever is left in the buffer, i.e. the CSV header of an empty export
+        data = buffer.getvalue().encode()
+        if compressor:
+            data = compressor.compress(data) + compressor.flush()
+        if data:
+            yield data
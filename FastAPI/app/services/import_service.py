@@ -0,0 +1,381 @@
+# app/services/import_service.py
+
+"""
+Service module for bulk-loading recipe datasets.
+
+The input is streamed record by record in the formats written by
+`services.export_service` (NDJSON, or CSV with one row per recipe ingredient)
+as well as plain JSON arrays, and imported in batches of `IMPORT_BATCH_SIZE`
+recipes, each in its own transaction:
+
+1. Ingredient names are resolved through an in-memory name -> id map seeded
+   from `IngredientModel` once, so there is no SELECT per ingredient. Names are
+   deduplicated case-insensitively and only the unseen ones are inserted.
+2. Recipes and their ingredient links are written with chunked `insert_many`
+   calls through `services.bulk_operations`.
+
+After every committed batch its recipes are added to the in-memory indexes of
+`SearchService` and `SuggestionService`, when this process has built them, and
+the number of records consumed is saved to an optional checkpoint file, so a
+crashed import can be restarted with the same checkpoint and continues after
+the last committed batch. A crash between the commit and the checkpoint write
+replays that one batch.
+"""
+
+import csv
+import itertools
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from peewee import chunked
+from config.database import (
+    CategoryModel,
+    DifficultyModel,
+    IngredientModel,
+    RecipeIngredientModel,
+    RecipeModel,
+    UserModel,
+    connection_scope,
+    database,
+)
+from models.recipe import Category, Difficulty
+from services.bulk_operations import BULK_BATCH_SIZE, bulk_insert, existing_ids
+from services.reference_cache import CATEGORIES, DIFFICULTIES, ReferenceCache
+from services.search_service import SearchService
+from services.suggestion_service import SuggestionService
+
+# Recipes per transaction
+IMPORT_BATCH_SIZE = 5_000
+
+IMPORT_FORMATS = ("ndjson", "json", "csv")
+
+# Rejected records reported in full; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+# Characters read at a time from a JSON array
+_READ_SIZE = 1 << 16
+
+
+def _iter_json_array(stream: TextIO) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof, opened = "", 0, False, False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = stream.read(_READ_SIZE)
+            buffer, position, eof = chunk, 0, not chunk
+            continue
+        if not opened:
+            if buffer[position] != "[":
+                raise ValueError("Expected a JSON array")
+            opened = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The element continues past the end of the buffer
+            chunk = stream.read(_READ_SIZE)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            continue
+        yield record
+
+
+def _iter_csv(stream: TextIO) -> Iterator[dict]:
+    """Group consecutive CSV rows of the same recipe into one record."""
+    rows = csv.DictReader(stream)
+    key = "recipe_id" if rows.fieldnames and "recipe_id" in rows.fieldnames else "name"
+    for _, group in itertools.groupby(rows, key=lambda row: row[key]):
+        group = list(group)
+        first = group[0]
+        yield {
+            "name": first.get("name"),
+            "instruction": first.get("instruction"),
+            "preparation_time": first.get("preparation_time"),
+            "user_id": first.get("user_id") or None,
+            "category_id": first.get("category_id") or None,
+            "category": first.get("category") or None,
+            "difficulty_id": first.get("difficulty_id") or None,
+            "difficulty": first.get("difficulty") or None,
+            "ingredients": [
+                {
+                    "name": row["ingredient"],
+                    "quantity": row.get("quantity"),
+                    "unit": row.get("unit"),
+                }
+                for row in group
+                if row.get("ingredient")
+            ],
+        }
+
+
+def read_records(stream: TextIO, import_format: str) -> Iterator[dict]:
+    """
+    Stream the recipe records of an input file.
+
+    Args:
+        stream (TextIO): The open input.
+        import_format (str): One of "ndjson", "json" or "csv".
+
+    Yields:
+        dict: One recipe with its nested ingredients.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if import_format == "ndjson":
+        return (json.loads(line) for line in stream if line.strip())
+    if import_format == "json":
+        return _iter_json_array(stream)
+    if import_format == "csv":
+        return _iter_csv(stream)
+    raise ValueError(f"Unsupported import format: {import_format}")
+
+
+def _name_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class RecipeImporter:
+    """Imports batches of recipe records, keeping the name -> id maps between batches"""
+
+    def __init__(self, default_user_id: Optional[int] = None):
+        self.default_user_id = default_user_id
+        self._ingredients: Dict[str, int] = {}
+        self._references: Dict[str, Dict[str, int]] = {}
+
+    def seed(self) -> None:
+        """Load the existing ingredient, category and difficulty names, one query each."""
+        with connection_scope():
+            ingredients = IngredientModel.select(IngredientModel.id, IngredientModel.name)
+            for ingredient_id, name in ingredients.tuples().iterator():
+                self._ingredients.setdefault(_name_key(name), ingredient_id)
+            ReferenceCache.reload(CATEGORIES)
+            ReferenceCache.reload(DIFFICULTIES)
+        for table in (CATEGORIES, DIFFICULTIES):
+            self._references[table] = {
+                _name_key(entity.name): entity_id
+                for entity_id, entity in ReferenceCache.all(table).items()
+            }
+
+    def _reference_id(self, table: str, record: dict) -> int:
+        """Resolve a category or difficulty given by id or by name, creating unknown names."""
+        field = "category" if table == CATEGORIES else "difficulty"
+        value = record.get(field)
+        entity_id = record.get(f"{field}_id")
+        name = value
+        if isinstance(value, dict):
+            entity_id = entity_id or value.get("id")
+            name = value.get("name")
+        if name:
+            key = _name_key(str(name))
+            if key not in self._references[table]:
+                model, schema = (
+                    (CategoryModel, Category)
+                    if table == CATEGORIES
+                    else (DifficultyModel, Difficulty)
+                )
+                with connection_scope():
+                    instance = model.create(name=str(name).strip())
+                ReferenceCache.put(table, schema.model_validate(instance))
+                self._references[table][key] = instance.id
+            return self._references[table][key]
+        if entity_id and ReferenceCache.get(table, int(entity_id)) is not None:
+            return int(entity_id)
+        raise ValueError(f"Unknown {field}: {entity_id}")
+
+    def _parse(self, record: dict) -> Tuple[dict, List[Tuple[str, str, int, float]]]:
+        """Validate a record and split it into the recipe row and its ingredients."""
+        name = (record.get("name") or "").strip()
+        if not name:
+            raise ValueError("Missing recipe name")
+        user_id = record.get("user_id") or self.default_user_id
+        if not user_id:
+            raise ValueError("Missing user_id")
+        row = {
+            "name": name,
+            "instruction": record.get("instruction") or "",
+            "preparation_time": int(record.get("preparation_time") or 0),
+            "user": int(user_id),
+            "category": self._reference_id(CATEGORIES, record),
+            "difficulty": self._reference_id(DIFFICULTIES, record),
+        }
+        ingredients = []
+        for ingredient in record.get("ingredients") or []:
+            if isinstance(ingredient, str):
+                ingredient = {"name": ingredient}
+            ingredient_name = " ".join((ingredient.get("name") or "").split())
+            if not ingredient_name:
+                raise ValueError("Missing ingredient name")
+            ingredients.append(
+                (
+                    _name_key(ingredient_name),
+                    ingredient_name,
+                    int(float(ingredient.get("quantity") or 0)),
+                    float(ingredient.get("unit") or 0),
+                )
+            )
+        return row, ingredients
+
+    def import_batch(self, records: List[Tuple[int, dict]], stats: dict) -> None:
+        """
+        Import one batch of records in a single transaction.
+
+        Args:
+            records (List[Tuple[int, dict]]): The position of each record in the input
+                and the record itself.
+            stats (dict): Counters updated with what was written and rejected.
+        """
+        parsed = []
+        rejected = []
+        for position, record in records:
+            try:
+                parsed.append((position, *self._parse(record)))
+            except (ValueError, TypeError, AttributeError) as exc:
+                rejected.append((position, str(exc)))
+
+        new_ingredients: Dict[str, int] = {}
+        with connection_scope(), database.atomic():
+            users = existing_ids(UserModel, {row["user"] for _, row, _ in parsed})
+            for position, row, _ in parsed:
+                if row["user"] not in users:
+                    rejected.append((position, f"User with id {row['user']} not found"))
+            parsed = [entry for entry in parsed if entry[1]["user"] in users]
+
+            unseen = {}
+            for _, _, ingredients in parsed:
+                for key, display_name, _, _ in ingredients:
+                    if key not in self._ingredients:
+                        unseen.setdefault(key, display_name)
+            if unseen:
+                keys = list(unseen)
+                items, _ = bulk_insert(
+                    IngredientModel,
+                    [(index, {"name": unseen[key]}) for index, key in enumerate(keys)],
+                )
+                new_ingredients = {keys[item.index]: item.id for item in items}
+
+            recipe_items, recipe_errors = bulk_insert(
+                RecipeModel, [(index, row) for index, (_, row, _) in enumerate(parsed)]
+            )
+            for error in recipe_errors:
+                rejected.append((parsed[error.index][0], error.detail))
+
+            links = []
+            for item in recipe_items:
+                seen = set()
+                for key, _, quantity, unit in parsed[item.index][2]:
+                    ingredient_id = self._ingredients.get(key) or new_ingredients.get(key)
+                    if ingredient_id is None or ingredient_id in seen:
+                        continue
+                    seen.add(ingredient_id)
+                    links.append(
+                        {
+                            "recipe_id": item.id,
+                            "ingredient_id": ingredient_id,
+                            "quantity": quantity,
+                            "unit": unit,
+                        }
+                    )
+            for chunk in chunked(links, BULK_BATCH_SIZE):
+                RecipeIngredientModel.insert_many(chunk).execute()
+
+        # Only remember the new ids once they are committed
+        self._ingredients.update(new_ingredients)
+        recipe_ids = [item.id for item in recipe_items]
+        with connection_scope():
+            SearchService.index_recipes(recipe_ids)
+            SuggestionService.index_recipes(recipe_ids)
+        stats["recipes"] += len(recipe_items)
+        stats["ingredients"] += len(new_ingredients)
+        stats["links"] += len(links)
+        stats["skipped"] += len(rejected)
+        for position, detail in sorted(rejected)[: MAX_REPORTED_ERRORS - len(stats["errors"])]:
+            stats["errors"].append({"record": position, "detail": detail})
+
+
+def _load_checkpoint(path: Optional[str], source: str) -> Optional[dict]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        checkpoint = json.load(handle)
+    if checkpoint.get("source") != source:
+        raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('source')}, not {source}")
+    return checkpoint
+
+
+def _save_checkpoint(path: Optional[str], stats: dict) -> None:
+    if not path:
+        return
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(stats, handle)
+    os.replace(temporary, path)
+
+
+class ImportService:
+    """Service layer for bulk recipe imports"""
+
+    @staticmethod
+    def import_recipes(
+        records: Iterable[dict],
+        source: str,
+        default_user_id: Optional[int] = None,
+        checkpoint: Optional[str] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+    ) -> dict:
+        """
+        Import a stream of recipe records in batched transactions.
+
+        Args:
+            records (Iterable[dict]): The records, as produced by `read_records`.
+            source (str): A name for the input, stored in the checkpoint so it is
+                not resumed against a different file.
+            default_user_id (Optional[int]): The author of records without a `user_id`.
+            checkpoint (Optional[str]): Path of the checkpoint file. When it exists,
+                the records it already covers are skipped.
+            on_progress (Optional[Callable[[dict], None]]): Called with the counters
+                after every committed batch.
+
+        Returns:
+            dict: The number of records consumed and of recipes, new ingredients and
+            ingredient links written, the number of records skipped, the first
+            rejected records with the reason and whether the import completed.
+        """
+        stats = _load_checkpoint(checkpoint, source) or {
+            "source": source,
+            "records": 0,
+            "recipes": 0,
+            "ingredients": 0,
+            "links": 0,
+            "skipped": 0,
+            "errors": [],
+            "done": False,
+        }
+        if stats["done"]:
+            return stats
+
+        importer = RecipeImporter(default_user_id)
+        importer.seed()
+        remaining = enumerate(records)
+        if stats["records"]:
+            remaining = itertools.islice(remaining, stats["records"], None)
+
+        for batch in chunked(remaining, IMPORT_BATCH_SIZE):
+            importer.import_batch(batch, stats)
+            stats["records"] = batch[-1][0] + 1
+            _save_checkpoint(checkpoint, stats)
+            if on_progress:
+                on_progress(stats)
+
+        stats["done"] = True
+        _save_checkpoint(checkpoint, stats)
+        return stats
@@ -0,0 +1,132 @@
+# app/services/menu_service.py
+
+"""
+Service layer for Menu operations.
+
+This module contains the business logic for reading menus.
+It interacts with the `MenuModel` from the database and uses
+the `Menu` Pydantic model for data validation.
+
+The calendar of a user loads its menus, their recipes and the recipes'
+ingredients with `prefetch`, one query per level, so its cost does not depend
+on how many days or recipes the range holds. Categories and difficulties are
+embedded from the `ReferenceCache`.
+"""
+
+import datetime
+from typing import Iterator, List, Optional
+from peewee import prefetch
+from config.database import (
+    IngredientModel, MenuModel, MenuRecipeModel, RecipeIngredientModel, RecipeModel, UserModel
+)
+from models.menu import Menu, MenuDetail
+from models.recipe import IngredientAmount, RecipeDetail
+from services.pagination import stream_page
+from services.reference_cache import CATEGORIES, DIFFICULTIES, ReferenceCache
+
+
+def _to_menu(menu_instance: MenuModel) -> Menu:
+    """Build the `Menu` response from a row."""
+    return Menu(
+        id=menu_instance.id,
+        name=menu_instance.name,
+        date=str(menu_instance.date),
+        user_id=menu_instance.user_id_id,
+    )
+
+
+def _to_recipe_detail(recipe_instance: RecipeModel) -> RecipeDetail:
+    """Build a `RecipeDetail` from a prefetched recipe and its prefetched ingredients."""
+    return RecipeDetail(
+        id=recipe_instance.id,
+        name=recipe_instance.name,
+        instruction=recipe_instance.instruction,
+        preparation_time=recipe_instance.preparation_time,
+        difficulty=ReferenceCache.get(DIFFICULTIES, recipe_instance.difficulty_id),
+        category=ReferenceCache.get(CATEGORIES, recipe_instance.category_id),
+        user_id=recipe_instance.user_id,
+        version=recipe_instance.version,
+        ingredients=[
+            IngredientAmount(
+                id=line.ingredient_id.id,
+                name=line.ingredient_id.name,
+                quantity=line.quantity,
+                unit=line.unit,
+            )
+            for line in recipe_instance.recipe_ingredients
+        ],
+    )
+
+
+class MenuService:
+    """Service layer for Menu operations"""
+
+    @staticmethod
+    def stream_menus(
+        after: Optional[int] = None, limit: int = 100, user_id: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream a keyset page of menus.
+
+        Args:
+            after (Optional[int]): Only menus with an ID greater than this are returned.
+            limit (int): The maximum number of menus in the page.
+            user_id (Optional[int]): Only return menus of this user.
+
+        Returns:
+            Iterator[bytes]: The page as JSON, see `services.pagination.stream_page`.
+        """
+        query = MenuModel.select()
+        if user_id is not None:
+            query = query.where(MenuModel.user_id == user_id)
+        return stream_page(query, MenuModel.id, after, limit, _to_menu, Menu)
+
+    @staticmethod
+    def get_calendar(
+        user_id: int, date_from: datetime.date, date_to: datetime.date
+    ) -> Optional[List[MenuDetail]]:
+        """
+        Retrieve the menus of a user between two dates, each one with its recipes and
+        their ingredients.
+
+        Runs four queries however many menus and recipes are in the range: menus,
+        menu recipes, recipes, and recipe ingredients joined with the ingredients.
+
+        Args:
+            user_id (int): The ID of the user.
+            date_from (datetime.date): The first day of the range.
+            date_to (datetime.date): The last day of the range, included.
+
+        Returns:
+            Optional[List[MenuDetail]]: The menus ordered by date, or None if the
+            user does not exist.
+        """
+        menus = (
+            MenuModel.select()
+            .where((MenuModel.user_id == user_id) & MenuModel.date.between(date_from, date_to))
+            .order_by(MenuModel.date, MenuModel.id)
+        )
+        menu_recipes = MenuRecipeModel.select().order_by(MenuRecipeModel.recipe_id)
+        # The ingredient is joined, so reading its name does not run a query per line
+        ingredients = (
+            RecipeIngredientModel.select(RecipeIngredientModel, IngredientModel)
+            .join(IngredientModel)
+            .order_by(RecipeIngredientModel.ingredient_id)
+        )
+        menu_instances = prefetch(menus, menu_recipes, RecipeModel, ingredients)
+        if not menu_instances and not UserModel.select().where(UserModel.id == user_id).exists():
+            return None
+
+        return [
+            MenuDetail(
+                id=menu_instance.id,
+                name=menu_instance.name,
+                date=str(menu_instance.date),
+                user_id=menu_instance.user_id_id,
+                recipes=[
+                    _to_recipe_detail(menu_recipe.recipe_id)
+                    for menu_recipe in menu_instance.menu_recipes
+                ],
+            )
+            for menu_instance in menu_instances
+        ]
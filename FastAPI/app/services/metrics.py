@@ -0,0 +1,182 @@
+# app/services/metrics.py
+
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+Only what the request instrumentation needs is implemented: counters, gauges and
+histograms with fixed buckets, keyed by a tuple of label values. Every worker
+process keeps its own registry, so scrape each worker or aggregate at the
+Prometheus side.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Seconds, for request, statement and pool wait durations
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements per request
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Base class of the metric types"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        """Return the exposition lines of every labelled series."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Return the metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        """Add to the counter of a label set."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Value read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+        label_names: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, label_names)
+        self._collect = collect
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in sorted(self._collect().items())
+        ]
+
+
+class Histogram(Metric):
+    """Bucketed distribution per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = TIME_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Label set -> (per-bucket counts, the last one being +Inf, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        """Record one observation for a label set."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(
+                labels, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()
+            )
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _labels(self.label_names, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics exposed at `/metrics`"""
+
+    _metrics: List[Metric] = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def register(metric: Metric) -> Metric:
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric (Metric): The metric to expose.
+
+        Returns:
+            Metric: The same metric, for assignment at module level.
+        """
+        with MetricsRegistry._lock:
+            MetricsRegistry._metrics.append(metric)
+        return metric
+
+    @staticmethod
+    def render() -> str:
+        """
+        Render every registered metric.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        with MetricsRegistry._lock:
+            metrics = list(MetricsRegistry._metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
@@ -0,0 +1,404 @@
+# app/services/notification_hub.py
+
+"""
+Server-Sent Events delivery of notifications.
+
+Every worker process runs one `NotificationHub`. A single background task reads
+the notifications written since its cursor, by any process, with one query
+every `poll_interval` seconds, or right after the `NotificationQueue` of this
+process has written a batch. Each notification is encoded once and handed to
+every open stream of its user, so the database work does not grow with the
+number of connections.
+
+Workers insert notifications concurrently, so a row can commit after rows with
+higher IDs and land behind the cursor. The IDs the cursor skips are kept as
+gaps and looked up again on every poll for `gap_timeout` seconds; a row found
+there is delivered and its ID dropped, so no notification is delivered twice.
+IDs still missing by then belong to rolled back inserts.
+
+An idle stream is a `_Subscription`: a short buffer and an `asyncio.Event`,
+waited on until an event arrives or the `heartbeat` comment is due. A stream
+that falls `max_pending` events behind is closed; the client reconnects with
+`Last-Event-ID` and the notifications it missed are replayed from the database.
+
+The hub also keeps the number of unseen notifications of every user with an
+open stream. The count is loaded when the first stream of the user opens,
+incremented by the notifications the hub delivers, recounted when the user
+marks notifications as seen on this process and resynchronized for all users
+every `resync_interval` seconds, which bounds how long a change made on another
+process goes unnoticed. Counts are taken up to the cursor, so a notification
+is never counted both by the query and by the delivery.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from config.database import connection_scope
+from config.settings import NOTIFICATION_STREAM
+from models.notification import Notification
+from repositories.notification_repository import NotificationRepository
+from services.reference_cache import TYPE_NOTIFICATIONS, ReferenceCache
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = b": keep-alive\n\n"
+
+# Widest run of missing IDs kept as gaps; a wider jump of the auto-increment
+# counter is not made by inserts still in flight
+MAX_GAP = 10_000
+
+
+def _event(name: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    """Encode one SSE event; `data` is JSON, which never contains a line break."""
+    head = f"id: {event_id}\nevent: {name}\n" if event_id is not None else f"event: {name}\n"
+    return head.encode() + b"data: " + data + b"\n\n"
+
+
+def _unseen_event(unseen: int) -> bytes:
+    return _event("unseen", b'{"unseen":%d}' % unseen)
+
+
+def _notification_event(row: dict) -> bytes:
+    notification = Notification(
+        id=row["id"],
+        user_id=row["user_id"],
+        type=ReferenceCache.peek(TYPE_NOTIFICATIONS, row["type_id"]),
+        message=row["message"],
+        seen=row["seen"],
+    )
+    return _event("notification", notification.model_dump_json().encode(), row["id"])
+
+
+def _reload_types() -> None:
+    with connection_scope():
+        ReferenceCache.reload(TYPE_NOTIFICATIONS)
+
+
+async def _ensure_types(rows: Iterable[dict]) -> None:
+    """Reload the notification types if a row has one created after startup."""
+    known = ReferenceCache.all(TYPE_NOTIFICATIONS)
+    if any(row["type_id"] not in known for row in rows):
+        await asyncio.to_thread(_reload_types)
+
+
+class _Subscription:
+    """One open stream: the events waiting to be sent and the event waking it up"""
+
+    __slots__ = ("pending", "overflowed", "_wakeup")
+
+    def __init__(self):
+        self.pending: List[bytes] = []
+        self.overflowed = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, chunk: bytes) -> None:
+        """Buffer an event, or flag the stream to be closed when it is too far behind."""
+        if len(self.pending) >= NOTIFICATION_STREAM["max_pending"]:
+            self.overflowed = True
+        else:
+            self.pending.append(chunk)
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """End the stream once it has sent what it holds."""
+        self.overflowed = True
+        self._wakeup.set()
+
+    async def next(self, timeout: float) -> List[bytes]:
+        """Wait up to `timeout` seconds for events; an empty list means none came."""
+        if not self.pending and not self.overflowed:
+            self._wakeup.clear()
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                return []
+        chunks, self.pending = self.pending, []
+        return chunks
+
+
+class _Channel:
+    """The open streams of a user and the user's unseen count"""
+
+    __slots__ = ("subscriptions", "unseen", "received", "loaded")
+
+    def __init__(self):
+        self.subscriptions: Set[_Subscription] = set()
+        self.unseen = 0
+        # Unseen notifications delivered so far, to rebase counts taken meanwhile
+        self.received = 0
+        self.loaded = asyncio.Event()
+
+    def broadcast(self, chunk: bytes) -> None:
+        """Buffer an event on every stream of the user."""
+        for subscription in self.subscriptions:
+            subscription.push(chunk)
+
+
+class NotificationHub:
+    """Per-process fan-out of new notifications to the open streams of their users"""
+
+    _channels: Dict[int, _Channel] = {}
+    _cursor = 0
+    # Notification ID skipped by the cursor -> loop time until which it is looked up
+    _gaps: Dict[int, float] = {}
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _task: Optional[asyncio.Task] = None
+    _wake: Optional[asyncio.Event] = None
+    _stats = {"polls": 0, "delivered": 0, "late": 0, "resyncs": 0, "overflows": 0}
+
+    @staticmethod
+    async def start() -> None:
+        """Start reading new notifications from the last one written."""
+        if NotificationHub._task is not None:
+            return
+        NotificationHub._loop = asyncio.get_running_loop()
+        NotificationHub._wake = asyncio.Event()
+        NotificationHub._cursor = await NotificationRepository.latest_id()
+        NotificationHub._gaps = {}
+        NotificationHub._task = asyncio.create_task(NotificationHub._run())
+
+    @staticmethod
+    async def stop() -> None:
+        """Stop reading notifications and end the streams still open."""
+        task = NotificationHub._task
+        if task is None:
+            return
+        NotificationHub._task = None
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        for channel in NotificationHub._channels.values():
+            for subscription in channel.subscriptions:
+                subscription.close()
+        NotificationHub._loop = None
+
+    @staticmethod
+    def wake() -> None:
+        """Read new notifications now rather than at the next poll; call on the event loop."""
+        if NotificationHub._wake is not None:
+            NotificationHub._wake.set()
+
+    @staticmethod
+    async def _run() -> None:
+        loop = asyncio.get_running_loop()
+        last_resync = loop.time()
+        while True:
+            with suppress(TimeoutError):
+                async with asyncio.timeout(NOTIFICATION_STREAM["poll_interval"]):
+                    await NotificationHub._wake.wait()
+            NotificationHub._wake.clear()
+            try:
+                await NotificationHub._poll()
+                if loop.time() - last_resync >= NOTIFICATION_STREAM["resync_interval"]:
+                    last_resync = loop.time()
+                    await NotificationHub._recount(list(NotificationHub._channels))
+                    NotificationHub._stats["resyncs"] += 1
+            # pylint: disable=broad-except
+            except Exception:
+                logger.exception("Reading new notifications failed")
+
+    @staticmethod
+    async def _poll() -> None:
+        """Deliver the notifications committed in the gaps, then every one after the cursor."""
+        await NotificationHub._poll_gaps()
+        batch_size = NOTIFICATION_STREAM["poll_batch_size"]
+        while True:
+            rows = await NotificationRepository.list_after(NotificationHub._cursor, batch_size)
+            NotificationHub._stats["polls"] += 1
+            if not rows:
+                return
+            await _ensure_types(rows)
+            # No await from here on, so a stream opening meanwhile gets every
+            # row either delivered or after the cursor it replays up to
+            NotificationHub._track_gaps(rows)
+            NotificationHub._deliver(
+                row for row in rows if row["user_id"] in NotificationHub._channels
+            )
+            NotificationHub._cursor = rows[-1]["id"]
+            if len(rows) < batch_size:
+                return
+
+    @staticmethod
+    def _track_gaps(rows: List[dict]) -> None:
+        """Remember the IDs missing between the cursor and the rows read after it."""
+        deadline = asyncio.get_running_loop().time() + NOTIFICATION_STREAM["gap_timeout"]
+        expected = NotificationHub._cursor + 1
+        for row in rows:
+            if row["id"] - expected > MAX_GAP:
+                logger.warning("Not tracking %d missing notification IDs", row["id"] - expected)
+            else:
+                for notification_id in range(expected, row["id"]):
+                    NotificationHub._gaps[notification_id] = deadline
+            expected = row["id"] + 1
+
+    @staticmethod
+    async def _poll_gaps() -> None:
+        """Deliver the notifications committed since in the gaps left by the cursor."""
+        gaps = NotificationHub._gaps
+        now = asyncio.get_running_loop().time()
+        for notification_id in [key for key, deadline in gaps.items() if deadline <= now]:
+            del gaps[notification_id]
+        if not gaps:
+            return
+        rows = await NotificationRepository.list_ids(list(gaps))
+        if not rows:
+            return
+        await _ensure_types(rows)
+        for row in rows:
+            del gaps[row["id"]]
+        NotificationHub._stats["late"] += len(rows)
+        NotificationHub._deliver(
+            row for row in rows if row["user_id"] in NotificationHub._channels
+        )
+
+    @staticmethod
+    def _deliver(rows: Iterable[dict]) -> None:
+        touched = set()
+        for row in rows:
+            if ReferenceCache.peek(TYPE_NOTIFICATIONS, row["type_id"]) is None:
+                logger.error("Notification %d has an unknown type", row["id"])
+                continue
+            channel = NotificationHub._channels[row["user_id"]]
+            channel.broadcast(_notification_event(row))
+            NotificationHub._stats["delivered"] += len(channel.subscriptions)
+            if not row["seen"]:
+                channel.unseen += 1
+                channel.received += 1
+                touched.add(channel)
+        for channel in touched:
+            if channel.loaded.is_set():
+                channel.broadcast(_unseen_event(channel.unseen))
+
+    @staticmethod
+    async def _recount(user_ids: List[int]) -> None:
+        """Count the unseen notifications of users with open streams again."""
+        channels = {}
+        for user_id in user_ids:
+            channel = NotificationHub._channels.get(user_id)
+            if channel is not None:
+                channels[user_id] = (channel, channel.received)
+        if not channels:
+            return
+        counts = await NotificationRepository.count_unseen(channels, NotificationHub._cursor)
+        for user_id, (channel, received) in channels.items():
+            unseen = counts.get(user_id, 0) + channel.received - received
+            if unseen != channel.unseen and channel.loaded.is_set():
+                channel.unseen = unseen
+                channel.broadcast(_unseen_event(unseen))
+
+    @staticmethod
+    def recount(user_id: int) -> None:
+        """
+        Count the unseen notifications of a user again after some were marked as seen.
+
+        Waits for the count, so it must be called from a threadpool thread,
+        such as a synchronous route. Does nothing when the user has no open
+        stream on this process.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        loop = NotificationHub._loop
+        if loop is None or user_id not in NotificationHub._channels:
+            return
+        asyncio.run_coroutine_threadsafe(NotificationHub._recount([user_id]), loop).result()
+
+    @staticmethod
+    @asynccontextmanager
+    async def _subscribe(user_id: int) -> AsyncIterator[Tuple[_Channel, _Subscription, int]]:
+        """Register a stream of a user, loading the unseen count of its first one."""
+        channel = NotificationHub._channels.get(user_id)
+        first = channel is None
+        if first:
+            channel = NotificationHub._channels[user_id] = _Channel()
+        subscription = _Subscription()
+        channel.subscriptions.add(subscription)
+        cursor = NotificationHub._cursor
+        try:
+            if first:
+                try:
+                    counts = await NotificationRepository.count_unseen([user_id], cursor)
+                    channel.unseen = counts.get(user_id, 0) + channel.received
+                finally:
+                    channel.loaded.set()
+            else:
+                await channel.loaded.wait()
+            yield channel, subscription, cursor
+        finally:
+            channel.subscriptions.discard(subscription)
+            if not channel.subscriptions and NotificationHub._channels.get(user_id) is channel:
+                del NotificationHub._channels[user_id]
+
+    @staticmethod
+    async def stream(user_id: int, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Produce the SSE stream of a user until the client disconnects.
+
+        The stream opens with the notifications written after `last_event_id`,
+        at most `replay_limit` of them, and the unseen count, then sends every
+        new notification of the user followed by the updated count.
+
+        Args:
+            user_id (int): The ID of the user.
+            last_event_id (Optional[int]): The ID of the last notification the
+                client received, from the `Last-Event-ID` header of a reconnection.
+
+        Yields:
+            bytes: SSE events and heartbeat comments.
+        """
+        async with NotificationHub._subscribe(user_id) as (channel, subscription, cursor):
+            yield b"retry: %d\n\n" % NOTIFICATION_STREAM["retry_ms"]
+            if last_event_id is not None and last_event_id < cursor:
+                rows = await NotificationRepository.list_user_range(
+                    user_id, last_event_id, cursor, NOTIFICATION_STREAM["replay_limit"]
+                )
+                if rows:
+                    await _ensure_types(rows)
+                    yield b"".join(_notification_event(row) for row in rows)
+            yield _unseen_event(channel.unseen)
+            while not subscription.overflowed:
+                chunks = await subscription.next(NOTIFICATION_STREAM["heartbeat"])
+                yield b"".join(chunks) if chunks else HEARTBEAT
+            if NotificationHub._task is not None:
+                NotificationHub._stats["overflows"] += 1
+
+    @staticmethod
+    async def unseen(user_id: int) -> int:
+        """
+        Return the number of unseen notifications of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int: The count kept for the user's open streams, or counted when there are none.
+        """
+        channel = NotificationHub._channels.get(user_id)
+        if channel is not None:
+            await channel.loaded.wait()
+            return channel.unseen
+        counts = await NotificationRepository.count_unseen([user_id], None)
+        return counts.get(user_id, 0)
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Return the hub statistics.
+
+        Returns:
+            dict: Whether the hub runs, its cursor and the IDs it skipped, the
+            users with open streams and the number of streams, the polls and
+            resyncs made, the events delivered, the notifications found late in
+            the gaps and the streams closed for falling behind.
+        """
+        channels = list(NotificationHub._channels.values())
+        return {
+            "running": NotificationHub._task is not None,
+            "cursor": NotificationHub._cursor,
+            "gaps": len(NotificationHub._gaps),
+            "users": len(channels),
+            "streams": sum(len(channel.subscriptions) for channel in channels),
+            **NotificationHub._stats,
+        }
@@ -0,0 +1,366 @@
+# app/services/notification_queue.py
+
+"""
+In-process notification pipeline.
+
+Producers hand a `NotificationEvent` (a type code, a message and the users it
+is for) to `NotificationQueue.publish` and carry on. The event waits on a
+bounded asyncio queue until the background worker started by `main.lifespan`
+picks it up, fans it out to one row per user and writes the rows with
+`insert_many` through the async driver, so request handlers never wait on
+notification inserts.
+
+The worker coalesces: it keeps taking events until it holds `batch_size` rows
+or `flush_interval` seconds have passed since the first one, drops rows that
+repeat within the batch and writes the rest in as few statements as possible.
+
+When the queue is full, `publish` blocks the calling thread for up to
+`enqueue_timeout` seconds and then drops the event, so a burst slows producers
+down instead of growing memory without bound. `stop` refuses new events,
+writes everything still queued and waits for up to `shutdown_timeout` seconds.
+
+Once a batch is written, the `NotificationHub` of the process is woken up to
+deliver it to the open streams without waiting for its next poll.
+
+Queue depth, flush latency and the written and dropped counters are exported
+at `/metrics` and `/system/notifications`. Every worker process runs its own
+queue.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from peewee import chunked
+from config.async_database import async_database
+from config.database import NotificationModel, TypeNotificationModel
+from config.settings import NOTIFICATIONS
+from services.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from services.notification_hub import NotificationHub
+from services.reference_cache import TYPE_NOTIFICATIONS, ReferenceCache
+
+logger = logging.getLogger(__name__)
+
+SHOPPING_LIST_READY = "shopping_list_ready"
+NEW_SUGGESTION = "new_suggestion"
+MENU_TOMORROW = "menu_tomorrow"
+
+# Type codes the application produces, with the name their row is created with
+NOTIFICATION_TYPES = {
+    SHOPPING_LIST_READY: "Shopping list ready",
+    NEW_SUGGESTION: "New suggestions",
+    MENU_TOMORROW: "Menu tomorrow",
+}
+
+# Put on the queue by `stop`, after the last event
+_STOP = None
+
+
+class NotificationEvent(NamedTuple):
+    """A notification for one or more users"""
+
+    type: str
+    message: str
+    user_ids: Tuple[int, ...]
+
+
+class _Queued(NamedTuple):
+    event: NotificationEvent
+    enqueued_at: float
+
+
+def _depth() -> Dict[Tuple[str, ...], float]:
+    queue = NotificationQueue._queue
+    return {(): queue.qsize()} if queue is not None else {}
+
+
+MetricsRegistry.register(
+    Gauge("notification_queue_depth", "Notification events waiting to be written.", _depth)
+)
+FLUSH_DURATION = MetricsRegistry.register(
+    Histogram("notification_flush_seconds", "Time to write a batch of notifications.")
+)
+DELIVERY_DELAY = MetricsRegistry.register(
+    Histogram(
+        "notification_delay_seconds",
+        "Time from publishing the oldest event of a batch to writing it.",
+    )
+)
+WRITTEN = MetricsRegistry.register(
+    Counter("notifications_written_total", "Notification rows written.")
+)
+DROPPED = MetricsRegistry.register(
+    Counter("notifications_dropped_total", "Notification rows not written.", ("reason",))
+)
+
+
+class NotificationQueue:
+    """Bounded queue of notification events and the worker writing them"""
+
+    _queue: Optional[asyncio.Queue] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _worker: Optional[asyncio.Task] = None
+    _accepting = False
+    _lock = threading.Lock()
+    _stats = {"published": 0, "written": 0, "coalesced": 0, "dropped": 0, "batches": 0}
+    _last_flush_seconds = 0.0
+
+    @staticmethod
+    def ensure_types() -> None:
+        """Create the notification types the application produces if they are missing."""
+        existing = {
+            notification_type.type
+            for notification_type in ReferenceCache.all(TYPE_NOTIFICATIONS).values()
+        }
+        missing = [
+            {"type": code, "name": name}
+            for code, name in NOTIFICATION_TYPES.items()
+            if code not in existing
+        ]
+        if missing:
+            TypeNotificationModel.insert_many(missing).execute()
+            ReferenceCache.reload(TYPE_NOTIFICATIONS)
+
+    @staticmethod
+    async def start() -> None:
+        """Create the queue and start the worker on the running event loop."""
+        if NotificationQueue._worker is not None:
+            return
+        NotificationQueue._loop = asyncio.get_running_loop()
+        NotificationQueue._queue = asyncio.Queue(maxsize=NOTIFICATIONS["queue_size"])
+        NotificationQueue._worker = asyncio.create_task(NotificationQueue._run())
+        NotificationQueue._accepting = True
+
+    @staticmethod
+    async def stop() -> None:
+        """Refuse new events, write the queued ones and stop the worker."""
+        worker = NotificationQueue._worker
+        if worker is None:
+            return
+        NotificationQueue._accepting = False
+        try:
+            await asyncio.wait_for(
+                NotificationQueue._drain(worker), NOTIFICATIONS["shutdown_timeout"]
+            )
+        except asyncio.TimeoutError:
+            worker.cancel()
+            lost = sum(
+                len(item.event.user_ids)
+                for item in (
+                    NotificationQueue._queue.get_nowait()
+                    for _ in range(NotificationQueue._queue.qsize())
+                )
+                if item is not _STOP
+            )
+            logger.error("Notification queue not drained in time, %d rows lost", lost)
+            NotificationQueue._count("dropped", lost, "shutdown")
+        NotificationQueue._worker = None
+        NotificationQueue._queue = None
+        NotificationQueue._loop = None
+
+    @staticmethod
+    async def _drain(worker: asyncio.Task) -> None:
+        await NotificationQueue._queue.put(_STOP)
+        # Shielded, so the timeout of `stop` cancels the wait and `stop` the worker
+        await asyncio.shield(worker)
+
+    @staticmethod
+    def publish(event: NotificationEvent) -> bool:
+        """
+        Queue an event from synchronous code, such as the threadpool routes.
+
+        Blocks for up to `NOTIFICATIONS["enqueue_timeout"]` seconds while the
+        queue is full. On the event loop thread it cannot block, so the event
+        is dropped at once instead; async code uses `publish_async`.
+
+        Args:
+            event (NotificationEvent): The notification and its recipients.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped.
+        """
+        loop = NotificationQueue._loop
+        if not event.user_ids:
+            return True
+        if loop is None or not NotificationQueue._accepting:
+            NotificationQueue._count("dropped", len(event.user_ids), "stopped")
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return NotificationQueue._put_nowait(event)
+        future = asyncio.run_coroutine_threadsafe(NotificationQueue.publish_async(event), loop)
+        return future.result()
+
+    @staticmethod
+    async def publish_async(event: NotificationEvent) -> bool:
+        """
+        Queue an event from code running on the event loop.
+
+        Args:
+            event (NotificationEvent): The notification and its recipients.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped.
+        """
+        if not event.user_ids:
+            return True
+        if NotificationQueue._queue is None or not NotificationQueue._accepting:
+            NotificationQueue._count("dropped", len(event.user_ids), "stopped")
+            return False
+        if NotificationQueue._put_nowait(event, drop=False):
+            return True
+        try:
+            await asyncio.wait_for(
+                NotificationQueue._queue.put(_Queued(event, time.perf_counter())),
+                NOTIFICATIONS["enqueue_timeout"],
+            )
+        except asyncio.TimeoutError:
+            NotificationQueue._count("dropped", len(event.user_ids), "queue_full")
+            return False
+        NotificationQueue._count("published", len(event.user_ids))
+        return True
+
+    @staticmethod
+    def _put_nowait(event: NotificationEvent, drop: bool = True) -> bool:
+        try:
+            NotificationQueue._queue.put_nowait(_Queued(event, time.perf_counter()))
+        except asyncio.QueueFull:
+            if drop:
+                NotificationQueue._count("dropped", len(event.user_ids), "queue_full")
+            return False
+        NotificationQueue._count("published", len(event.user_ids))
+        return True
+
+    @staticmethod
+    def _count(key: str, amount: int, reason: Optional[str] = None) -> None:
+        with NotificationQueue._lock:
+            NotificationQueue._stats[key] += amount
+        if reason is not None:
+            DROPPED.inc((reason,), amount)
+
+    @staticmethod
+    async def _run() -> None:
+        """Take batches off the queue and write them until `stop` is called."""
+        loop = asyncio.get_running_loop()
+        queue = NotificationQueue._queue
+        batch_size = NOTIFICATIONS["batch_size"]
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            rows = len(item.event.user_ids)
+            deadline = loop.time() + NOTIFICATIONS["flush_interval"]
+            while rows < batch_size:
+                if queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += len(item.event.user_ids)
+            await NotificationQueue._flush(batch)
+
+    @staticmethod
+    def _rows(batch: Sequence[_Queued]) -> List[Tuple[int, int, str]]:
+        """Fan the events out to one row per user, without rows repeated in the batch."""
+        type_ids = {
+            notification_type.type: notification_type.id
+            for notification_type in ReferenceCache.all(TYPE_NOTIFICATIONS).values()
+        }
+        rows = {}
+        for queued in batch:
+            event = queued.event
+            type_id = type_ids.get(event.type)
+            if type_id is None:
+                logger.error("Unknown notification type %r", event.type)
+                NotificationQueue._count("dropped", len(event.user_ids), "unknown_type")
+                continue
+            for user_id in event.user_ids:
+                rows.setdefault((user_id, type_id, event.message), None)
+        return list(rows)
+
+    @staticmethod
+    async def _flush(batch: Sequence[_Queued]) -> None:
+        """Write the rows of a batch, one statement per `batch_size` rows."""
+        start = time.perf_counter()
+        rows = NotificationQueue._rows(batch)
+        fanned_out = sum(len(queued.event.user_ids) for queued in batch)
+        fields = [NotificationModel.user_id, NotificationModel.type, NotificationModel.message]
+        written = 0
+        for chunk in chunked(rows, NOTIFICATIONS["batch_size"]):
+            try:
+                await async_database.execute(NotificationModel.insert_many(chunk, fields).sql())
+                written += len(chunk)
+            # pylint: disable=broad-except
+            except Exception:
+                # A deleted user fails the whole statement, so the rows are
+                # retried one by one to only lose theirs
+                written += await NotificationQueue._insert_each(chunk, fields)
+        failed = len(rows) - written
+        if written:
+            NotificationHub.wake()
+        finished = time.perf_counter()
+        FLUSH_DURATION.observe((), finished - start)
+        DELIVERY_DELAY.observe((), finished - batch[0].enqueued_at)
+        WRITTEN.inc((), written)
+        if failed:
+            DROPPED.inc(("write_error",), failed)
+        with NotificationQueue._lock:
+            stats = NotificationQueue._stats
+            stats["written"] += written
+            stats["dropped"] += failed
+            stats["coalesced"] += fanned_out - len(rows)
+            stats["batches"] += 1
+            NotificationQueue._last_flush_seconds = finished - start
+
+    @staticmethod
+    async def _insert_each(chunk: Sequence[Tuple[int, int, str]], fields) -> int:
+        written = 0
+        error = None
+        for row in chunk:
+            try:
+                await async_database.execute(NotificationModel.insert_many([row], fields).sql())
+                written += 1
+            # pylint: disable=broad-except
+            except Exception as exc:
+                error = exc
+        if error is not None:
+            logger.error(
+                "%d of %d notifications not written", len(chunk) - written, len(chunk),
+                exc_info=error,
+            )
+        return written
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Return the queue statistics.
+
+        Returns:
+            dict: Whether the worker runs, the queue depth and capacity, the
+            published, written, coalesced and dropped row counters, the number
+            of batches and the duration of the last flush.
+        """
+        queue = NotificationQueue._queue
+        with NotificationQueue._lock:
+            return {
+                "running": NotificationQueue._worker is not None,
+                "depth": queue.qsize() if queue is not None else 0,
+                "capacity": NOTIFICATIONS["queue_size"],
+                **NotificationQueue._stats,
+                "last_flush_seconds": round(NotificationQueue._last_flush_seconds, 6),
+            }
@@ -0,0 +1,131 @@
+# app/services/notification_service.py
+
+"""
+Service layer for Notification operations.
+
+This module contains the business logic for reading notifications, marking
+them as seen and the reminders sent ahead of planned menus. It interacts with
+the `NotificationModel` from the database and uses the `Notification` Pydantic
+model for data validation. Notifications are written by `services.notification_queue`.
+"""
+
+from datetime import date
+from typing import Iterator, Optional
+from config.database import MenuModel, NotificationModel
+from models.notification import Notification
+from services.notification_queue import MENU_TOMORROW, NotificationEvent, NotificationQueue
+from services.pagination import stream_page
+from services.reference_cache import TYPE_NOTIFICATIONS, ReferenceCache
+
+
+def _to_notification(notification_instance: NotificationModel) -> Notification:
+    """Build the `Notification` response, embedding its type from the reference cache."""
+    return Notification(
+        id=notification_instance.id,
+        user_id=notification_instance.user_id_id,
+        type=ReferenceCache.get(TYPE_NOTIFICATIONS, notification_instance.type_id),
+        message=notification_instance.message,
+        seen=notification_instance.seen,
+    )
+
+
+class NotificationService:
+    """Service layer for Notification operations"""
+
+    @staticmethod
+    def stream_notifications(
+        after: Optional[int] = None,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        type_id: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Stream a keyset page of notifications, each one with its type.
+
+        Args:
+            after (Optional[int]): Only notifications with an ID greater than this are returned.
+            limit (int): The maximum number of notifications in the page.
+            user_id (Optional[int]): Only return notifications of this user.
+            type_id (Optional[int]): Only return notifications of this type.
+
+        Returns:
+            Iterator[bytes]: The page as JSON, see `services.pagination.stream_page`.
+        """
+        query = NotificationModel.select()
+        if user_id is not None:
+            query = query.where(NotificationModel.user_id == user_id)
+        if type_id is not None:
+            query = query.where(NotificationModel.type == type_id)
+        return stream_page(
+            query, NotificationModel.id, after, limit, _to_notification, Notification
+        )
+
+    @staticmethod
+    def remind_menus(day: date) -> int:
+        """
+        Notify every user with a menu planned on a day.
+
+        The users are read in one query and published as a single event, which
+        the `NotificationQueue` fans out to one row per user.
+
+        Args:
+            day (date): The day of the menus, usually tomorrow.
+
+        Returns:
+            int: The number of users notified.
+        """
+        user_ids = tuple(
+            user_id
+            for (user_id,) in MenuModel.select(MenuModel.user_id)
+            .where(MenuModel.date == day)
+            .distinct()
+            .tuples()
+        )
+        NotificationQueue.publish(
+            NotificationEvent(MENU_TOMORROW, f"Your menu for {day} is planned", user_ids)
+        )
+        return len(user_ids)
+
+    @staticmethod
+    def mark_seen(notification_id: int) -> Optional[int]:
+        """
+        Mark a notification as seen.
+
+        Args:
+            notification_id (int): The ID of the notification.
+
+        Returns:
+            Optional[int]: The ID of the notification's user if it exists, else None.
+        """
+        user_id = (
+            NotificationModel.select(NotificationModel.user_id)
+            .where(NotificationModel.id == notification_id)
+            .scalar()
+        )
+        if user_id is None:
+            return None
+        NotificationModel.update(seen=True).where(
+            NotificationModel.id == notification_id
+        ).execute()
+        return user_id
+
+    @staticmethod
+    def mark_all_seen(user_id: int, up_to: Optional[int] = None) -> int:
+        """
+        Mark the notifications of a user as seen, in a single UPDATE.
+
+        Args:
+            user_id (int): The ID of the user.
+            up_to (Optional[int]): Only notifications with an ID up to this one
+                are marked, all of them when None.
+
+        Returns:
+            int: The number of notifications that were unseen.
+        """
+        query = NotificationModel.update(seen=True).where(
+            (NotificationModel.user_id == user_id)
+            & (NotificationModel.seen == False)  # pylint: disable=singleton-comparison
+        )
+        if up_to is not None:
+            query = query.where(NotificationModel.id <= up_to)
+        return query.execute()
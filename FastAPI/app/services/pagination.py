@@ -0,0 +1,90 @@
+# app/services/pagination.py
+
+"""
+Keyset pagination and streaming helpers for the list endpoints.
+
+Pages are read with `WHERE id > :after ORDER BY id LIMIT n` on the primary key,
+never with OFFSET, so the cost of a page does not grow with its position. A page
+is fetched in sub-batches of `STREAM_BATCH_SIZE` rows read with `.iterator()` and
+serialized straight to JSON bytes, so memory stays flat however large the page is.
+Each sub-batch is serialized with one `TypeAdapter.dump_json` call over the whole
+list, which costs about half as much per object as one `model_dump_json` per item.
+
+Each sub-batch checks out its own connection and releases it before yielding:
+Starlette advances sync iterators from arbitrary threadpool workers, and Peewee
+connection state is per thread, so no connection may be held across a `yield`.
+"""
+
+import json
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional
+from peewee import Field, ModelSelect
+from pydantic import BaseModel, TypeAdapter
+from config.database import connection_scope
+
+# Rows read per query while streaming a page
+STREAM_BATCH_SIZE = 500
+
+# Largest page a client may ask for
+MAX_PAGE_SIZE = 10_000
+
+
+@lru_cache(maxsize=None)
+def list_adapter(item_type: type[BaseModel]) -> TypeAdapter:
+    """
+    Return the shared `TypeAdapter` serializing lists of a model in one call.
+
+    Args:
+        item_type (type[BaseModel]): The model of the items.
+
+    Returns:
+        TypeAdapter: The adapter for `List[item_type]`.
+    """
+    return TypeAdapter(List[item_type])
+
+
+def stream_page(
+    query: ModelSelect,
+    key: Field,
+    after: Optional[int],
+    limit: int,
+    to_item: Callable[[object], BaseModel],
+    item_type: type[BaseModel],
+) -> Iterator[bytes]:
+    """
+    Stream one keyset page as a JSON object `{"items": [...], "next_after": id}`.
+
+    Args:
+        query (ModelSelect): The filtered query, without ordering or limit.
+        key (Field): The primary key the page is ordered and sought on.
+        after (Optional[int]): Only rows with a key greater than this are returned.
+        limit (int): The maximum number of rows in the page.
+        to_item (Callable[[object], BaseModel]): Turns a row into its response model.
+        item_type (type[BaseModel]): The response model `to_item` returns.
+
+    Yields:
+        bytes: Consecutive pieces of the JSON document. `next_after` is the key to
+        pass to fetch the following page, or null when this was the last one.
+    """
+    adapter = list_adapter(item_type)
+    yield b'{"items":['
+    last = after
+    remaining = limit
+    separator = b""
+    while remaining > 0:
+        size = min(STREAM_BATCH_SIZE, remaining)
+        batch = query if last is None else query.where(key > last)
+        # `to_item` may query too, through `ReferenceCache.get`
+        with connection_scope():
+            rows = list(batch.order_by(key).limit(size).iterator())
+            items = [to_item(row) for row in rows]
+        if items:
+            last = getattr(rows[-1], key.name)
+            # Without the brackets, so consecutive batches join into one array
+            yield separator + adapter.dump_json(items)[1:-1]
+            separator = b","
+        remaining -= len(items)
+        if len(items) < size:
+            break
+    next_after = last if remaining == 0 else None
+    yield b'],"next_after":' + json.dumps(next_after).encode() + b"}"
@@ -0,0 +1,145 @@
+# app/services/pantry_service.py
+
+"""
+Service layer for Pantry operations.
+
+A grocery run or a cooked meal changes the stock of many products at once.
+`PantryService.apply_deltas` applies the whole set in one transaction with one
+`INSERT ... ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)`
+per chunk of rows, keyed on `(pantry_id, product_id)`: products the pantry
+does not hold yet are inserted and the others are incremented by the
+database itself. There is no read-modify-write, so concurrent updates of the
+same pantry never lose an increment, and the statement count does not depend
+on the number of products. Products whose quantity reaches zero are then
+deleted with a single statement.
+
+Pantries store every quantity in the base unit of its dimension, so deltas
+are converted with the `UnitConverter` before they are summed, and a delta
+whose dimension differs from the one a product is held in is refused rather
+than added up with it.
+
+On SQLite, which stands in for MySQL outside production, the same upsert is
+written `INSERT ... ON CONFLICT (pantry_id, product_id) DO UPDATE`.
+"""
+
+from typing import Dict, List, Optional
+from peewee import EXCLUDED, chunked, fn
+from config.database import database, PantryModel, PantryProductModel, ProductModel
+from config.settings import DATABASE
+from models.pantry_product import PantryProduct, PantryProductDelta, PantryUpdateResult
+from services.bulk_operations import BULK_BATCH_SIZE, existing_ids
+from services.unit_service import UnitService
+
+# Quantities at or below this are used up, which absorbs floating point residue
+# such as 0.1 + 0.2 - 0.3
+EMPTY_QUANTITY = 1e-9
+
+
+def _upsert(rows: List[dict]):
+    """Build the INSERT adding each row's quantity to the stored one, if any."""
+    quantity = PantryProductModel.quantity
+    query = PantryProductModel.insert_many(rows)
+    if DATABASE["engine"] == "peewee.SqliteDatabase":
+        return query.on_conflict(
+            conflict_target=[PantryProductModel.pantry_id, PantryProductModel.product_id],
+            update={quantity: quantity + EXCLUDED.quantity},
+            preserve=[PantryProductModel.unit],
+        )
+    return query.on_conflict(
+        update={quantity: quantity + fn.VALUES(quantity)},
+        preserve=[PantryProductModel.unit],
+    )
+
+
+class PantryService:
+    """Service layer for Pantry operations"""
+
+    @staticmethod
+    def apply_deltas(
+        pantry_id: int, deltas: List[PantryProductDelta]
+    ) -> Optional[PantryUpdateResult]:
+        """
+        Add or remove quantities of many products of a pantry in one transaction.
+
+        Deltas are converted to base units and those for the same product are
+        summed first. Products used up, including removals of products the
+        pantry did not hold, are deleted.
+
+        Args:
+            pantry_id (int): The ID of the pantry.
+            deltas (List[PantryProductDelta]): The quantity to add, or to remove
+                when negative, and the unit of each product.
+
+        Returns:
+            Optional[PantryUpdateResult]: The changed products with their new
+            quantities in base units and the IDs of the products removed, or
+            None if the pantry does not exist.
+
+        Raises:
+            ValueError: If a product or a unit does not exist, or if the
+            quantities of a product are not all of the same dimension.
+        """
+        if not PantryModel.select().where(PantryModel.id == pantry_id).exists():
+            return None
+        if not deltas:
+            return PantryUpdateResult(products=[], removed=[])
+        converter = UnitService.get_converter()
+        units = [delta.unit for delta in deltas]
+        unknown = {unit for unit, known in zip(units, converter.known(units)) if not known}
+        if unknown:
+            raise ValueError(f"Units not found: {sorted(unknown)}")
+        quantities, bases = converter.to_base([delta.quantity for delta in deltas], units)
+
+        merged: Dict[int, dict] = {}
+        for delta, quantity, base in zip(deltas, quantities.tolist(), bases.tolist()):
+            row = merged.setdefault(
+                delta.product_id,
+                {"pantry_id": pantry_id, "product_id": delta.product_id, "quantity": 0.0,
+                 "unit": base},
+            )
+            if row["unit"] != base:
+                raise ValueError(f"Product {delta.product_id} is given in units of two dimensions")
+            row["quantity"] += quantity
+        missing = merged.keys() - existing_ids(ProductModel, merged)
+        if missing:
+            raise ValueError(f"Products not found: {sorted(missing)}")
+
+        product_ids = list(merged)
+        in_pantry = (PantryProductModel.pantry_id == pantry_id) & (
+            PantryProductModel.product_id.in_(product_ids)
+        )
+        with database.atomic():
+            mismatched = [
+                product_id
+                for product_id, unit in PantryProductModel.select(
+                    PantryProductModel.product_id, PantryProductModel.unit
+                )
+                .where(in_pantry)
+                .order_by(PantryProductModel.product_id)
+                .tuples()
+                if unit != merged[product_id]["unit"]
+            ]
+            if mismatched:
+                raise ValueError(f"Products held in a unit of another dimension: {mismatched}")
+            for chunk in chunked(merged.values(), BULK_BATCH_SIZE):
+                _upsert(chunk).execute()
+            PantryProductModel.delete().where(
+                in_pantry & (PantryProductModel.quantity <= EMPTY_QUANTITY)
+            ).execute()
+            products = [
+                PantryProduct(**row)
+                for row in PantryProductModel.select(
+                    PantryProductModel.pantry_id.alias("pantry_id"),
+                    PantryProductModel.product_id.alias("product_id"),
+                    PantryProductModel.quantity,
+                    PantryProductModel.unit,
+                )
+                .where(in_pantry)
+                .order_by(PantryProductModel.product_id)
+                .dicts()
+            ]
+        kept = {product.product_id for product in products}
+        return PantryUpdateResult(
+            products=products,
+            removed=[product_id for product_id in sorted(merged) if product_id not in kept],
+        )
@@ -0,0 +1,254 @@
+# app/services/password_service.py
+
+"""
+Password hashing and verification.
+
+Passwords are stored in a self-describing format, for example
+`$scrypt$ln=14,r=8,p=1$<salt>$<hash>` or `$pbkdf2-sha256$i=600000$<salt>$<hash>`,
+so the parameters a hash was made with are always known. When they differ from
+the configured ones, `needs_rehash` says so and the hash is replaced at the next
+successful login. Values without a leading `$` are legacy plaintext passwords
+and are upgraded the same way.
+
+The key derivation is CPU-bound, so it runs in a bounded `ProcessPoolExecutor`
+instead of the request threadpool. At most `max_pending` hashes are queued at a
+time; further callers wait for a slot. This module only imports the standard
+library and the settings, which keeps the spawned worker processes light.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, List, Optional
+from config.settings import PASSWORD_HASHING
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _parameters(policy: dict) -> str:
+    """The algorithm and cost part of a hash made with the given policy."""
+    if policy["algorithm"] == "scrypt":
+        return (
+            f"$scrypt$ln={policy['scrypt_log2_n']},r={policy['scrypt_r']},p={policy['scrypt_p']}"
+        )
+    if policy["algorithm"] == "pbkdf2_sha256":
+        return f"$pbkdf2-sha256$i={policy['pbkdf2_iterations']}"
+    raise ValueError(f"Unsupported password algorithm: {policy['algorithm']}")
+
+
+def _derive(password: str, salt: bytes, parameters: str) -> bytes:
+    _, algorithm, costs = parameters.split("$")
+    costs = dict(cost.split("=") for cost in costs.split(","))
+    if algorithm == "scrypt":
+        n, r, p = 2 ** int(costs["ln"]), int(costs["r"]), int(costs["p"])
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=KEY_BYTES
+        )
+    if algorithm == "pbkdf2-sha256":
+        return hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), salt, int(costs["i"]), dklen=KEY_BYTES
+        )
+    raise ValueError(f"Unsupported password algorithm: {algorithm}")
+
+
+def hash_password(password: str, policy: Optional[dict] = None) -> str:
+    """
+    Hash a password with a random salt.
+
+    Args:
+        password (str): The plaintext password.
+        policy (Optional[dict]): The algorithm and costs, `PASSWORD_HASHING` by default.
+
+    Returns:
+        str: The encoded hash, including its parameters and salt.
+    """
+    parameters = _parameters(policy or PASSWORD_HASHING)
+    salt = os.urandom(SALT_BYTES)
+    return f"{parameters}${_b64encode(salt)}${_b64encode(_derive(password, salt, parameters))}"
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    """
+    Check a password against a stored hash, in constant time.
+
+    Args:
+        password (str): The plaintext password.
+        encoded (str): The stored hash, or a legacy plaintext password.
+
+    Returns:
+        bool: True if the password matches, False as well when the stored
+        value is not a valid hash.
+    """
+    if not encoded.startswith("$"):
+        return hmac.compare_digest(password.encode(), encoded.encode())
+    try:
+        parameters, salt, expected = encoded.rsplit("$", 2)
+        derived = _derive(password, _b64decode(salt), parameters)
+        expected = _b64decode(expected)
+    except (ValueError, KeyError, binascii.Error):
+        return False
+    return hmac.compare_digest(derived, expected)
+
+
+def needs_rehash(encoded: str, policy: Optional[dict] = None) -> bool:
+    """
+    Tell whether a stored hash was made with other parameters than the configured ones.
+
+    Args:
+        encoded (str): The stored hash, or a legacy plaintext password.
+        policy (Optional[dict]): The algorithm and costs, `PASSWORD_HASHING` by default.
+
+    Returns:
+        bool: True if the password should be hashed again.
+    """
+    return not encoded.startswith(_parameters(policy or PASSWORD_HASHING) + "$")
+
+
+class PasswordService:
+    """Runs password hashing on a bounded process pool"""
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _lock = threading.Lock()
+    _dummy_hash: Optional[str] = None
+
+    @staticmethod
+    def _pool() -> Optional[ProcessPoolExecutor]:
+        """Start the process pool on first use; None when hashing runs inline."""
+        if PASSWORD_HASHING["workers"] <= 0:
+            return None
+        if PasswordService._executor is None:
+            with PasswordService._lock:
+                if PasswordService._executor is None:
+                    PasswordService._slots = threading.BoundedSemaphore(
+                        max(PASSWORD_HASHING["max_pending"], PASSWORD_HASHING["workers"])
+                    )
+                    # Spawned workers do not inherit the parent's threads and sockets
+                    PasswordService._executor = ProcessPoolExecutor(
+                        max_workers=PASSWORD_HASHING["workers"],
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return PasswordService._executor
+
+    @staticmethod
+    def _submit(function, *args, acquired: bool = False) -> Future:
+        """Queue a call on the pool once a slot is free, and free the slot when it is done."""
+        if not acquired:
+            PasswordService._slots.acquire()
+        try:
+            future = PasswordService._executor.submit(function, *args)
+        except BaseException:
+            PasswordService._slots.release()
+            raise
+        future.add_done_callback(lambda _: PasswordService._slots.release())
+        return future
+
+    @staticmethod
+    def hash(password: str) -> str:
+        """
+        Hash a password with the configured policy.
+
+        Args:
+            password (str): The plaintext password.
+
+        Returns:
+            str: The encoded hash.
+        """
+        if PasswordService._pool() is None:
+            return hash_password(password)
+        return PasswordService._submit(hash_password, password).result()
+
+    @staticmethod
+    def hash_many(passwords: Iterable[str]) -> List[str]:
+        """
+        Hash several passwords in parallel.
+
+        Args:
+            passwords (Iterable[str]): The plaintext passwords.
+
+        Returns:
+            List[str]: The encoded hashes, in the same order.
+        """
+        if PasswordService._pool() is None:
+            return [hash_password(password) for password in passwords]
+        futures = [PasswordService._submit(hash_password, password) for password in passwords]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def verify(password: str, encoded: Optional[str]) -> bool:
+        """
+        Check a password against a stored hash.
+
+        Passing None, for an unknown account, still spends the time of a
+        verification so response times do not reveal which accounts exist.
+
+        Args:
+            password (str): The plaintext password.
+            encoded (Optional[str]): The stored hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        if encoded is None:
+            if PasswordService._dummy_hash is None:
+                PasswordService._dummy_hash = PasswordService.hash(os.urandom(8).hex())
+            PasswordService.verify(password, PasswordService._dummy_hash)
+            return False
+        if PasswordService._pool() is None or not encoded.startswith("$"):
+            return verify_password(password, encoded)
+        return PasswordService._submit(verify_password, password, encoded).result()
+
+    @staticmethod
+    async def hash_async(password: str) -> str:
+        """
+        Hash a password without blocking the event loop.
+
+        Args:
+            password (str): The plaintext password.
+
+        Returns:
+            str: The encoded hash.
+        """
+        if PasswordService._pool() is None:
+            return await asyncio.to_thread(hash_password, password)
+        # Wait for a slot on a worker thread rather than on the event loop
+        if not PasswordService._slots.acquire(blocking=False):
+            await asyncio.to_thread(PasswordService._slots.acquire)
+        future = PasswordService._submit(hash_password, password, acquired=True)
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def needs_rehash(encoded: str) -> bool:
+        """
+        Tell whether a stored hash should be replaced with one of the configured policy.
+
+        Args:
+            encoded (str): The stored hash.
+
+        Returns:
+            bool: True if the password should be hashed again.
+        """
+        return needs_rehash(encoded)
+
+    @staticmethod
+    def shutdown() -> None:
+        """Stop the worker processes."""
+        with PasswordService._lock:
+            if PasswordService._executor is not None:
+                PasswordService._executor.shutdown(cancel_futures=True)
+                PasswordService._executor = None
@@ -0,0 +1,131 @@
+# app/services/recipe_changes.py
+
+"""
+Detection of the recipe writes made by other processes.
+
+Every worker process builds its own in-memory recipe indexes (`SearchService`,
+`SuggestionService`) and only updates them for the writes it handles itself. A
+`RecipeChangeTracker` remembers the ID and `version` of every recipe as of the
+moment its index was built, and `poll` reports the recipes created, updated or
+deleted since then so the index can apply them. Every write to a recipe or to
+its ingredients increments its version.
+
+Polls are at least `RECIPE_INDEX_SYNC["interval"]` seconds apart and first
+compare one aggregate row (count, highest ID and sum of the versions) with the
+snapshot, so an unchanged table costs a single query. When recipes were only
+added, only the rows above the highest known ID are read; any other change
+reads the IDs and versions of the whole table and diffs them with NumPy.
+"""
+
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+from peewee import fn
+from config.database import RecipeModel, connection_scope
+from config.settings import RECIPE_INDEX_SYNC
+
+# (count, highest ID, sum of the versions)
+Signature = Tuple[int, int, int]
+
+
+class RecipeChanges(NamedTuple):
+    """Recipes written since the previous poll"""
+
+    changed: List[int]
+    deleted: List[int]
+
+
+def _read_signature() -> Signature:
+    count, highest, total = (
+        RecipeModel.select(
+            fn.COUNT(RecipeModel.id),
+            fn.MAX(RecipeModel.id),
+            fn.COALESCE(fn.SUM(RecipeModel.version), 0),
+        )
+        .tuples()
+        .get()
+    )
+    return count, highest or 0, int(total)
+
+
+def _read_versions(after: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    rows = list(
+        RecipeModel.select(RecipeModel.id, RecipeModel.version)
+        .where(RecipeModel.id > after)
+        .order_by(RecipeModel.id)
+        .tuples()
+        .iterator()
+    )
+    pairs = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    return pairs[:, 0].copy(), pairs[:, 1].copy()
+
+
+class RecipeChangeTracker:
+    """The recipe versions an in-memory index reflects"""
+
+    def __init__(self) -> None:
+        # Sorted recipe IDs and their versions
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._versions = np.zeros(0, dtype=np.int64)
+        self._signature: Optional[Signature] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> None:
+        """Record the current recipes; call it right before building the index from them."""
+        with self._lock, connection_scope():
+            self._store(*_read_versions())
+        self._checked_at = time.monotonic()
+
+    def poll(self) -> Optional[RecipeChanges]:
+        """
+        Report the recipes written since the snapshot or the previous poll.
+
+        Returns None without querying before the first snapshot, within
+        `RECIPE_INDEX_SYNC["interval"]` seconds of the previous poll or while another
+        thread is polling, since that thread will report the changes.
+
+        Returns:
+            Optional[RecipeChanges]: The changes, or None if there are none to apply.
+        """
+        if self._signature is None:
+            return None
+        if time.monotonic() - self._checked_at < RECIPE_INDEX_SYNC["interval"]:
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._checked_at = time.monotonic()
+            with connection_scope():
+                signature = _read_signature()
+                if signature == self._signature:
+                    return None
+                count, highest, total = self._signature
+                ids, versions = _read_versions(highest)
+                if (count + len(ids), total + int(versions.sum())) == (signature[0], signature[2]):
+                    # No known recipe was updated or deleted
+                    self._store(
+                        np.concatenate((self._ids, ids)),
+                        np.concatenate((self._versions, versions)),
+                    )
+                    return RecipeChanges(ids.tolist(), [])
+                ids, versions = _read_versions()
+            changes = self._diff(ids, versions)
+            self._store(ids, versions)
+            return changes
+        finally:
+            self._lock.release()
+
+    def _store(self, ids: np.ndarray, versions: np.ndarray) -> None:
+        self._ids, self._versions = ids, versions
+        self._signature = (len(ids), int(ids[-1]) if len(ids) else 0, int(versions.sum()))
+
+    def _diff(self, ids: np.ndarray, versions: np.ndarray) -> RecipeChanges:
+        if not len(self._ids):
+            return RecipeChanges(ids.tolist(), [])
+        deleted = np.setdiff1d(self._ids, ids, assume_unique=True)
+        positions = np.minimum(np.searchsorted(self._ids, ids), len(self._ids) - 1)
+        known = self._ids[positions] == ids
+        changed = ids[~known | (self._versions[positions] != versions)]
+        return RecipeChanges(changed.tolist(), deleted.tolist())
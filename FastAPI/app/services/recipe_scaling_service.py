@@ -0,0 +1,260 @@
+# app/services/recipe_scaling_service.py
+
+"""
+Service layer for batch cooking.
+
+A batch-cooking plan is a list of (recipe, multiplier) pairs; the service
+returns what the recipes need in total once scaled. The ingredients of every
+recipe of the plan are read from `RecipeIngredientModel` with one query and
+converted to base units by the `UnitConverter` into an `IngredientMatrix`:
+flat arrays of the recipe, ingredient group and base quantity of each row.
+Scaling is then a single `bincount` weighted by the multipliers, so it costs
+the same whatever the number of recipes and never loops over them in Python.
+
+Plans are normalized first: repeated recipes are merged by adding up their
+multipliers and the recipes are sorted by ID. Two LRU caches use that key:
+
+- results, keyed by the recipes and their multipliers, for plans asked again;
+- matrices, keyed by the recipes only, so a plan differing only by its
+  multipliers is recomputed from memory without a query.
+
+The ingredients of a recipe are written with it and never updated, so entries
+only go stale when a recipe is deleted. `RecipeService.delete_recipe` drops
+the entries of the recipe on this process; on the others they expire after
+`RECIPE_SCALING["ttl"]` seconds.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from peewee import JOIN
+from config.database import IngredientModel, RecipeIngredientModel, RecipeModel
+from config.settings import RECIPE_SCALING
+from models.recipe import BatchCookingPlan, RecipePortion, ScaledIngredient
+from services.unit_service import UnitService
+
+
+class _LRUCache:
+    """Thread-safe LRU cache whose entries expire after `RECIPE_SCALING["ttl"]` seconds"""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Return the value of a key, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > RECIPE_SCALING["ttl"]:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: object) -> None:
+        """Store a value, evicting the least recently used entries beyond the size."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop the entries whose key matches a predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        """Return the size, capacity and hit and miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "capacity": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class IngredientMatrix:
+    """The ingredients of a set of recipes in base units, ready to be scaled."""
+
+    def __init__(
+        self,
+        recipe_ids: Sequence[int],
+        rows: Iterable[Tuple[int, int, float, float]],
+        names: Dict[int, str],
+    ):
+        """
+        Convert the rows and group them by ingredient and base unit.
+
+        Args:
+            recipe_ids (Sequence[int]): The IDs of the recipes, sorted.
+            rows (Iterable[Tuple[int, int, float, float]]): (recipe_id,
+                ingredient_id, quantity, unit) rows of the recipes.
+            names (Dict[int, str]): The name of every ingredient of the rows.
+        """
+        self.recipe_ids = tuple(recipe_ids)
+        self.names = names
+        recipes, ingredients, quantities, units = list(zip(*rows)) or ((), (), (), ())
+        amounts, bases = UnitService.get_converter().to_base(
+            np.asarray(quantities, dtype=np.float64), np.asarray(units, dtype=np.float64)
+        )
+        groups = np.column_stack((np.asarray(ingredients, dtype=np.int64), bases))
+        # Group -> (ingredient_id, base unit), and row -> group
+        self._groups, inverse = np.unique(groups, axis=0, return_inverse=True)
+        self._inverse = inverse.reshape(-1)
+        # Row -> position of its recipe in `recipe_ids`
+        self._positions = np.searchsorted(
+            np.asarray(recipe_ids, dtype=np.int64), np.asarray(recipes, dtype=np.int64)
+        )
+        self._amounts = amounts
+
+    @classmethod
+    def load(cls, recipe_ids: Sequence[int]) -> "IngredientMatrix":
+        """
+        Read the ingredients of the recipes in one query.
+
+        Args:
+            recipe_ids (Sequence[int]): The IDs of the recipes, sorted.
+
+        Returns:
+            IngredientMatrix: The matrix of the recipes.
+
+        Raises:
+            ValueError: If a recipe does not exist.
+        """
+        found = set()
+        rows = []
+        names = {}
+        for recipe_id, ingredient_id, quantity, unit, name in (
+            RecipeModel.select(
+                RecipeModel.id,
+                RecipeIngredientModel.ingredient_id,
+                RecipeIngredientModel.quantity,
+                RecipeIngredientModel.unit,
+                IngredientModel.name,
+            )
+            .join(RecipeIngredientModel, JOIN.LEFT_OUTER)
+            .join(IngredientModel, JOIN.LEFT_OUTER)
+            .where(RecipeModel.id.in_(list(recipe_ids)))
+            .tuples()
+        ):
+            found.add(recipe_id)
+            if ingredient_id is not None:
+                rows.append((recipe_id, ingredient_id, quantity, unit))
+                names[ingredient_id] = name
+        missing = set(recipe_ids) - found
+        if missing:
+            raise ValueError(f"Recipes not found: {sorted(missing)}")
+        return cls(recipe_ids, rows, names)
+
+    def scale(self, multipliers: Sequence[float]) -> List[ScaledIngredient]:
+        """
+        Add up the ingredients of the recipes, each scaled by its multiplier.
+
+        Args:
+            multipliers (Sequence[float]): The multiplier of each recipe, in the
+                order of `recipe_ids`.
+
+        Returns:
+            List[ScaledIngredient]: The total of every ingredient per base unit,
+            ordered by ingredient and unit.
+        """
+        weights = self._amounts * np.asarray(multipliers, dtype=np.float64)[self._positions]
+        totals = np.bincount(self._inverse, weights=weights, minlength=len(self._groups))
+        return [
+            ScaledIngredient(id=ingredient_id, name=self.names[ingredient_id],
+                             quantity=quantity, unit=unit)
+            for (ingredient_id, unit), quantity in zip(self._groups.tolist(), totals.tolist())
+        ]
+
+
+class RecipeScalingService:
+    """Service layer for batch-cooking calculations"""
+
+    _results = _LRUCache(RECIPE_SCALING["result_cache_size"])
+    _matrices = _LRUCache(RECIPE_SCALING["matrix_cache_size"])
+
+    @staticmethod
+    def scale(portions: List[RecipePortion]) -> BatchCookingPlan:
+        """
+        Compute the ingredients a batch-cooking plan needs in total.
+
+        Args:
+            portions (List[RecipePortion]): The recipes and their multipliers;
+                a recipe given more than once is cooked for the sum of them.
+
+        Returns:
+            BatchCookingPlan: The merged recipes and the scaled ingredient
+            totals, in base units.
+
+        Raises:
+            ValueError: If a multiplier is not a positive number, the plan has more than
+            `RECIPE_SCALING["max_recipes"]` recipes or a recipe does not exist.
+        """
+        merged: Dict[int, float] = {}
+        for portion in portions:
+            if not 0 < portion.multiplier < math.inf:
+                raise ValueError(
+                    f"The multiplier of recipe {portion.recipe_id} is not a positive number"
+                )
+            merged[portion.recipe_id] = merged.get(portion.recipe_id, 0.0) + portion.multiplier
+        if len(merged) > RECIPE_SCALING["max_recipes"]:
+            raise ValueError(f"At most {RECIPE_SCALING['max_recipes']} recipes can be scaled")
+        if not merged:
+            return BatchCookingPlan(recipes=[], ingredients=[])
+        recipe_ids = tuple(sorted(merged))
+        multipliers = tuple(merged[recipe_id] for recipe_id in recipe_ids)
+
+        key = (recipe_ids, multipliers)
+        plan = RecipeScalingService._results.get(key)
+        if plan is not None:
+            return plan
+        matrix = RecipeScalingService._matrices.get(recipe_ids)
+        if matrix is None:
+            matrix = IngredientMatrix.load(recipe_ids)
+            RecipeScalingService._matrices.put(recipe_ids, matrix)
+        plan = BatchCookingPlan(
+            recipes=[
+                RecipePortion(recipe_id=recipe_id, multiplier=multiplier)
+                for recipe_id, multiplier in zip(recipe_ids, multipliers)
+            ],
+            ingredients=matrix.scale(multipliers),
+        )
+        RecipeScalingService._results.put(key, plan)
+        return plan
+
+    @staticmethod
+    def forget_recipe(recipe_id: int) -> None:
+        """
+        Drop the cached plans and matrices that include a recipe, once it is deleted.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+        """
+        RecipeScalingService._results.discard_where(lambda key: recipe_id in key[0])
+        RecipeScalingService._matrices.discard_where(lambda key: recipe_id in key)
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Return the statistics of both caches.
+
+        Returns:
+            dict: The size, capacity, hits and misses of the result and matrix caches.
+        """
+        return {
+            "results": RecipeScalingService._results.stats(),
+            "matrices": RecipeScalingService._matrices.stats(),
+        }
@@ -0,0 +1,277 @@
+# app/services/recipe_service.py
+
+"""
+Service layer for Recipe operations.
+
+This module contains the business logic for managing recipes.
+It interacts with the `RecipeModel` from the database and uses
+the `Recipe` Pydantic model for data validation. Every write is
+mirrored into the search index of `SearchService` and the ingredient
+index of `SuggestionService`, and updates
+increment the recipe's version. Deleted recipes are also dropped from the
+batch-cooking caches of `RecipeScalingService`.
+"""
+
+from typing import Iterator, List, Optional
+from peewee import DoesNotExist
+from config.database import RecipeModel, CategoryModel, DifficultyModel, UserModel
+from models.recipe import Recipe, RecipeSearchHit
+from services.pagination import stream_page
+from services.recipe_scaling_service import RecipeScalingService
+from services.reference_cache import CATEGORIES, DIFFICULTIES, ReferenceCache
+from services.search_service import SearchService
+from services.suggestion_service import SuggestionService
+from services.versioning import save_versioned
+
+
+def _to_recipe(recipe_instance: RecipeModel) -> Recipe:
+    """Build the `Recipe` response, embedding difficulty and category from the reference cache."""
+    return Recipe(
+        id=recipe_instance.id,
+        name=recipe_instance.name,
+        instruction=recipe_instance.instruction,
+        preparation_time=recipe_instance.preparation_time,
+        difficulty=ReferenceCache.get(DIFFICULTIES, recipe_instance.difficulty_id),
+        category=ReferenceCache.get(CATEGORIES, recipe_instance.category_id),
+        user_id=recipe_instance.user_id,
+        version=recipe_instance.version,
+    )
+
+
+def _check_references(difficulty_id: Optional[int], category_id: Optional[int]) -> None:
+    """Raise ValueError if the given difficulty or category does not exist."""
+    if difficulty_id and ReferenceCache.get(DIFFICULTIES, difficulty_id) is None:
+        raise ValueError(f"Difficulty with id {difficulty_id} not found")
+    if category_id and ReferenceCache.get(CATEGORIES, category_id) is None:
+        raise ValueError(f"Category with id {category_id} not found")
+
+
+class RecipeService:
+    """Service layer for Recipe operations"""
+
+    @staticmethod
+    def create_recipe(
+        name: str,
+        instruction: str,
+        preparation_time: int,
+        difficulty_id: int,
+        category_id: int,
+        user_id: int,
+    ) -> Recipe:
+        """
+        Create a new recipe.
+
+        Args:
+            name (str): The name of the recipe.
+            instruction (str): The preparation instructions.
+            preparation_time (int): The preparation time.
+            difficulty_id (int): The ID of the difficulty level.
+            category_id (int): The ID of the category.
+            user_id (int): The ID of the author.
+
+        Returns:
+            Recipe: The created recipe instance.
+
+        Raises:
+            ValueError: If the difficulty, category or user does not exist.
+        """
+        _check_references(difficulty_id, category_id)
+        if not UserModel.select().where(UserModel.id == user_id).exists():
+            raise ValueError(f"User with id {user_id} not found")
+        recipe_instance = RecipeModel.create(
+            name=name,
+            instruction=instruction,
+            preparation_time=preparation_time,
+            difficulty=difficulty_id,
+            category=category_id,
+            user=user_id,
+        )
+        SearchService.index_recipes([recipe_instance.id])
+        SuggestionService.index_recipes([recipe_instance.id])
+        return _to_recipe(recipe_instance)
+
+    @staticmethod
+    def get_recipe_by_id(recipe_id: int) -> Optional[Recipe]:
+        """
+        Retrieve a recipe by ID with its difficulty and category in a single query.
+
+        Args:
+            recipe_id (int): The ID of the recipe to retrieve.
+
+        Returns:
+            Optional[Recipe]: The recipe instance if found, else None.
+        """
+        try:
+            recipe_instance = (
+                RecipeModel.select(RecipeModel, DifficultyModel, CategoryModel)
+                .join(DifficultyModel)
+                .switch(RecipeModel)
+                .join(CategoryModel)
+                .where(RecipeModel.id == recipe_id)
+                .get()
+            )
+            return Recipe.model_validate(recipe_instance)
+        except DoesNotExist:
+            return None
+
+    @staticmethod
+    def get_recipe_version(recipe_id: int) -> Optional[int]:
+        """
+        Retrieve only the version of a recipe, for conditional requests.
+
+        Difficulty and category are not part of the version: they cannot be
+        changed through the API.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+
+        Returns:
+            Optional[int]: The version of the recipe if found, else None.
+        """
+        return RecipeModel.select(RecipeModel.version).where(RecipeModel.id == recipe_id).scalar()
+
+    @staticmethod
+    def stream_recipes(
+        after: Optional[int] = None,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        difficulty_id: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Stream a keyset page of recipes, each one with its difficulty and category.
+
+        Args:
+            after (Optional[int]): Only recipes with an ID greater than this are returned.
+            limit (int): The maximum number of recipes in the page.
+            user_id (Optional[int]): Only return recipes of this user.
+            category_id (Optional[int]): Only return recipes in this category.
+            difficulty_id (Optional[int]): Only return recipes with this difficulty.
+
+        Returns:
+            Iterator[bytes]: The page as JSON, see `services.pagination.stream_page`.
+        """
+        query = RecipeModel.select()
+        if user_id is not None:
+            query = query.where(RecipeModel.user == user_id)
+        if category_id is not None:
+            query = query.where(RecipeModel.category == category_id)
+        if difficulty_id is not None:
+            query = query.where(RecipeModel.difficulty == difficulty_id)
+        return stream_page(query, RecipeModel.id, after, limit, _to_recipe, Recipe)
+
+    @staticmethod
+    def search_recipes(
+        query: str,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        difficulty_id: Optional[int] = None,
+        max_preparation_time: Optional[int] = None,
+        ingredient: Optional[str] = None,
+    ) -> List[RecipeSearchHit]:
+        """
+        Search recipes by name, instructions and ingredient names.
+
+        The ranking runs on the search index and the matching recipes are then
+        loaded in a single query.
+
+        Args:
+            query (str): The words to look for.
+            limit (int): The maximum number of results.
+            category_id (Optional[int]): Only return recipes in this category.
+            difficulty_id (Optional[int]): Only return recipes with this difficulty.
+            max_preparation_time (Optional[int]): Only return recipes that take at most
+                this long to prepare.
+            ingredient (Optional[str]): Only return recipes using this ingredient.
+
+        Returns:
+            List[RecipeSearchHit]: The matching recipes with their score, best first.
+        """
+        ranked = SearchService.search(
+            query, limit, category_id, difficulty_id, max_preparation_time, ingredient
+        )
+        if not ranked:
+            return []
+        recipes = {
+            recipe_instance.id: recipe_instance
+            for recipe_instance in RecipeModel.select().where(
+                RecipeModel.id.in_([recipe_id for recipe_id, _ in ranked])
+            )
+        }
+        return [
+            RecipeSearchHit(recipe=_to_recipe(recipes[recipe_id]), score=score)
+            for recipe_id, score in ranked
+            if recipe_id in recipes
+        ]
+
+    @staticmethod
+    def update_recipe(
+        recipe_id: int,
+        name: Optional[str] = None,
+        instruction: Optional[str] = None,
+        preparation_time: Optional[int] = None,
+        difficulty_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        expected_version: Optional[int] = None,
+    ) -> Optional[Recipe]:
+        """
+        Update an existing recipe by ID.
+
+        Args:
+            recipe_id (int): The ID of the recipe to update.
+            name (Optional[str]): The new name of the recipe.
+            instruction (Optional[str]): The new preparation instructions.
+            preparation_time (Optional[int]): The new preparation time.
+            difficulty_id (Optional[int]): The new difficulty level's ID.
+            category_id (Optional[int]): The new category's ID.
+            expected_version (Optional[int]): Only update the recipe if it is still at
+                this version.
+
+        Returns:
+            Optional[Recipe]: The updated recipe instance if successful, else None.
+
+        Raises:
+            ValueError: If the difficulty or category does not exist.
+            VersionConflict: If the recipe is no longer at `expected_version`.
+        """
+        _check_references(difficulty_id, category_id)
+        try:
+            recipe_instance = RecipeModel.get_by_id(recipe_id)
+        except DoesNotExist:
+            return None
+
+        # Update fields only if new values are provided
+        if name:
+            recipe_instance.name = name
+        if instruction:
+            recipe_instance.instruction = instruction
+        if preparation_time:
+            recipe_instance.preparation_time = preparation_time
+        if difficulty_id:
+            recipe_instance.difficulty = difficulty_id
+        if category_id:
+            recipe_instance.category = category_id
+
+        if not save_versioned(recipe_instance, expected_version):
+            return None
+        SearchService.index_recipes([recipe_id])
+        SuggestionService.index_recipes([recipe_id])
+        return _to_recipe(recipe_instance)
+
+    @staticmethod
+    def delete_recipe(recipe_id: int) -> bool:
+        """
+        Delete a recipe by ID.
+
+        Args:
+            recipe_id (int): The ID of the recipe to delete.
+
+        Returns:
+            bool: True if the recipe was deleted, else False.
+        """
+        deleted = RecipeModel.delete().where(RecipeModel.id == recipe_id).execute()
+        if deleted:
+            SearchService.remove_recipe(recipe_id)
+            SuggestionService.remove_recipe(recipe_id)
+            RecipeScalingService.forget_recipe(recipe_id)
+        return bool(deleted)
@@ -0,0 +1,272 @@
+# app/services/reference_cache.py
+
+"""
+In-process cache for the small reference tables.
+
+Roles, categories, difficulties, notification types and units are tiny and rarely
+change, so they are loaded once at startup into read-only maps of Pydantic
+models and served from memory for FK validation and response embedding.
+Every write replaces the affected map with a new one (copy-on-write), so
+readers always see a complete snapshot without taking a lock.
+
+Writes only update the cache of the process that made them, so a table is
+reloaded by the first lookup made more than `REFERENCE_CACHE["ttl"]` seconds
+after it was loaded, which bounds how long a change made by another worker
+process goes unnoticed. Roles carry a `version` column, so for them an
+expired map is first compared with the table in one aggregate query (count,
+highest ID and sum of the versions, which every insert, update or delete
+changes) and only reloaded when they differ. A lookup that misses also reloads its table once,
+which picks up rows created since the last load. An ID still missing after
+that is remembered for `REFERENCE_CACHE["negative_ttl"]` seconds, so repeated
+lookups of unknown IDs do not reload the table every time.
+
+`peek` and `all` never touch the database and can be used from async code.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple, Type
+from pydantic import BaseModel
+from peewee import Model, fn
+from config.database import (
+    CategoryModel, DifficultyModel, RoleModel, TypeNotificationModel, UnitModel,
+    connection_scope,
+)
+from config.settings import REFERENCE_CACHE
+from models.notification import TypeNotification
+from models.recipe import Category, Difficulty
+from models.unit import Unit
+from models.user import Role
+
+ROLES = "roles"
+CATEGORIES = "categories"
+DIFFICULTIES = "difficulties"
+TYPE_NOTIFICATIONS = "type_notifications"
+UNITS = "units"
+
+# Table name -> (Peewee model, Pydantic model)
+_TABLES: Dict[str, Tuple[Type[Model], Type[BaseModel]]] = {
+    ROLES: (RoleModel, Role),
+    CATEGORIES: (CategoryModel, Category),
+    DIFFICULTIES: (DifficultyModel, Difficulty),
+    TYPE_NOTIFICATIONS: (TypeNotificationModel, TypeNotification),
+    UNITS: (UnitModel, Unit),
+}
+
+# Tables whose rows have a `version` incremented by every write
+_VERSIONED = (ROLES,)
+
+
+class ReferenceCache:
+    """Read-only in-memory maps of the reference tables"""
+
+    _maps: Dict[str, Mapping[int, BaseModel]] = {table: MappingProxyType({}) for table in _TABLES}
+    # Table -> monotonic time of its last load
+    _loaded_at: Dict[str, float] = {}
+    # Table -> ID missing after a reload -> monotonic time until which it is assumed missing
+    _missing: Dict[str, Dict[int, float]] = {table: {} for table in _TABLES}
+    _write_lock = threading.Lock()
+    _counter_lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def load() -> None:
+        """Load every reference table, one query per table."""
+        for table in _TABLES:
+            ReferenceCache.reload(table)
+
+    @staticmethod
+    def reload(table: str) -> None:
+        """
+        Reload one table from the database and swap its map in atomically.
+
+        Args:
+            table (str): The name of the table, for example `ROLES`.
+        """
+        model, schema = _TABLES[table]
+        # Released on exit unless the caller already holds the connection
+        with connection_scope():
+            rows = {
+                row.id: schema.model_validate(row, from_attributes=True)
+                for row in model.select().iterator()
+            }
+        with ReferenceCache._write_lock:
+            ReferenceCache._maps[table] = MappingProxyType(rows)
+            ReferenceCache._loaded_at[table] = time.monotonic()
+            ReferenceCache._missing[table] = {}
+
+    @staticmethod
+    def _current(table: str) -> Mapping[int, BaseModel]:
+        """Return the map of a table, reloading it first once it is older than the TTL."""
+        loaded_at = ReferenceCache._loaded_at.get(table)
+        if loaded_at is None or time.monotonic() - loaded_at > REFERENCE_CACHE["ttl"]:
+            if loaded_at is not None and ReferenceCache._unchanged(table):
+                ReferenceCache._loaded_at[table] = time.monotonic()
+            else:
+                ReferenceCache.reload(table)
+        return ReferenceCache._maps[table]
+
+    @staticmethod
+    def _unchanged(table: str) -> bool:
+        """Tell whether a versioned table still matches its map, with one aggregate query."""
+        if table not in _VERSIONED:
+            return False
+        model = _TABLES[table][0]
+        rows = ReferenceCache._maps[table].values()
+        cached = (
+            len(rows),
+            max((row.id for row in rows), default=None),
+            sum(row.version for row in rows),
+        )
+        with connection_scope():
+            current = model.select(
+                fn.COUNT(model.id), fn.MAX(model.id), fn.COALESCE(fn.SUM(model.version), 0)
+            ).tuples().get()
+        return tuple(current) == cached
+
+    @staticmethod
+    def _unknown(table: str, entity_ids) -> set:
+        """Return the IDs not remembered as missing, forgetting the expired ones."""
+        missing = ReferenceCache._missing[table]
+        now = time.monotonic()
+        return {entity_id for entity_id in entity_ids if missing.get(entity_id, 0) <= now}
+
+    @staticmethod
+    def _remember_missing(table: str, entity_ids) -> None:
+        """Assume the IDs missing for the next `negative_ttl` seconds."""
+        if not entity_ids:
+            return
+        until = time.monotonic() + REFERENCE_CACHE["negative_ttl"]
+        with ReferenceCache._write_lock:
+            missing = dict(ReferenceCache._missing[table])
+            missing.update((entity_id, until) for entity_id in entity_ids)
+            ReferenceCache._missing[table] = missing
+
+    @staticmethod
+    def put(table: str, entity: BaseModel) -> None:
+        """
+        Add or replace one entity without reloading the table.
+
+        Args:
+            table (str): The name of the table.
+            entity (BaseModel): The entity, which must have an `id`.
+        """
+        with ReferenceCache._write_lock:
+            rows = dict(ReferenceCache._maps[table])
+            rows[entity.id] = entity
+            ReferenceCache._maps[table] = MappingProxyType(rows)
+            if entity.id in ReferenceCache._missing[table]:
+                missing = dict(ReferenceCache._missing[table])
+                del missing[entity.id]
+                ReferenceCache._missing[table] = missing
+
+    @staticmethod
+    def discard(table: str, entity_id: int) -> None:
+        """
+        Remove one entity without reloading the table.
+
+        Args:
+            table (str): The name of the table.
+            entity_id (int): The ID of the entity to remove.
+        """
+        with ReferenceCache._write_lock:
+            rows = dict(ReferenceCache._maps[table])
+            rows.pop(entity_id, None)
+            ReferenceCache._maps[table] = MappingProxyType(rows)
+
+    @staticmethod
+    def peek(table: str, entity_id: int) -> Optional[BaseModel]:
+        """
+        Look up an entity in memory only, never touching the database.
+
+        This is the lookup to use from async code.
+
+        Args:
+            table (str): The name of the table.
+            entity_id (int): The ID of the entity.
+
+        Returns:
+            Optional[BaseModel]: The cached entity, or None.
+        """
+        entity = ReferenceCache._maps[table].get(entity_id)
+        with ReferenceCache._counter_lock:
+            if entity is None:
+                ReferenceCache._misses += 1
+            else:
+                ReferenceCache._hits += 1
+        return entity
+
+    @staticmethod
+    def all(table: str) -> Mapping[int, BaseModel]:
+        """
+        Return the current snapshot of a table, keyed by ID.
+
+        Args:
+            table (str): The name of the table.
+
+        Returns:
+            Mapping[int, BaseModel]: A read-only map that later writes do not change.
+        """
+        return ReferenceCache._maps[table]
+
+    @staticmethod
+    def get(table: str, entity_id: int) -> Optional[BaseModel]:
+        """
+        Look up an entity, reloading its table once on a miss or when it is stale.
+
+        Args:
+            table (str): The name of the table.
+            entity_id (int): The ID of the entity.
+
+        Returns:
+            Optional[BaseModel]: The entity if it exists, else None.
+        """
+        ReferenceCache._current(table)
+        entity = ReferenceCache.peek(table, entity_id)
+        if entity is None and ReferenceCache._unknown(table, (entity_id,)):
+            ReferenceCache.reload(table)
+            entity = ReferenceCache._maps[table].get(entity_id)
+            if entity is None:
+                ReferenceCache._remember_missing(table, (entity_id,))
+        return entity
+
+    @staticmethod
+    def existing_ids(table: str, entity_ids) -> set:
+        """
+        Return which of the given IDs exist, reloading the table once on a miss.
+
+        Args:
+            table (str): The name of the table.
+            entity_ids (Iterable[int]): The IDs to check.
+
+        Returns:
+            set: The IDs that exist.
+        """
+        entity_ids = set(entity_ids)
+        known = entity_ids & ReferenceCache._current(table).keys()
+        with ReferenceCache._counter_lock:
+            ReferenceCache._hits += len(known)
+            ReferenceCache._misses += len(entity_ids) - len(known)
+        if ReferenceCache._unknown(table, entity_ids - known):
+            ReferenceCache.reload(table)
+            known = entity_ids & ReferenceCache._maps[table].keys()
+            ReferenceCache._remember_missing(table, entity_ids - known)
+        return known
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Return the hit and miss counters and the size of every map.
+
+        Returns:
+            dict: The counters, the number of cached rows per table and the
+            number of IDs remembered as missing per table.
+        """
+        return {
+            "hits": ReferenceCache._hits,
+            "misses": ReferenceCache._misses,
+            "sizes": {table: len(rows) for table, rows in ReferenceCache._maps.items()},
+            "missing": {table: len(ids) for table, ids in ReferenceCache._missing.items()},
+        }
@@ -5,13 +5,18 @@ Service layer for Role operations.
 
 This module contains the business logic for managing roles.
 It interacts with the `RoleModel` from the database and uses
-the `Role` Pydantic model for data validation.
+the `Role` Pydantic model for data validation. Every write is
+mirrored into the `ReferenceCache` and increments the role's version.
 """
 
-from typing import Optional
+from typing import List, Optional
 from peewee import DoesNotExist
-from config.database import RoleModel
-from models.user import Role
+from config.database import database, RoleModel
+from models.bulk import BulkError, BulkResult
+from models.user import Role, RoleCreate, RoleUpdate
+from services.bulk_operations import bulk_delete, bulk_insert, bulk_update, existing_ids
+from services.reference_cache import ROLES, ReferenceCache
+from services.versioning import save_versioned
 
 
 class RoleService:
@@ -29,8 +34,9 @@ class RoleService:
             Role: The created role instance.
         """
         role_instance = RoleModel.create(name=name)
-        # Using from_orm to convert Peewee model to Pydantic model
-        return Role.from_orm(role_instance)
+        role = Role.model_validate(role_instance)
+        ReferenceCache.put(ROLES, role)
+        return role
 
     @staticmethod
     def get_role_by_id(role_id: int) -> Optional[Role]:
@@ -44,31 +50,52 @@ class RoleService:
             Optional[Role]: The role instance if found, else None.
         """
         try:
-            role_instance = RoleModel.get_by_id(role_id)
-            # Using from_orm to convert Peewee model to Pydantic model
-            return Role.from_orm(role_instance)
+            return Role.model_validate(RoleModel.get_by_id(role_id))
         except DoesNotExist:
             return None
 
     @staticmethod
-    def update_role(role_id: int, name: str) -> Optional[Role]:
+    def get_role_version(role_id: int) -> Optional[int]:
+        """
+        Retrieve only the version of a role, for conditional requests.
+
+        Args:
+            role_id (int): The ID of the role.
+
+        Returns:
+            Optional[int]: The version of the role if found, else None.
+        """
+        return RoleModel.select(RoleModel.version).where(RoleModel.id == role_id).scalar()
+
+    @staticmethod
+    def update_role(
+        role_id: int, name: str, expected_version: Optional[int] = None
+    ) -> Optional[Role]:
         """
         Update an existing role by ID.
 
         Args:
             role_id (int): The ID of the role to update.
             name (str): The new name of the role.
+            expected_version (Optional[int]): Only update the role if it is still at
+                this version.
 
         Returns:
             Optional[Role]: The updated role instance if successful, else None.
+
+        Raises:
+            VersionConflict: If the role is no longer at `expected_version`.
         """
         try:
             role_instance = RoleModel.get_by_id(role_id)
-            role_instance.name = name
-            role_instance.save()
-            return Role.from_orm(role_instance)
         except DoesNotExist:
             return None
+        role_instance.name = name
+        if not save_versioned(role_instance, expected_version):
+            return None
+        role = Role.model_validate(role_instance)
+        ReferenceCache.put(ROLES, role)
+        return role
 
     @staticmethod
     def delete_role(role_id: int) -> bool:
@@ -85,6 +112,66 @@ class RoleService:
             # Check if the role exists before attempting to delete
             role_instance = RoleModel.get_by_id(role_id)
             role_instance.delete_instance()
+            ReferenceCache.discard(ROLES, role_id)
             return True
         except DoesNotExist:
             return False
+
+    @staticmethod
+    def bulk_create_roles(roles: List[RoleCreate]) -> BulkResult:
+        """
+        Create many roles in one transaction.
+
+        Args:
+            roles (List[RoleCreate]): The roles to create.
+
+        Returns:
+            BulkResult: The created roles with their ids and the per-row errors.
+        """
+        rows = [(index, {"name": role.name}) for index, role in enumerate(roles)]
+        with database.atomic():
+            items, errors = bulk_insert(RoleModel, rows)
+        ReferenceCache.reload(ROLES)
+        return BulkResult(succeeded=items, errors=errors)
+
+    @staticmethod
+    def bulk_update_roles(roles: List[RoleUpdate]) -> BulkResult:
+        """
+        Update many roles in one transaction.
+
+        Args:
+            roles (List[RoleUpdate]): The roles to update.
+
+        Returns:
+            BulkResult: The updated roles and the per-row errors.
+        """
+        found = existing_ids(RoleModel, (role.id for role in roles))
+        errors: List[BulkError] = []
+        rows = []
+        for index, role in enumerate(roles):
+            if role.id in found:
+                rows.append((index, role.id, {RoleModel.name: role.name}))
+            else:
+                errors.append(BulkError(index=index, detail=f"Role with id {role.id} not found"))
+
+        with database.atomic():
+            items, update_errors = bulk_update(RoleModel, rows)
+        ReferenceCache.reload(ROLES)
+        errors.extend(update_errors)
+        return BulkResult(succeeded=items, errors=sorted(errors, key=lambda error: error.index))
+
+    @staticmethod
+    def bulk_delete_roles(role_ids: List[int]) -> BulkResult:
+        """
+        Delete many roles in one transaction.
+
+        Args:
+            role_ids (List[int]): The IDs of the roles to delete.
+
+        Returns:
+            BulkResult: The deleted roles and the ids that were not found.
+        """
+        with database.atomic():
+            items, errors = bulk_delete(RoleModel, role_ids)
+        ReferenceCache.reload(ROLES)
+        return BulkResult(succeeded=items, errors=errors)
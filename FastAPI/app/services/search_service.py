@@ -0,0 +1,462 @@
+# app/services/search_service.py
+
+"""
+Service layer for full-text recipe search.
+
+The default backend is an in-memory inverted index over the recipe name, its
+instruction and the names of its ingredients, ranked with BM25. Posting lists
+are append-only arrays read through NumPy, so a query is a handful of vectorized
+passes over the posting lists of its terms instead of a `LIKE '%term%'` scan.
+The index is built lazily from the database and kept up to date incrementally
+by `RecipeService` as recipes are created, updated or deleted. Writes handled by
+other worker processes are picked up through a `RecipeChangeTracker` when the
+index is used.
+
+With `SEARCH["backend"] == "mysql"` the search runs on a MySQL FULLTEXT index
+over `recipes(name, instruction)` instead, and nothing is kept in memory.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from peewee import JOIN, chunked, fn
+from playhouse.mysql_ext import Match
+from config.database import database, IngredientModel, RecipeModel, RecipeIngredientModel
+from config.settings import SEARCH
+from services.recipe_changes import RecipeChangeTracker
+
+# Recipes read per query while building the index
+LOAD_BATCH_SIZE = 5_000
+
+# Term frequency added per occurrence in each field
+NAME_WEIGHT = 3
+INGREDIENT_WEIGHT = 2
+INSTRUCTION_WEIGHT = 1
+
+_TOKEN = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and at by de del el en for from in into la las los of on or para por "
+    "the to un una with y".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase, accent-free search terms.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        List[str]: The terms, without stopwords and single characters.
+    """
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    return [token for token in _TOKEN.findall(text) if len(token) > 1 and token not in _STOPWORDS]
+
+
+class RecipeDocument(NamedTuple):
+    """The searchable fields and filter values of one recipe."""
+
+    recipe_id: int
+    name: str
+    instruction: str
+    ingredients: List[str]
+    category_id: int
+    difficulty_id: int
+    preparation_time: int
+
+
+class SearchIndex:
+    """In-memory BM25 inverted index over recipes"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        # Term -> (document positions, term frequencies)
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        # Ingredient name term -> document positions
+        self._ingredients: Dict[str, array] = {}
+        # Per-position columns; a position is freed by clearing `_alive`
+        self._recipe_ids = array("q")
+        self._lengths = array("f")
+        self._alive = array("b")
+        self._categories = array("q")
+        self._difficulties = array("q")
+        self._preparation_times = array("q")
+        self._positions: Dict[int, int] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, document: RecipeDocument) -> None:
+        """
+        Index a recipe, replacing its previous version if it was indexed.
+
+        Args:
+            document (RecipeDocument): The recipe to index.
+        """
+        counts = Counter()
+        for token in tokenize(document.name):
+            counts[token] += NAME_WEIGHT
+        for token in tokenize(document.instruction):
+            counts[token] += INSTRUCTION_WEIGHT
+        ingredient_tokens = set()
+        for ingredient in document.ingredients:
+            for token in tokenize(ingredient):
+                counts[token] += INGREDIENT_WEIGHT
+                ingredient_tokens.add(token)
+        length = float(sum(counts.values()))
+
+        with self._lock:
+            self._discard(document.recipe_id)
+            position = len(self._recipe_ids)
+            for term, frequency in counts.items():
+                positions, frequencies = self._postings.setdefault(term, (array("q"), array("f")))
+                positions.append(position)
+                frequencies.append(frequency)
+            for token in ingredient_tokens:
+                self._ingredients.setdefault(token, array("q")).append(position)
+            self._recipe_ids.append(document.recipe_id)
+            self._lengths.append(length)
+            self._alive.append(1)
+            self._categories.append(document.category_id)
+            self._difficulties.append(document.difficulty_id)
+            self._preparation_times.append(document.preparation_time)
+            self._positions[document.recipe_id] = position
+            self._total_length += length
+
+    def remove(self, recipe_id: int) -> None:
+        """
+        Remove a recipe from the index.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+        """
+        with self._lock:
+            self._discard(recipe_id)
+
+    def _discard(self, recipe_id: int) -> None:
+        position = self._positions.pop(recipe_id, None)
+        if position is None:
+            return
+        self._alive[position] = 0
+        self._total_length -= self._lengths[position]
+        # Free the dead positions once they make up a quarter of the index
+        dead = len(self._recipe_ids) - len(self._positions)
+        if dead > 1_000 and dead * 4 > len(self._recipe_ids):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the positions of removed recipes from every column and posting list."""
+        with self._lock:
+            alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+            remap = np.cumsum(alive) - 1
+
+            def _keep(positions: array, values: Optional[array] = None):
+                current = np.frombuffer(positions, dtype=np.int64)
+                keep = alive[current]
+                new_positions = array("q", remap[current[keep]].tobytes())
+                if values is None:
+                    return new_positions
+                kept = np.frombuffer(values, dtype=np.float32)[keep]
+                return new_positions, array("f", kept.tobytes())
+
+            postings = {}
+            for term, (positions, frequencies) in self._postings.items():
+                new_positions, new_frequencies = _keep(positions, frequencies)
+                if new_positions:
+                    postings[term] = (new_positions, new_frequencies)
+            ingredients = {}
+            for term, positions in self._ingredients.items():
+                new_positions = _keep(positions)
+                if new_positions:
+                    ingredients[term] = new_positions
+
+            def _column(values: array, typecode: str, dtype) -> array:
+                return array(typecode, np.frombuffer(values, dtype=dtype)[alive].tobytes())
+
+            self._postings = postings
+            self._ingredients = ingredients
+            self._recipe_ids = _column(self._recipe_ids, "q", np.int64)
+            self._lengths = _column(self._lengths, "f", np.float32)
+            self._categories = _column(self._categories, "q", np.int64)
+            self._difficulties = _column(self._difficulties, "q", np.int64)
+            self._preparation_times = _column(self._preparation_times, "q", np.int64)
+            self._alive = array("b", bytes([1]) * len(self._recipe_ids))
+            self._positions = {
+                recipe_id: position for position, recipe_id in enumerate(self._recipe_ids)
+            }
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        difficulty_id: Optional[int] = None,
+        max_preparation_time: Optional[int] = None,
+        ingredient: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank the recipes matching a query with BM25.
+
+        Args:
+            query (str): The words to look for.
+            limit (int): The maximum number of results.
+            category_id (Optional[int]): Only return recipes in this category.
+            difficulty_id (Optional[int]): Only return recipes with this difficulty.
+            max_preparation_time (Optional[int]): Only return recipes that take at most
+                this long to prepare.
+            ingredient (Optional[str]): Only return recipes with an ingredient whose
+                name contains all of these words.
+
+        Returns:
+            List[Tuple[int, float]]: (recipe_id, score) pairs, best first.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            live = len(self._positions)
+            size = len(self._recipe_ids)
+            postings = [self._postings[term] for term in terms if term in self._postings]
+            if not postings or not live:
+                return []
+            average_length = self._total_length / live
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)
+
+            all_positions = []
+            all_weights = []
+            for positions, frequencies in postings:
+                positions = np.frombuffer(positions, dtype=np.int64)
+                frequencies = np.frombuffer(frequencies, dtype=np.float32)
+                document_frequency = len(positions)
+                idf = math.log(1 + (live - document_frequency + 0.5) / (document_frequency + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * lengths[positions] / average_length)
+                all_positions.append(positions)
+                all_weights.append(idf * frequencies * (self.k1 + 1) / (frequencies + norm))
+            scores = np.bincount(
+                np.concatenate(all_positions), np.concatenate(all_weights), minlength=size
+            )
+
+            mask = (scores > 0) & np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+            if category_id is not None:
+                mask &= np.frombuffer(self._categories, dtype=np.int64) == category_id
+            if difficulty_id is not None:
+                mask &= np.frombuffer(self._difficulties, dtype=np.int64) == difficulty_id
+            if max_preparation_time is not None:
+                preparation_times = np.frombuffer(self._preparation_times, dtype=np.int64)
+                mask &= preparation_times <= max_preparation_time
+            for token in set(tokenize(ingredient or "")):
+                has_ingredient = np.zeros(size, dtype=bool)
+                if token in self._ingredients:
+                    has_ingredient[np.frombuffer(self._ingredients[token], dtype=np.int64)] = True
+                mask &= has_ingredient
+
+            candidates = np.flatnonzero(mask)
+            if len(candidates) > limit:
+                best = np.argpartition(-scores[candidates], limit - 1)[:limit]
+                candidates = candidates[best]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            recipe_ids = np.frombuffer(self._recipe_ids, dtype=np.int64)
+            return [(int(recipe_ids[i]), float(scores[i])) for i in candidates]
+
+
+class MySQLFullTextSearch:
+    """Search backend running on a MySQL FULLTEXT index"""
+
+    INDEX_NAME = "ft_recipes_name_instruction"
+
+    @staticmethod
+    def ensure_index() -> None:
+        """Create the FULLTEXT index on `recipes(name, instruction)` if it is missing."""
+        indexes = {index.name for index in database.get_indexes(RecipeModel._meta.table_name)}
+        if MySQLFullTextSearch.INDEX_NAME not in indexes:
+            database.execute_sql(
+                f"ALTER TABLE {RecipeModel._meta.table_name} "
+                f"ADD FULLTEXT INDEX {MySQLFullTextSearch.INDEX_NAME} (name, instruction)"
+            )
+
+    @staticmethod
+    def search(
+        query: str,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        difficulty_id: Optional[int] = None,
+        max_preparation_time: Optional[int] = None,
+        ingredient: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """Rank the recipes matching a query, see `SearchIndex.search`."""
+        score = Match(
+            (RecipeModel.name, RecipeModel.instruction), query, "IN NATURAL LANGUAGE MODE"
+        )
+        select = RecipeModel.select(RecipeModel.id, score.alias("score")).where(score > 0)
+        if category_id is not None:
+            select = select.where(RecipeModel.category == category_id)
+        if difficulty_id is not None:
+            select = select.where(RecipeModel.difficulty == difficulty_id)
+        if max_preparation_time is not None:
+            select = select.where(RecipeModel.preparation_time <= max_preparation_time)
+        if ingredient:
+            select = select.where(
+                RecipeModel.id.in_(
+                    RecipeIngredientModel.select(RecipeIngredientModel.recipe_id)
+                    .join(IngredientModel)
+                    .where(fn.LOWER(IngredientModel.name).contains(ingredient.lower()))
+                )
+            )
+        return [
+            (recipe_id, float(rank))
+            for recipe_id, rank in select.order_by(score.desc()).limit(limit).tuples()
+        ]
+
+
+def _load_documents(recipe_ids: Optional[Iterable[int]] = None) -> Iterator[RecipeDocument]:
+    """
+    Read recipes with their ingredient names, in keyset batches.
+
+    Args:
+        recipe_ids (Optional[Iterable[int]]): Only read these recipes; all when None.
+
+    Yields:
+        RecipeDocument: One document per recipe.
+    """
+    ids = None if recipe_ids is None else sorted(set(recipe_ids))
+    last = 0
+    while True:
+        query = RecipeModel.select().where(RecipeModel.id > last)
+        if ids is not None:
+            query = query.where(RecipeModel.id.in_(ids))
+        recipes = list(query.order_by(RecipeModel.id).limit(LOAD_BATCH_SIZE))
+        if not recipes:
+            return
+        names: Dict[int, List[str]] = {}
+        for recipe_id, name in (
+            RecipeIngredientModel.select(RecipeIngredientModel.recipe_id, IngredientModel.name)
+            .join(IngredientModel, JOIN.INNER)
+            .where(
+                RecipeIngredientModel.recipe_id.between(recipes[0].id, recipes[-1].id)
+            )
+            .tuples()
+        ):
+            names.setdefault(recipe_id, []).append(name)
+        for recipe in recipes:
+            yield RecipeDocument(
+                recipe_id=recipe.id,
+                name=recipe.name,
+                instruction=recipe.instruction,
+                ingredients=names.get(recipe.id, []),
+                category_id=recipe.category_id,
+                difficulty_id=recipe.difficulty_id,
+                preparation_time=recipe.preparation_time,
+            )
+        last = recipes[-1].id
+
+
+class SearchService:
+    """Service layer for recipe search"""
+
+    _index: Optional[SearchIndex] = None
+    _lock = threading.Lock()
+    _changes = RecipeChangeTracker()
+
+    @staticmethod
+    def uses_memory_index() -> bool:
+        """Whether the in-memory index is the configured backend."""
+        return SEARCH["backend"] != "mysql"
+
+    @staticmethod
+    def get_index() -> SearchIndex:
+        """
+        Return the shared in-memory index, building it on first use.
+
+        Recipes written by other processes since the last use are applied first.
+
+        Returns:
+            SearchIndex: The current index.
+        """
+        if SearchService._index is None:
+            with SearchService._lock:
+                if SearchService._index is None:
+                    SearchService._changes.snapshot()
+                    index = SearchIndex()
+                    for document in _load_documents():
+                        index.add(document)
+                    SearchService._index = index
+        else:
+            SearchService._apply_changes()
+        return SearchService._index
+
+    @staticmethod
+    def _apply_changes() -> None:
+        changes = SearchService._changes.poll()
+        if changes is None:
+            return
+        for batch in chunked(changes.changed, LOAD_BATCH_SIZE):
+            SearchService.index_recipes(batch)
+        for recipe_id in changes.deleted:
+            SearchService.remove_recipe(recipe_id)
+
+    @staticmethod
+    def index_recipes(recipe_ids: Iterable[int]) -> None:
+        """
+        Add or refresh recipes in the in-memory index after they were written.
+
+        Does nothing until the index has been built, since building it reads the
+        current rows anyway, and nothing with the MySQL backend.
+
+        Args:
+            recipe_ids (Iterable[int]): The IDs of the created or updated recipes.
+        """
+        index = SearchService._index
+        if index is None or not SearchService.uses_memory_index():
+            return
+        for document in _load_documents(recipe_ids):
+            index.add(document)
+
+    @staticmethod
+    def remove_recipe(recipe_id: int) -> None:
+        """
+        Remove a deleted recipe from the in-memory index.
+
+        Args:
+            recipe_id (int): The ID of the deleted recipe.
+        """
+        if SearchService._index is not None:
+            SearchService._index.remove(recipe_id)
+
+    @staticmethod
+    def search(
+        query: str,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        difficulty_id: Optional[int] = None,
+        max_preparation_time: Optional[int] = None,
+        ingredient: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank the recipes matching a query on the configured backend.
+
+        Args:
+            query (str): The words to look for.
+            limit (int): The maximum number of results.
+            category_id (Optional[int]): Only return recipes in this category.
+            difficulty_id (Optional[int]): Only return recipes with this difficulty.
+            max_preparation_time (Optional[int]): Only return recipes that take at most
+                this long to prepare.
+            ingredient (Optional[str]): Only return recipes using this ingredient.
+
+        Returns:
+            List[Tuple[int, float]]: (recipe_id, score) pairs, best first.
+        """
+        if SearchService.uses_memory_index():
+            backend = SearchService.get_index()
+        else:
+            backend = MySQLFullTextSearch
+        return backend.search(
+            query, limit, category_id, difficulty_id, max_preparation_time, ingredient
+        )
@@ -0,0 +1,164 @@
+# app/services/shopping_list_service.py
+
+"""
+Service layer for ShoppingList operations.
+
+This module builds shopping lists from menus. A single query reads the
+ingredients of every recipe in the menu together with what the user's pantries
+hold, negated, and the `UnitConverter` sums them per ingredient and base unit
+in one vectorized pass: 1 kg of flour in one recipe and 200 g in another add
+up to 1200 g, and an ingredient needed both by mass and by volume gets a row
+for each. The positive remainders are written with batched `insert_many`, so
+the number of statements does not depend on the size of the menu. Pantry
+products are matched to ingredients by case-insensitive name.
+"""
+
+from typing import List, Optional, Tuple
+from peewee import JOIN, chunked, fn
+from config.database import (
+    database, IngredientModel, MenuModel, MenuRecipeModel, PantryModel, PantryProductModel,
+    ProductModel, RecipeIngredientModel, ShoppingListModel, ShoppingListIngredientModel
+)
+from models.shopping_list import ShoppingListDetail
+from models.shopping_list_ingredient import ShoppingListIngredient
+from services.bulk_operations import BULK_BATCH_SIZE
+from services.notification_queue import (
+    SHOPPING_LIST_READY, NotificationEvent, NotificationQueue
+)
+from services.pantry_service import EMPTY_QUANTITY
+from services.unit_service import UnitService
+
+
+def _missing_ingredients(menu_id: int, user_id: int) -> List[Tuple[int, int, float]]:
+    """
+    Compute what a menu needs that the pantries of its owner do not hold.
+
+    Args:
+        menu_id (int): The ID of the menu.
+        user_id (int): The ID of the menu's owner, whose pantries are subtracted.
+
+    Returns:
+        List[Tuple[int, int, float]]: (ingredient_id, base unit, quantity)
+        rows, ordered by ingredient and unit.
+    """
+    needed = (
+        RecipeIngredientModel.select(
+            RecipeIngredientModel.ingredient_id,
+            RecipeIngredientModel.quantity,
+            RecipeIngredientModel.unit,
+        )
+        .join(MenuRecipeModel, on=(MenuRecipeModel.recipe_id == RecipeIngredientModel.recipe_id))
+        .where(MenuRecipeModel.menu_id == menu_id)
+    )
+    held = (
+        PantryProductModel.select(
+            IngredientModel.id, PantryProductModel.quantity * -1, PantryProductModel.unit
+        )
+        .join(PantryModel)
+        .switch(PantryProductModel)
+        .join(ProductModel)
+        .join(IngredientModel, on=(fn.LOWER(IngredientModel.name) == fn.LOWER(ProductModel.name)))
+        .where(PantryModel.user_id == user_id)
+    )
+    rows = list((needed + held).tuples())
+    if not rows:
+        return []
+    ingredient_ids, quantities, units = zip(*rows)
+    ingredient_ids, units, remaining = UnitService.get_converter().totals(
+        ingredient_ids, quantities, units
+    )
+    missing = remaining > EMPTY_QUANTITY
+    return list(zip(
+        ingredient_ids[missing].tolist(), units[missing].tolist(), remaining[missing].tolist()
+    ))
+
+
+class ShoppingListService:
+    """Service layer for ShoppingList operations"""
+
+    @staticmethod
+    def create_from_menu(menu_id: int) -> Optional[ShoppingListDetail]:
+        """
+        Create the shopping list for a menu.
+
+        Once the transaction is committed, the owner of the menu is notified
+        through the `NotificationQueue`, without waiting for the insert.
+
+        Args:
+            menu_id (int): The ID of the menu.
+
+        Returns:
+            Optional[ShoppingListDetail]: The created shopping list with its
+            ingredients if the menu exists, else None.
+        """
+        menu = MenuModel.get_or_none(MenuModel.id == menu_id)
+        if menu is None:
+            return None
+
+        with database.atomic():
+            shopping_list = ShoppingListModel.create(menu_id=menu_id)
+            rows = (
+                (shopping_list.id, ingredient_id, unit, quantity)
+                for ingredient_id, unit, quantity in _missing_ingredients(
+                    menu_id, menu.user_id_id
+                )
+            )
+            for chunk in chunked(rows, BULK_BATCH_SIZE):
+                ShoppingListIngredientModel.insert_many(
+                    chunk,
+                    fields=[
+                        ShoppingListIngredientModel.shopping_list_id,
+                        ShoppingListIngredientModel.ingredient_id,
+                        ShoppingListIngredientModel.unit,
+                        ShoppingListIngredientModel.quantity,
+                    ],
+                ).execute()
+        NotificationQueue.publish(NotificationEvent(
+            SHOPPING_LIST_READY,
+            f"The shopping list for your menu of {menu.date} is ready",
+            (menu.user_id_id,),
+        ))
+        return ShoppingListService.get_shopping_list(shopping_list.id)
+
+    @staticmethod
+    def get_shopping_list(shopping_list_id: int) -> Optional[ShoppingListDetail]:
+        """
+        Retrieve a shopping list with its ingredients in a single query.
+
+        Args:
+            shopping_list_id (int): The ID of the shopping list.
+
+        Returns:
+            Optional[ShoppingListDetail]: The shopping list if found, else None.
+        """
+        rows = list(
+            ShoppingListModel.select(
+                ShoppingListModel.id,
+                ShoppingListModel.menu_id,
+                ShoppingListIngredientModel.ingredient_id,
+                ShoppingListIngredientModel.quantity,
+                ShoppingListIngredientModel.unit,
+                ShoppingListIngredientModel.purchased,
+            )
+            .join(ShoppingListIngredientModel, JOIN.LEFT_OUTER)
+            .where(ShoppingListModel.id == shopping_list_id)
+            .order_by(ShoppingListIngredientModel.ingredient_id, ShoppingListIngredientModel.unit)
+            .tuples()
+        )
+        if not rows:
+            return None
+        return ShoppingListDetail(
+            id=rows[0][0],
+            menu_id=rows[0][1],
+            ingredients=[
+                ShoppingListIngredient(
+                    shopping_list_id=list_id,
+                    ingredient_id=ingredient_id,
+                    quantity=quantity,
+                    unit=unit,
+                    purchased=purchased,
+                )
+                for list_id, _, ingredient_id, quantity, unit, purchased in rows
+                if ingredient_id is not None
+            ],
+        )
@@ -0,0 +1,419 @@
+# app/services/suggestion_service.py
+
+"""
+Service layer for pantry-driven recipe suggestions.
+
+This module keeps an in-memory inverted index from ingredient id to the recipes
+that use it, built lazily from `RecipeIngredientModel` and kept up to date
+incrementally by `RecipeService` and `ImportService` as recipes are written or
+deleted, and through a `RecipeChangeTracker` for the writes handled by other
+worker processes. Posting lists are append-only arrays of dense recipe positions read
+through NumPy, so ranking a pantry is a single `bincount` over the posting lists
+of the ingredients the user has and never issues a query per recipe. Pantries
+hold products while recipes hold ingredients; both are matched by their
+case-insensitive name.
+"""
+
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from peewee import chunked, fn
+from config.database import (
+    database, IngredientModel, PantryModel, PantryProductModel, ProductModel,
+    RecipeIngredientModel, RecipeModel, SuggestRecipeModel, SuggestionRecipeIngredientModel
+)
+from models.suggest_recipe import RecipeSuggestion
+from services.notification_queue import NEW_SUGGESTION, NotificationEvent, NotificationQueue
+from services.recipe_changes import RecipeChangeTracker
+
+# Rows per INSERT statement when persisting suggestions
+INSERT_BATCH_SIZE = 1000
+
+
+class IngredientIndex:
+    """Inverted index from ingredient id to the recipes that use it."""
+
+    def __init__(
+        self,
+        recipe_ingredients: Iterable[Tuple[int, int]],
+        product_ingredients: Optional[Dict[int, int]] = None,
+        product_names: Optional[Dict[str, List[int]]] = None,
+    ):
+        """
+        Build the index.
+
+        Args:
+            recipe_ingredients (Iterable[Tuple[int, int]]): (recipe_id, ingredient_id) pairs.
+            product_ingredients (Optional[Dict[int, int]]): Maps product ids to the
+                ingredient id with the same name.
+            product_names (Optional[Dict[str, List[int]]]): Maps lowercase product
+                names to their product ids, to match ingredients indexed later.
+        """
+        self._lock = threading.RLock()
+        self.recipes: Dict[int, frozenset] = {}
+        self.product_ingredients: Dict[int, int] = product_ingredients or {}
+        self._product_names: Dict[str, List[int]] = product_names or {}
+        # Ingredient id -> dense positions of the recipes that use it
+        self._postings: Dict[int, array] = {}
+        # Dense position -> recipe id and number of ingredients, 0 once removed
+        self._recipe_ids = array("q")
+        self._sizes = array("q")
+        self._positions: Dict[int, int] = {}
+
+        recipes: Dict[int, Set[int]] = {}
+        for recipe_id, ingredient_id in recipe_ingredients:
+            recipes.setdefault(recipe_id, set()).add(ingredient_id)
+        for recipe_id, ingredients in recipes.items():
+            self._add(recipe_id, ingredients)
+
+    def _add(self, recipe_id: int, ingredients: Set[int]) -> None:
+        self._discard(recipe_id)
+        if not ingredients:
+            return
+        position = len(self._recipe_ids)
+        for ingredient_id in ingredients:
+            self._postings.setdefault(ingredient_id, array("q")).append(position)
+        self._recipe_ids.append(recipe_id)
+        self._sizes.append(len(ingredients))
+        self._positions[recipe_id] = position
+        self.recipes[recipe_id] = frozenset(ingredients)
+
+    def _discard(self, recipe_id: int) -> None:
+        position = self._positions.pop(recipe_id, None)
+        if position is None:
+            return
+        del self.recipes[recipe_id]
+        self._sizes[position] = 0
+        # Rebuild the posting lists once dead positions make up a quarter of them
+        dead = len(self._recipe_ids) - len(self._positions)
+        if dead > 1_000 and dead * 4 > len(self._recipe_ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        recipes = self.recipes
+        self.recipes = {}
+        self._postings = {}
+        self._recipe_ids = array("q")
+        self._sizes = array("q")
+        self._positions = {}
+        for recipe_id, ingredients in recipes.items():
+            self._add(recipe_id, ingredients)
+
+    def update(
+        self, recipes: Dict[int, Set[int]], ingredient_names: Optional[Dict[int, str]] = None
+    ) -> None:
+        """
+        Add, replace or remove recipes after they were written.
+
+        Args:
+            recipes (Dict[int, Set[int]]): The ingredient ids of each recipe; a
+                recipe with none is removed.
+            ingredient_names (Optional[Dict[int, str]]): The names of the
+                ingredients, to match them with the products of the same name.
+        """
+        with self._lock:
+            for ingredient_id, name in (ingredient_names or {}).items():
+                for product_id in self._product_names.get(name.strip().lower(), ()):
+                    self.product_ingredients.setdefault(product_id, ingredient_id)
+            for recipe_id, ingredients in recipes.items():
+                self._add(recipe_id, ingredients)
+
+    def remove(self, recipe_id: int) -> None:
+        """
+        Remove a recipe from the index.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+        """
+        with self._lock:
+            self._discard(recipe_id)
+
+    @classmethod
+    def load(cls) -> "IngredientIndex":
+        """
+        Build the index from the database in three queries.
+
+        Returns:
+            IngredientIndex: The index over every recipe in the database.
+        """
+        pairs = RecipeIngredientModel.select(
+            RecipeIngredientModel.recipe_id, RecipeIngredientModel.ingredient_id
+        ).tuples()
+        ingredient_ids = {
+            name.strip().lower(): ingredient_id
+            for ingredient_id, name in IngredientModel.select(
+                IngredientModel.id, IngredientModel.name
+            ).tuples()
+        }
+        product_ingredients = {}
+        product_names: Dict[str, List[int]] = {}
+        for product_id, name in ProductModel.select(ProductModel.id, ProductModel.name).tuples():
+            product_names.setdefault(name.strip().lower(), []).append(product_id)
+            ingredient_id = ingredient_ids.get(name.strip().lower())
+            if ingredient_id is not None:
+                product_ingredients[product_id] = ingredient_id
+        return cls(pairs, product_ingredients, product_names)
+
+    def ingredients_for_products(self, product_ids: Iterable[int]) -> Set[int]:
+        """
+        Translate pantry product ids into ingredient ids.
+
+        Args:
+            product_ids (Iterable[int]): The ids of the products in the pantry.
+
+        Returns:
+            Set[int]: The ids of the matching ingredients.
+        """
+        return {
+            self.product_ingredients[product_id]
+            for product_id in product_ids
+            if product_id in self.product_ingredients
+        }
+
+    def rank(self, available: Set[int], limit: int = 10) -> List[RecipeSuggestion]:
+        """
+        Rank the recipes by the share of their ingredients that are available.
+
+        Args:
+            available (Set[int]): The ids of the ingredients at hand.
+            limit (int): The maximum number of suggestions to return.
+
+        Returns:
+            List[RecipeSuggestion]: The best recipes, highest score first. Ties
+            are broken by fewer missing ingredients and then by recipe id.
+        """
+        with self._lock:
+            return self._rank(available, limit)
+
+    def _rank(self, available: Set[int], limit: int) -> List[RecipeSuggestion]:
+        arrays = [
+            np.frombuffer(self._postings[i], dtype=np.int64)
+            for i in available if i in self._postings
+        ]
+        if not arrays or limit <= 0:
+            return []
+        all_sizes = np.frombuffer(self._sizes, dtype=np.int64)
+        counts = np.bincount(np.concatenate(arrays), minlength=len(all_sizes))
+        # Positions of removed recipes still appear in the posting lists
+        counts[all_sizes == 0] = 0
+
+        positions = np.flatnonzero(counts)
+        matched = counts[positions]
+        sizes = all_sizes[positions]
+        scores = matched / sizes
+        if len(positions) > limit:
+            # Keep only the candidates that can reach the top before sorting
+            threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= threshold
+            positions, matched, sizes, scores = (
+                positions[keep], matched[keep], sizes[keep], scores[keep]
+            )
+        recipe_ids = np.frombuffer(self._recipe_ids, dtype=np.int64)[positions]
+        order = np.lexsort((recipe_ids, sizes - matched, -scores))[:limit]
+
+        return [
+            RecipeSuggestion(
+                recipe_id=int(recipe_ids[i]),
+                score=float(scores[i]),
+                matched=int(matched[i]),
+                total=int(sizes[i]),
+                missing=sorted(self.recipes[int(recipe_ids[i])] - available),
+            )
+            for i in order
+        ]
+
+
+class SuggestionService:
+    """Service layer for recipe suggestions"""
+
+    _index: Optional[IngredientIndex] = None
+    _lock = threading.Lock()
+    _changes = RecipeChangeTracker()
+
+    @staticmethod
+    def get_index() -> IngredientIndex:
+        """
+        Return the shared ingredient index, building it on first use.
+
+        Recipes written by other processes since the last use are applied first.
+
+        Returns:
+            IngredientIndex: The current index.
+        """
+        if SuggestionService._index is None:
+            with SuggestionService._lock:
+                if SuggestionService._index is None:
+                    SuggestionService._changes.snapshot()
+                    SuggestionService._index = IngredientIndex.load()
+        else:
+            SuggestionService._apply_changes()
+        return SuggestionService._index
+
+    @staticmethod
+    def _apply_changes() -> None:
+        changes = SuggestionService._changes.poll()
+        if changes is None:
+            return
+        for batch in chunked(changes.changed, INSERT_BATCH_SIZE):
+            SuggestionService.index_recipes(batch)
+        for recipe_id in changes.deleted:
+            SuggestionService.remove_recipe(recipe_id)
+
+    @staticmethod
+    def refresh_index() -> IngredientIndex:
+        """
+        Rebuild the index of this process from the database and swap it in atomically.
+
+        Returns:
+            IngredientIndex: The new index.
+        """
+        SuggestionService._changes.snapshot()
+        index = IngredientIndex.load()
+        SuggestionService._index = index
+        return index
+
+    @staticmethod
+    def index_recipes(recipe_ids: Iterable[int]) -> None:
+        """
+        Add or refresh recipes in the index after they or their ingredients were written.
+
+        Does nothing until the index has been built, since building it reads the
+        current rows anyway.
+
+        Args:
+            recipe_ids (Iterable[int]): The IDs of the created or updated recipes.
+        """
+        index = SuggestionService._index
+        if index is None:
+            return
+        recipes: Dict[int, Set[int]] = {recipe_id: set() for recipe_id in recipe_ids}
+        if not recipes:
+            return
+        names: Dict[int, str] = {}
+        for recipe_id, ingredient_id, name in (
+            RecipeIngredientModel.select(
+                RecipeIngredientModel.recipe_id,
+                RecipeIngredientModel.ingredient_id,
+                IngredientModel.name,
+            )
+            .join(IngredientModel)
+            .where(RecipeIngredientModel.recipe_id.in_(list(recipes)))
+            .tuples()
+        ):
+            recipes[recipe_id].add(ingredient_id)
+            names[ingredient_id] = name
+        index.update(recipes, names)
+
+    @staticmethod
+    def remove_recipe(recipe_id: int) -> None:
+        """
+        Remove a deleted recipe from the index.
+
+        Args:
+            recipe_id (int): The ID of the deleted recipe.
+        """
+        if SuggestionService._index is not None:
+            SuggestionService._index.remove(recipe_id)
+
+    @staticmethod
+    def get_pantry_ingredients(user_id: int) -> Set[int]:
+        """
+        Retrieve the ids of the ingredients in every pantry of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Set[int]: The ids of the ingredients the user has in stock.
+        """
+        product_ids = (
+            PantryProductModel.select(PantryProductModel.product_id)
+            .join(PantryModel)
+            .where((PantryModel.user_id == user_id) & (PantryProductModel.quantity > 0))
+            .tuples()
+        )
+        return SuggestionService.get_index().ingredients_for_products(
+            product_id for (product_id,) in product_ids
+        )
+
+    @staticmethod
+    def suggest_recipes(user_id: int, limit: int = 10) -> List[RecipeSuggestion]:
+        """
+        Rank the recipes against the pantry of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int): The maximum number of suggestions to return.
+
+        Returns:
+            List[RecipeSuggestion]: The best recipes with their missing ingredients.
+        """
+        available = SuggestionService.get_pantry_ingredients(user_id)
+        return SuggestionService.get_index().rank(available, limit)
+
+    @staticmethod
+    def save_suggestions(user_id: int, suggestions: List[RecipeSuggestion]) -> None:
+        """
+        Replace the stored suggestions of a user in a single transaction.
+
+        Every ingredient of a suggested recipe is stored with its `missing` flag.
+        Suggestions for recipes deleted since they were ranked are dropped.
+        The rows are written with batched `insert_many` calls, so the number of
+        statements does not depend on the number of suggestions. Once they are
+        committed, the user is notified through the `NotificationQueue`.
+
+        Args:
+            user_id (int): The ID of the user.
+            suggestions (List[RecipeSuggestion]): The suggestions to store.
+        """
+        index = SuggestionService.get_index()
+        with database.atomic():
+            SuggestRecipeModel.delete().where(SuggestRecipeModel.user_id == user_id).execute()
+            recipe_ids = {suggestion.recipe_id for suggestion in suggestions}
+            existing = set()
+            for batch in chunked(recipe_ids, INSERT_BATCH_SIZE):
+                existing.update(
+                    recipe_id for (recipe_id,) in
+                    RecipeModel.select(RecipeModel.id).where(RecipeModel.id.in_(batch)).tuples()
+                )
+            suggestions = [
+                suggestion for suggestion in suggestions if suggestion.recipe_id in existing
+            ]
+            if not suggestions:
+                return
+            for batch in chunked(suggestions, INSERT_BATCH_SIZE):
+                SuggestRecipeModel.insert_many(
+                    [(user_id, suggestion.recipe_id) for suggestion in batch],
+                    fields=[SuggestRecipeModel.user_id, SuggestRecipeModel.recipe_id],
+                ).execute()
+
+            suggestion_ids = dict(
+                SuggestRecipeModel.select(
+                    SuggestRecipeModel.recipe_id, fn.MAX(SuggestRecipeModel.id)
+                )
+                .where(SuggestRecipeModel.user_id == user_id)
+                .group_by(SuggestRecipeModel.recipe_id)
+                .tuples()
+            )
+            rows = []
+            for suggestion in suggestions:
+                missing = set(suggestion.missing)
+                rows.extend(
+                    (suggestion_ids[suggestion.recipe_id], ingredient_id, ingredient_id in missing)
+                    for ingredient_id in index.recipes.get(suggestion.recipe_id, ())
+                )
+            for batch in chunked(rows, INSERT_BATCH_SIZE):
+                SuggestionRecipeIngredientModel.insert_many(
+                    batch,
+                    fields=[
+                        SuggestionRecipeIngredientModel.suggestion_recipe_id,
+                        SuggestionRecipeIngredientModel.ingredient_id,
+                        SuggestionRecipeIngredientModel.missing,
+                    ],
+                ).execute()
+        NotificationQueue.publish(NotificationEvent(
+            NEW_SUGGESTION,
+            f"You have {len(suggestions)} new recipe suggestions",
+            (user_id,),
+        ))
@@ -0,0 +1,198 @@
+# app/services/unit_service.py
+
+"""
+Service layer for units of measure.
+
+Pantry products and recipe ingredients store their unit as the ID of a row of
+the `units` table, which gives the dimension of the unit (mass, volume or
+count) and its factor to the base unit of that dimension: grams, millilitres
+and pieces. Quantities can only be compared or summed once they are in base
+units.
+
+`UnitConverter` holds the catalogue as NumPy arrays indexed by unit ID, so a
+whole batch of (quantity, unit) pairs is converted with two array lookups and
+one multiplication, and summed per key and base unit with `bincount`, whatever
+the number of rows. Units missing from the catalogue are kept as they
+are, with a factor of 1, so rows written before the catalogue existed still add
+up with the rows of the same unit.
+
+The catalogue is created at startup by `UnitService.ensure_units` and cached in
+the `ReferenceCache`; the converter is rebuilt whenever the cached table changes.
+"""
+
+import threading
+from typing import Iterable, List, Mapping, Optional, Tuple
+import numpy as np
+from config.database import UnitModel
+from models.unit import UNIT_CATALOGUE, Unit
+from services.reference_cache import UNITS, ReferenceCache
+
+# Pairs summed in a dense array indexed by pair when it has at most this many
+# entries, or as many as there are rows, rather than sorted
+DENSE_GROUPS = 1 << 20
+
+
+class UnitConverter:
+    """Conversion of batches of quantities to the base unit of their dimension."""
+
+    def __init__(self, units: Iterable[Unit]):
+        """
+        Build the lookup arrays.
+
+        Args:
+            units (Iterable[Unit]): The unit catalogue.
+        """
+        units = sorted(units, key=lambda unit: unit.id)
+        bases = {}
+        for unit in units:
+            if unit.factor == 1:
+                bases.setdefault(unit.dimension, unit.id)
+
+        size = (units[-1].id if units else 0) + 1
+        # Unit ID -> factor to the base unit, base unit ID and whether it is in
+        # the catalogue; IDs missing from it convert to themselves
+        self._factors = np.ones(size, dtype=np.float64)
+        self._bases = np.arange(size, dtype=np.int64)
+        self._known = np.zeros(size, dtype=bool)
+        for unit in units:
+            base = bases.get(unit.dimension)
+            if base is None:
+                continue
+            self._factors[unit.id] = unit.factor
+            self._bases[unit.id] = base
+            self._known[unit.id] = True
+        self.units = {unit.id: unit for unit in units}
+
+    def _lookup(self, unit_ids) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the IDs as integers, their positions in the arrays and which are in range."""
+        ids = np.asarray(unit_ids)
+        if ids.dtype.kind == "f":
+            ids = np.rint(ids)
+        ids = ids.astype(np.int64, copy=False)
+        positions = np.clip(ids, 0, len(self._factors) - 1)
+        return ids, positions, positions == ids
+
+    def known(self, unit_ids) -> np.ndarray:
+        """
+        Tell which units are in the catalogue.
+
+        Args:
+            unit_ids (array-like): The unit IDs.
+
+        Returns:
+            np.ndarray: A boolean per unit ID.
+        """
+        _, positions, inside = self._lookup(unit_ids)
+        return inside & self._known[positions]
+
+    def to_base(self, quantities, unit_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert quantities to the base unit of their dimension.
+
+        Unit IDs are rounded to integers, since `RecipeIngredientModel.unit`
+        is a float column.
+
+        Args:
+            quantities (array-like): The quantities.
+            unit_ids (array-like): The unit of each quantity.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The converted quantities, as floats,
+            and the ID of their base unit.
+        """
+        ids, positions, inside = self._lookup(unit_ids)
+        factors = self._factors.take(positions)
+        bases = self._bases.take(positions)
+        if not inside.all():
+            outside = ~inside
+            np.copyto(factors, 1.0, where=outside)
+            np.copyto(bases, ids, where=outside)
+        return np.asarray(quantities, dtype=np.float64) * factors, bases
+
+    def totals(self, keys, quantities, unit_ids) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sum quantities per key and base unit.
+
+        Quantities of different dimensions are never added together, so a key
+        with quantities by mass and by volume gets a total for each.
+
+        Args:
+            keys (array-like): The integer key of each quantity, such as an ingredient ID.
+            quantities (array-like): The quantities.
+            unit_ids (array-like): The unit of each quantity.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The keys, base units and
+            totals, one entry per distinct (key, base unit) pair, ordered by
+            key and then by base unit.
+        """
+        amounts, bases = self.to_base(quantities, unit_ids)
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(keys):
+            return keys, bases, amounts
+        # Every (key, base unit) pair as one integer, ordered by key then unit
+        key_min, base_min = keys.min(), bases.min()
+        span = bases.max() - base_min + 1
+        groups = (keys - key_min) * span + (bases - base_min)
+        size = int((keys.max() - key_min + 1) * span)
+        if size <= max(len(groups), DENSE_GROUPS):
+            present = np.flatnonzero(np.bincount(groups, minlength=size))
+            sums = np.bincount(groups, weights=amounts, minlength=size)[present]
+        else:
+            # Sparse pairs, such as a few keys far apart, would need a huge array
+            present, inverse = np.unique(groups, return_inverse=True)
+            sums = np.bincount(inverse.reshape(-1), weights=amounts, minlength=len(present))
+        return present // span + key_min, present % span + base_min, sums
+
+
+class UnitService:
+    """Service layer for units of measure"""
+
+    # The cached catalogue snapshot and the converter built from it
+    _converter: Optional[Tuple[Mapping[int, Unit], UnitConverter]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def ensure_units() -> None:
+        """Create the units of `UNIT_CATALOGUE` that are missing from the database."""
+        units = ReferenceCache.all(UNITS)
+        codes = {unit.code for unit in units.values()}
+        missing = [
+            # A custom unit may have taken the ID, then the database picks one
+            unit if unit["id"] not in units else {
+                key: value for key, value in unit.items() if key != "id"
+            }
+            for unit in UNIT_CATALOGUE
+            if unit["code"] not in codes
+        ]
+        if missing:
+            for unit in missing:
+                UnitModel.insert(unit).execute()
+            ReferenceCache.reload(UNITS)
+
+    @staticmethod
+    def get_converter() -> UnitConverter:
+        """
+        Return the converter of the cached unit catalogue, rebuilt when the catalogue changes.
+
+        Returns:
+            UnitConverter: The current converter.
+        """
+        units = ReferenceCache.all(UNITS)
+        cached = UnitService._converter
+        if cached is None or cached[0] is not units:
+            with UnitService._lock:
+                cached = UnitService._converter
+                if cached is None or cached[0] is not units:
+                    cached = UnitService._converter = (units, UnitConverter(units.values()))
+        return cached[1]
+
+    @staticmethod
+    def list_units() -> List[Unit]:
+        """
+        Retrieve the unit catalogue.
+
+        Returns:
+            List[Unit]: Every unit, ordered by ID.
+        """
+        return sorted(ReferenceCache.all(UNITS).values(), key=lambda unit: unit.id)
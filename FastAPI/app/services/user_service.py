@@ -5,13 +5,61 @@ Service layer for User operations.
 
 This module contains the business logic for managing users.
 It interacts with the `UserModel` from the database and uses
-the `User` Pydantic model for data validation.
+the `User` Pydantic model for data validation. Roles are validated
+and embedded from the `ReferenceCache` instead of being queried.
+Passwords are hashed on the process pool of `PasswordService`.
+Every write increments the user's version.
 """
 
-from typing import Optional
-from peewee import DoesNotExist
-from config.database import UserModel, RoleModel
-from models.user import User
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from peewee import DoesNotExist, chunked
+from config.database import database, UserModel, RoleModel
+from models.bulk import BulkError, BulkResult
+from models.user import Role, User, UserCreate, UserUpdate
+from services.bulk_operations import (
+    BULK_BATCH_SIZE, bulk_delete, bulk_insert, bulk_update, existing_ids
+)
+from services.pagination import stream_page
+from services.password_service import PasswordService
+from services.reference_cache import ROLES, ReferenceCache
+from services.versioning import save_versioned
+
+
+def _emails_in_use(emails: Iterable[str]) -> Dict[str, int]:
+    """
+    Look up which emails are already taken, with one query per chunk.
+
+    Args:
+        emails (Iterable[str]): The emails to check.
+
+    Returns:
+        Dict[str, int]: The taken emails mapped to the id of their owner.
+    """
+    taken = {}
+    for chunk in chunked(set(emails), BULK_BATCH_SIZE):
+        taken.update(
+            UserModel.select(UserModel.email, UserModel.id)
+            .where(UserModel.email.in_(chunk))
+            .tuples()
+        )
+    return taken
+
+
+def _to_user(user_instance: UserModel, role: Role) -> User:
+    """Build the `User` response from a row and its already loaded role."""
+    return User(
+        id=user_instance.id,
+        name=user_instance.name,
+        email=user_instance.email,
+        password=user_instance.password,
+        role=role,
+        version=user_instance.version,
+    )
+
+
+def _to_listed_user(user_instance: UserModel) -> User:
+    """Build the `User` response, embedding its role from the reference cache."""
+    return _to_user(user_instance, ReferenceCache.get(ROLES, user_instance.role_id))
 
 
 class UserService:
@@ -34,15 +82,13 @@ class UserService:
         Raises:
             ValueError: If the role with the given ID does not exist.
         """
-        try:
-            role_instance = RoleModel.get_by_id(role_id)
-            user_instance = UserModel.create(
-                name=name, email=email, password=password, role=role_instance
-            )
-            # Using from_orm to convert Peewee model to Pydantic model
-            return User.from_orm(user_instance)
-        except DoesNotExist as exc:
-            raise ValueError(f"Role with id {role_id} not found") from exc
+        role = ReferenceCache.get(ROLES, role_id)
+        if role is None:
+            raise ValueError(f"Role with id {role_id} not found")
+        user_instance = UserModel.create(
+            name=name, email=email, password=PasswordService.hash(password), role=role_id
+        )
+        return _to_user(user_instance, role)
 
     @staticmethod
     def get_user_by_id(user_id: int) -> Optional[User]:
@@ -56,12 +102,100 @@ class UserService:
             Optional[User]: The user instance if found, else None.
         """
         try:
-            user_instance = UserModel.get_by_id(user_id)
-            # Using from_orm to convert Peewee model to Pydantic model
-            return User.from_orm(user_instance)
+            # The role is joined in the same query, so validating it does not
+            # trigger a lazy SELECT on roles
+            user_instance = (
+                UserModel.select(UserModel, RoleModel)
+                .join(RoleModel)
+                .where(UserModel.id == user_id)
+                .get()
+            )
+            return User.model_validate(user_instance)
+        except DoesNotExist:
+            return None
+
+    @staticmethod
+    def get_user_versions(user_id: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Retrieve only what the representation of a user depends on, for conditional requests.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: The version of the user, the ID of its role
+            and the version of the role, if the user is found, else None.
+        """
+        return (
+            UserModel.select(UserModel.version, RoleModel.id, RoleModel.version)
+            .join(RoleModel)
+            .where(UserModel.id == user_id)
+            .tuples()
+            .first()
+        )
+
+    @staticmethod
+    def authenticate(email: str, password: str) -> Optional[User]:
+        """
+        Check a user's credentials.
+
+        When the stored hash was made with other parameters than the configured
+        ones, or the password is still stored in plaintext, it is hashed again
+        with the current parameters.
+
+        Args:
+            email (str): The email of the user.
+            password (str): The plaintext password.
+
+        Returns:
+            Optional[User]: The user if the credentials are valid, else None.
+        """
+        try:
+            user_instance = (
+                UserModel.select(UserModel, RoleModel)
+                .join(RoleModel)
+                .where(UserModel.email == email)
+                .get()
+            )
         except DoesNotExist:
+            PasswordService.verify(password, None)
             return None
 
+        stored = user_instance.password
+        if not PasswordService.verify(password, stored):
+            return None
+        if PasswordService.needs_rehash(stored):
+            user_instance.password = PasswordService.hash(password)
+            # Skip the write if a concurrent login or update already replaced the hash
+            updated = UserModel.update(
+                password=user_instance.password, version=UserModel.version + 1
+            ).where(
+                (UserModel.id == user_instance.id) & (UserModel.password == stored)
+            ).execute()
+            if updated:
+                user_instance.version += 1
+        return User.model_validate(user_instance)
+
+    @staticmethod
+    def stream_users(
+        after: Optional[int] = None, limit: int = 100, role_id: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream a keyset page of users, each one with its role.
+
+        Args:
+            after (Optional[int]): Only users with an ID greater than this are returned.
+            limit (int): The maximum number of users in the page.
+            role_id (Optional[int]): Only return users with this role.
+
+        Returns:
+            Iterator[bytes]: The page as JSON, see `services.pagination.stream_page`.
+        """
+        query = UserModel.select()
+        if role_id is not None:
+            query = query.where(UserModel.role == role_id)
+        return stream_page(query, UserModel.id, after, limit, _to_listed_user, User)
+
     @staticmethod
     def update_user(
         user_id: int,
@@ -69,6 +203,7 @@ class UserService:
         email: Optional[str] = None,
         password: Optional[str] = None,
         role_id: Optional[int] = None,
+        expected_version: Optional[int] = None,
     ) -> Optional[User]:
         """
         Update an existing user by ID.
@@ -79,12 +214,15 @@ class UserService:
             email (Optional[str]): The new email of the user.
             password (Optional[str]): The new password of the user.
             role_id (Optional[int]): The new role's ID.
+            expected_version (Optional[int]): Only update the user if it is still at
+                this version.
 
         Returns:
             Optional[User]: The updated user instance if successful, else None.
 
         Raises:
             ValueError: If the role with the given ID does not exist.
+            VersionConflict: If the user is no longer at `expected_version`.
         """
         try:
             user_instance = UserModel.get_by_id(user_id)
@@ -95,16 +233,15 @@ class UserService:
             if email:
                 user_instance.email = email
             if password:
-                user_instance.password = password
+                user_instance.password = PasswordService.hash(password)
             if role_id:
-                try:
-                    role_instance = RoleModel.get_by_id(role_id)
-                    user_instance.role = role_instance
-                except DoesNotExist as exc:
-                    raise ValueError(f"Role with id {role_id} not found") from exc
+                if ReferenceCache.get(ROLES, role_id) is None:
+                    raise ValueError(f"Role with id {role_id} not found")
+                user_instance.role = role_id
 
-            user_instance.save()
-            return User.from_orm(user_instance)
+            if not save_versioned(user_instance, expected_version):
+                return None
+            return _to_user(user_instance, ReferenceCache.get(ROLES, user_instance.role_id))
 
         except DoesNotExist:
             return None
@@ -127,3 +264,120 @@ class UserService:
             return True
         except DoesNotExist:
             return False
+
+    @staticmethod
+    def bulk_create_users(users: List[UserCreate]) -> BulkResult:
+        """
+        Create many users in one transaction.
+
+        Role ids are validated once per distinct role and emails are checked
+        against the unique index in chunks before inserting, so a duplicate email
+        or an unknown role only rejects its own row.
+
+        Args:
+            users (List[UserCreate]): The users to create.
+
+        Returns:
+            BulkResult: The created users with their ids and the per-row errors.
+        """
+        roles = ReferenceCache.existing_ids(ROLES, (user.role_id for user in users))
+        taken = _emails_in_use(user.email for user in users)
+
+        errors: List[BulkError] = []
+        rows = []
+        accepted = []
+        for index, user in enumerate(users):
+            if user.role_id not in roles:
+                errors.append(
+                    BulkError(index=index, detail=f"Role with id {user.role_id} not found")
+                )
+            elif user.email in taken:
+                errors.append(BulkError(index=index, detail=f"Email {user.email} already exists"))
+            else:
+                # Reserve the email so later rows of the batch cannot reuse it
+                taken[user.email] = None
+                accepted.append((index, user))
+
+        hashes = PasswordService.hash_many(user.password for _, user in accepted)
+        for (index, user), password in zip(accepted, hashes):
+            rows.append((index, {
+                "name": user.name,
+                "email": user.email,
+                "password": password,
+                "role": user.role_id,
+            }))
+
+        with database.atomic():
+            items, insert_errors = bulk_insert(UserModel, rows)
+        errors.extend(insert_errors)
+        return BulkResult(succeeded=items, errors=sorted(errors, key=lambda error: error.index))
+
+    @staticmethod
+    def bulk_update_users(users: List[UserUpdate]) -> BulkResult:
+        """
+        Update many users in one transaction.
+
+        Only the fields that are provided are changed. Unknown users, unknown roles
+        and emails that belong to another user only reject their own row.
+
+        Args:
+            users (List[UserUpdate]): The users to update.
+
+        Returns:
+            BulkResult: The updated users and the per-row errors.
+        """
+        found = existing_ids(UserModel, (user.id for user in users))
+        roles = ReferenceCache.existing_ids(
+            ROLES, (user.role_id for user in users if user.role_id)
+        )
+        owners = _emails_in_use(user.email for user in users if user.email)
+
+        errors: List[BulkError] = []
+        rows = []
+        for index, user in enumerate(users):
+            if user.id not in found:
+                errors.append(BulkError(index=index, detail=f"User with id {user.id} not found"))
+            elif user.role_id and user.role_id not in roles:
+                errors.append(
+                    BulkError(index=index, detail=f"Role with id {user.role_id} not found")
+                )
+            elif user.email and owners.get(user.email, user.id) != user.id:
+                errors.append(BulkError(index=index, detail=f"Email {user.email} already exists"))
+            else:
+                fields = {}
+                if user.name:
+                    fields[UserModel.name] = user.name
+                if user.email:
+                    fields[UserModel.email] = user.email
+                    # Reserve the email so later rows of the batch cannot reuse it
+                    owners[user.email] = user.id
+                if user.password:
+                    fields[UserModel.password] = user.password
+                if user.role_id:
+                    fields[UserModel.role] = user.role_id
+                rows.append((index, user.id, fields))
+
+        with_password = [fields for _, _, fields in rows if UserModel.password in fields]
+        hashes = PasswordService.hash_many(fields[UserModel.password] for fields in with_password)
+        for fields, password in zip(with_password, hashes):
+            fields[UserModel.password] = password
+
+        with database.atomic():
+            items, update_errors = bulk_update(UserModel, rows)
+        errors.extend(update_errors)
+        return BulkResult(succeeded=items, errors=sorted(errors, key=lambda error: error.index))
+
+    @staticmethod
+    def bulk_delete_users(user_ids: List[int]) -> BulkResult:
+        """
+        Delete many users in one transaction.
+
+        Args:
+            user_ids (List[int]): The IDs of the users to delete.
+
+        Returns:
+            BulkResult: The deleted users and the ids that were not found.
+        """
+        with database.atomic():
+            items, errors = bulk_delete(UserModel, user_ids)
+        return BulkResult(succeeded=items, errors=errors)
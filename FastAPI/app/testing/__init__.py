@@ -0,0 +1,22 @@
+"""
+Helpers for testing the API.
+
+Available Helpers:
+    - QueryCounter: Context manager recording every SQL statement executed.
+    - assert_num_queries: Calls an endpoint and asserts how many queries it ran.
+    - full_scans: Runs EXPLAIN on a statement and returns the tables it reads in full.
+    - find_full_scans: Explains the statements recorded by a QueryCounter.
+    - assert_no_full_scans: Calls an endpoint and asserts none of its queries scans a table.
+"""
+
+from testing.explain import assert_no_full_scans, find_full_scans, full_scans
+from testing.query_counter import QueryCounter, assert_num_queries
+
+# Define what helpers will be available for public import
+__all__ = [
+    "QueryCounter",
+    "assert_num_queries",
+    "full_scans",
+    "find_full_scans",
+    "assert_no_full_scans",
+]
@@ -0,0 +1,143 @@
+# app/testing/explain.py
+
+"""
+Query plan checks for tests.
+
+`full_scans` runs `EXPLAIN` on a statement, `EXPLAIN QUERY PLAN` on the SQLite
+stand-in, and returns the tables the plan reads in full: access type `ALL`, or
+`index` for a full index scan, on MySQL and a `SCAN` on SQLite. A full index
+scan reads as many rows as a table scan, so a lookup that finds no index on its
+leading column is reported either way. Scans of derived tables, such as the
+`GROUP BY` subqueries of the shopping list, are not reported. Plain
+`INSERT ... VALUES` and transaction control have no plan and are skipped.
+
+Plans depend on the data: on MySQL, run the checks against tables holding a
+realistic number of rows and with up-to-date statistics, otherwise the
+optimizer reads small tables in full even when an index exists.
+
+Example:
+    client = TestClient(app)
+    assert_no_full_scans(client, "GET", "/shopping-lists/1")
+"""
+
+import re
+from typing import Iterable, List, Tuple
+from peewee import SqliteDatabase
+from config.database import connection_scope, database
+from config.query_stats import fingerprint
+from testing.query_counter import QueryCounter
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+_TABLE = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+[`\"](\w+)[`\"](?:\s+AS\s+[`\"](\w+)[`\"])?", re.I
+)
+_SQLITE_SCAN = re.compile(
+    r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(?: USING (?:COVERING )?INDEX \w+)?$"
+)
+_MYSQL_SCANS = ("ALL", "index")
+
+
+def _is_explainable(sql: str) -> bool:
+    statement = sql.lstrip().upper()
+    if statement.startswith(_EXPLAINABLE):
+        return True
+    return statement.startswith("INSERT") and " SELECT " in statement
+
+
+def _aliases(sql: str) -> dict:
+    """Map the aliases of the statement, and the table names themselves, to table names."""
+    aliases = {}
+    for table, alias in _TABLE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(sql: str, params=None) -> List[str]:
+    """
+    Return the tables a statement reads in full.
+
+    Args:
+        sql (str): The statement, with placeholders.
+        params: The values of the placeholders.
+
+    Returns:
+        List[str]: The scanned tables, empty if every table is read through an
+        index or the statement has no plan.
+    """
+    if not _is_explainable(sql):
+        return []
+    aliases = _aliases(sql)
+    scanned = []
+    with connection_scope():
+        if isinstance(database, SqliteDatabase):
+            for row in database.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params):
+                match = _SQLITE_SCAN.match(row[-1])
+                if match:
+                    scanned.append(match.group(2) or match.group(1))
+        else:
+            cursor = database.execute_sql(f"EXPLAIN {sql}", params)
+            columns = [column[0] for column in cursor.description]
+            for row in cursor.fetchall():
+                plan = dict(zip(columns, row))
+                if plan["type"] in _MYSQL_SCANS:
+                    scanned.append(plan["table"])
+    # Unknown names are derived tables and subqueries
+    return sorted({aliases[name] for name in scanned if name in aliases})
+
+
+def find_full_scans(
+    queries: Iterable[Tuple[str, tuple]], allowed: Iterable[str] = ()
+) -> List[dict]:
+    """
+    Explain every distinct statement of a `QueryCounter` and keep the full scans.
+
+    Statements that only differ in their values are explained once.
+
+    Args:
+        queries (Iterable[Tuple[str, tuple]]): (sql, params) pairs, as in `QueryCounter.queries`.
+        allowed (Iterable[str]): Tables that may be read in full, such as the
+            ones loaded whole into an in-memory index.
+
+    Returns:
+        List[dict]: The statement and its scanned tables, for each offending statement.
+    """
+    allowed = set(allowed)
+    seen = set()
+    found = []
+    for sql, params in queries:
+        key = fingerprint(sql)
+        if key in seen:
+            continue
+        seen.add(key)
+        tables = [table for table in full_scans(sql, params) if table not in allowed]
+        if tables:
+            found.append({"sql": sql, "tables": tables})
+    return found
+
+
+def assert_no_full_scans(client, method: str, url: str, allowed: Iterable[str] = (), **kwargs):
+    """
+    Call an endpoint and assert that none of its statements reads a table in full.
+
+    Args:
+        client (TestClient): The test client of the application.
+        method (str): The HTTP method.
+        url (str): The URL to call.
+        allowed (Iterable[str]): Tables that may be read in full.
+        **kwargs: Passed to `client.request`, for example `params` or `json`.
+
+    Returns:
+        Response: The response of the call.
+
+    Raises:
+        AssertionError: If a statement of the endpoint scans a table that is not allowed.
+    """
+    with QueryCounter() as counter:
+        response = client.request(method, url, **kwargs)
+    found = find_full_scans(counter.queries, allowed)
+    if found:
+        details = "\n".join(f"  {', '.join(scan['tables'])}: {scan['sql']}" for scan in found)
+        raise AssertionError(f"{method} {url} scanned tables in full:\n{details}")
+    return response
@@ -0,0 +1,85 @@
+# app/testing/pytest_plugin.py
+
+"""
+Pytest plugin failing tests that introduce N+1 query patterns.
+
+Load it before the application is imported, either with
+`pytest -p testing.pytest_plugin` or with `pytest_plugins = ["testing.pytest_plugin"]`
+in the root `conftest.py`. It turns on the query diagnostics of
+`middleware.query_diagnostics`, and a test fails when any request it makes runs
+one statement fingerprint more than `N_PLUS_ONE_THRESHOLD` times.
+
+Known patterns can be accepted while they are being fixed:
+
+- `--n-plus-one-baseline=PATH` reads a JSON list of accepted fingerprints, so
+  only new patterns fail; `--n-plus-one-update-baseline` rewrites the file with
+  every pattern seen in the run.
+- `@pytest.mark.allow_n_plus_one` exempts a single test.
+"""
+
+import json
+import os
+import pytest
+from config.settings import QUERY_DIAGNOSTICS
+from middleware.query_diagnostics import QueryDiagnostics
+
+# Must happen before `main` is imported, which installs the middleware
+QUERY_DIAGNOSTICS["enabled"] = True
+
+_seen = set()
+
+
+def pytest_addoption(parser):
+    """Register the baseline options."""
+    group = parser.getgroup("n-plus-one", "N+1 query detection")
+    group.addoption(
+        "--n-plus-one-baseline",
+        default=None,
+        help="JSON file listing the accepted N+1 statement fingerprints.",
+    )
+    group.addoption(
+        "--n-plus-one-update-baseline",
+        action="store_true",
+        help="Rewrite the baseline file with the N+1 patterns found in this run.",
+    )
+
+
+def pytest_configure(config):
+    """Register the marker and load the baseline."""
+    config.addinivalue_line(
+        "markers", "allow_n_plus_one: do not fail this test on N+1 query patterns"
+    )
+    path = config.getoption("n_plus_one_baseline")
+    config.n_plus_one_baseline = set()
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as handle:
+            config.n_plus_one_baseline = set(json.load(handle))
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Fail the test if a request it made repeated a statement not in the baseline."""
+    flags = []
+    QueryDiagnostics.add_listener(flags.append)
+    try:
+        result = yield
+    finally:
+        QueryDiagnostics.remove_listener(flags.append)
+
+    _seen.update(flag["fingerprint"] for flag in flags)
+    new = [flag for flag in flags if flag["fingerprint"] not in item.config.n_plus_one_baseline]
+    if new and not item.get_closest_marker("allow_n_plus_one"):
+        details = "\n".join(
+            f"  {flag['method']} {flag['route']}: {flag['count']} x {flag['fingerprint']}"
+            for flag in new
+        )
+        pytest.fail(f"N+1 query pattern detected:\n{details}", pytrace=False)
+    return result
+
+
+def pytest_sessionfinish(session):
+    """Write the baseline file when asked to."""
+    path = session.config.getoption("n_plus_one_baseline")
+    if path and session.config.getoption("n_plus_one_update_baseline"):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(sorted(_seen), handle, indent=2)
@@ -0,0 +1,78 @@
+# app/testing/query_counter.py
+
+"""
+Query counting helpers for tests.
+
+`QueryCounter` wraps `database.execute_sql` while it is active and records every
+statement from every thread, so it also sees the queries run by sync routes in
+the threadpool. Transaction control statements (BEGIN, SAVEPOINT, ...) are left
+out so counts are the same on MySQL and on the SQLite stand-in.
+
+Example:
+    client = TestClient(app)
+    assert_num_queries(client, "GET", "/users/1", 1)
+"""
+
+import threading
+from typing import List, Tuple
+from config.database import database
+from config.query_stats import TRANSACTION_STATEMENTS
+
+
+class QueryCounter:
+    """Context manager recording the SQL statements executed on the database"""
+
+    def __init__(self):
+        self.queries: List[Tuple[str, tuple]] = []
+        self._lock = threading.Lock()
+        self._original = None
+
+    @property
+    def count(self) -> int:
+        """The number of statements recorded so far."""
+        return len(self.queries)
+
+    def __enter__(self) -> "QueryCounter":
+        self._original = database.execute_sql
+
+        def execute_sql(sql, *args, **kwargs):
+            if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+                params = args[0] if args else kwargs.get("params")
+                with self._lock:
+                    self.queries.append((sql, params))
+            return self._original(sql, *args, **kwargs)
+
+        database.execute_sql = execute_sql
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        # Drop the instance attribute so the class method is visible again
+        del database.execute_sql
+        self._original = None
+
+
+def assert_num_queries(client, method: str, url: str, expected: int, **kwargs):
+    """
+    Call an endpoint and assert the number of SQL statements it executed.
+
+    Args:
+        client (TestClient): The test client of the application.
+        method (str): The HTTP method.
+        url (str): The URL to call.
+        expected (int): The exact number of statements the call may run.
+        **kwargs: Passed to `client.request`, for example `params` or `json`.
+
+    Returns:
+        Response: The response of the call.
+
+    Raises:
+        AssertionError: If the endpoint ran a different number of statements.
+    """
+    with QueryCounter() as counter:
+        response = client.request(method, url, **kwargs)
+    if counter.count != expected:
+        statements = "\n".join(sql for sql, _ in counter.queries)
+        raise AssertionError(
+            f"{method} {url} executed {counter.count} queries, expected {expected}:\n{statements}"
+        )
+    return response
@@ -0,0 +1,63 @@
+"""
+Fixtures shared by the tests: a seeded database and a client of the application.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import main
+from config.database import (
+    MODELS,
+    CategoryModel,
+    DifficultyModel,
+    IngredientModel,
+    RecipeIngredientModel,
+    RecipeModel,
+    RoleModel,
+    UserModel,
+    database,
+)
+
+USERS = 10
+RECIPES = 10
+
+
+def _seed() -> None:
+    """Create the tables and a few users, recipes and ingredients."""
+    with database.connection_context():
+        database.create_tables(MODELS)
+        roles = [RoleModel.create(name=name) for name in ("admin", "cook")]
+        users = [
+            UserModel.create(
+                name=f"user{index}",
+                email=f"user{index}@example.com",
+                password="secret",
+                role=roles[index % len(roles)],
+            )
+            for index in range(USERS)
+        ]
+        category = CategoryModel.create(name="Dessert")
+        difficulty = DifficultyModel.create(name="Easy")
+        ingredients = [
+            IngredientModel.create(name=name) for name in ("Egg", "Milk", "Flour", "Sugar")
+        ]
+        for index in range(RECIPES):
+            recipe = RecipeModel.create(
+                name=f"Recipe {index}",
+                instruction="Mix and bake",
+                preparation_time=10 + index,
+                difficulty=difficulty,
+                category=category,
+                user=users[index % len(users)],
+            )
+            for ingredient in ingredients[: 1 + index % len(ingredients)]:
+                RecipeIngredientModel.create(
+                    recipe_id=recipe, ingredient_id=ingredient, quantity=1, unit=1
+                )
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A client of the application, started once on a seeded database."""
+    _seed()
+    with TestClient(main.app) as test_client:
+        yield test_client
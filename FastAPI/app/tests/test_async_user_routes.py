@@ -0,0 +1,20 @@
+"""
+Validation errors of the asynchronous user routes.
+"""
+
+
+def test_create_user_with_unknown_role(client):
+    """Creating a user with a role that does not exist is refused with 422."""
+    response = client.post(
+        "/async/users/",
+        params={"name": "ghost", "email": "ghost@example.com", "password": "secret", "role_id": 99},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Role with id 99 not found"
+
+
+def test_update_user_with_unknown_role(client):
+    """Moving a user to a role that does not exist is refused with 422."""
+    response = client.put("/async/users/1", params={"role_id": 99})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Role with id 99 not found"
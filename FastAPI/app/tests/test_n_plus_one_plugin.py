@@ -0,0 +1,61 @@
+"""
+Tests of `testing.pytest_plugin`, run in a nested pytest session.
+"""
+
+import pytest
+
+LAZY_ROLES = """
+import pytest
+from config.database import UserModel, connection_scope
+import main
+
+
+@main.app.get("/test/lazy-roles")
+@connection_scope()
+def lazy_roles():
+    # `user.role` runs one SELECT per user
+    return [user.role.name for user in UserModel.select()]
+
+
+{marker}
+def test_lazy_roles(client):
+    assert client.get("/test/lazy-roles").status_code == 200
+"""
+
+CLIENT = """
+import pytest
+from fastapi.testclient import TestClient
+import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+"""
+
+
+# The requests of the nested session also reach the listener of the outer
+# test, which must not fail on them
+
+
+@pytest.mark.usefixtures("client")
+@pytest.mark.allow_n_plus_one
+def test_lazy_relation_fails_the_test(pytester):
+    """A test whose request loads a relation row by row fails with the offending SQL."""
+    pytester.makeconftest(CLIENT)
+    pytester.makepyfile(test_lazy=LAZY_ROLES.format(marker=""))
+    result = pytester.runpytest_inprocess("-p", "testing.pytest_plugin")
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(
+        ["*N+1 query pattern detected*", '*GET /test/lazy-roles: * FROM "roles"*']
+    )
+
+
+@pytest.mark.usefixtures("client")
+@pytest.mark.allow_n_plus_one
+def test_marker_allows_the_pattern(pytester):
+    """The `allow_n_plus_one` marker lets the same test pass."""
+    pytester.makeconftest(CLIENT)
+    pytester.makepyfile(test_lazy=LAZY_ROLES.format(marker="@pytest.mark.allow_n_plus_one"))
+    result = pytester.runpytest_inprocess("-p", "testing.pytest_plugin")
+    result.assert_outcomes(passed=1)
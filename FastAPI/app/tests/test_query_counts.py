@@ -0,0 +1,46 @@
+"""
+Query budgets of the read endpoints.
+
+Each endpoint must answer with a fixed number of statements, whatever the
+number of rows it returns: related rows are joined or come from the
+`ReferenceCache`, never loaded one at a time.
+"""
+
+from testing.query_counter import assert_num_queries
+
+
+def test_get_user_joins_the_role(client):
+    """A user is read together with its role in one query."""
+    response = assert_num_queries(client, "GET", "/users/1", 1)
+    assert response.status_code == 200
+    assert response.json()["role"]["name"] == "admin"
+
+
+def test_get_missing_user(client):
+    """A missing user costs a single query before the 404."""
+    response = assert_num_queries(client, "GET", "/users/999", 1)
+    assert response.status_code == 404
+
+
+def test_list_recipes_is_one_query(client):
+    """Listing recipes embeds their category without a query per recipe."""
+    response = assert_num_queries(client, "GET", "/recipes/", 1)
+    items = response.json()["items"]
+    assert len(items) == 10
+    assert all(item["category"]["name"] == "Dessert" for item in items)
+
+
+def test_list_recipes_page_is_one_query(client):
+    """A keyset page after a given ID is one query."""
+    response = assert_num_queries(client, "GET", "/recipes/", 1, params={"after": 2, "limit": 3})
+    page = response.json()
+    assert [item["id"] for item in page["items"]] == [3, 4, 5]
+    assert page["next_after"] == 5
+
+
+def test_get_recipe_is_one_query(client):
+    """A recipe is read with its difficulty and ETag in one query."""
+    response = assert_num_queries(client, "GET", "/recipes/1", 1)
+    assert response.status_code == 200
+    assert response.json()["difficulty"]["name"] == "Easy"
+    assert response.headers["ETag"]
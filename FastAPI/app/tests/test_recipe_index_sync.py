@@ -0,0 +1,64 @@
+"""
+Recipe writes made by another worker process reach the in-memory indexes.
+
+The writes go straight to the database, as another process would make them,
+so only the polling of `RecipeChangeTracker` can bring them into the indexes.
+"""
+
+import pytest
+from config.database import RecipeIngredientModel, RecipeModel, database
+from config.settings import RECIPE_INDEX_SYNC
+from services.suggestion_service import SuggestionService
+
+
+@pytest.fixture
+def poll_every_use(monkeypatch):
+    """Poll the recipes table on every use of an index."""
+    monkeypatch.setitem(RECIPE_INDEX_SYNC, "interval", 0)
+
+
+def _search(client, query):
+    response = client.get("/recipes/search", params={"q": query})
+    assert response.status_code == 200
+    return [hit["recipe"]["name"] for hit in response.json()]
+
+
+@pytest.mark.usefixtures("poll_every_use")
+def test_recipe_created_elsewhere_is_found(client):
+    """A recipe inserted by another process is searchable and suggestible."""
+    with database.connection_context():
+        recipe = RecipeModel.create(
+            name="Zucchini bread",
+            instruction="Grate and bake",
+            preparation_time=40,
+            difficulty=1,
+            category=1,
+            user=1,
+        )
+        RecipeIngredientModel.create(recipe_id=recipe, ingredient_id=1, quantity=1, unit=1)
+    try:
+        assert _search(client, "zucchini") == ["Zucchini bread"]
+        assert recipe.id in SuggestionService.get_index().recipes
+    finally:
+        with database.connection_context():
+            recipe.delete_instance(recursive=True)
+    assert _search(client, "zucchini") == []
+    assert recipe.id not in SuggestionService.get_index().recipes
+
+
+@pytest.mark.usefixtures("poll_every_use")
+def test_recipe_updated_elsewhere_is_reindexed(client):
+    """A rename made by another process replaces the old terms of the recipe."""
+    with database.connection_context():
+        recipe = RecipeModel.get_by_id(1)
+        RecipeModel.update(name="Saffron rice", version=RecipeModel.version + 1).where(
+            RecipeModel.id == recipe.id
+        ).execute()
+    try:
+        assert _search(client, "saffron") == ["Saffron rice"]
+    finally:
+        with database.connection_context():
+            RecipeModel.update(name=recipe.name, version=RecipeModel.version + 1).where(
+                RecipeModel.id == recipe.id
+            ).execute()
+    assert _search(client, "saffron") == []